@@ -0,0 +1,211 @@
+"""Compare how well the matching engines recognise misspelled and reformatted skills.
+
+Queries are catalog skills with one seeded typo (a deleted, swapped, replaced
+or inserted letter) or with changed case and spacing. Each query searches the
+engine's catalog index, and counts as found when the skill it came from is
+the best (top-1) or among the best five (top-5) matches. Pair metrics compare
+every typo with its skill against random pairs of different catalog skills:
+how often each kind scores at or above the service's match threshold, and how
+often a typo pair outscores a random pair (AUC).
+
+With ``--precisions float16 int8`` the transformer's float32 embeddings of
+the queries and catalog are also stored the way EMBEDDING_PRECISION stores
+them, and every query x catalog cosine is compared with its float32 value:
+mean and max error, the share of pairs that cross the match threshold, and
+typo queries whose top-1 changes. Only transformer embeddings are ever
+quantized, so this needs the transformer model whatever ``--engines`` lists,
+and is skipped with a message when the model cannot be loaded.
+
+Usage (from semantic-matching-service/):
+
+    python benchmarks/accuracy.py --engines tfidf hashing --output accuracy.json
+    python benchmarks/accuracy.py --precisions float16 int8
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+import numpy as np
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+
+def misspell(skill, rnd):
+    """``skill`` with one random letter deleted, swapped with the next, replaced or inserted"""
+    positions = [i for i, char in enumerate(skill) if char.isalpha()]
+    i = rnd.choice(positions)
+    edit = rnd.choice(["delete", "swap", "replace", "insert"])
+    if edit == "delete":
+        return skill[:i] + skill[i + 1:]
+    if edit == "swap" and i + 1 < len(skill) and skill[i + 1].isalpha() and skill[i + 1] != skill[i]:
+        return skill[:i] + skill[i + 1] + skill[i] + skill[i + 2:]
+    letter = rnd.choice([char for char in string.ascii_lowercase if char != skill[i].lower()])
+    if edit == "insert":
+        return skill[:i] + letter + skill[i:]
+    return skill[:i] + letter + skill[i + 1:]
+
+
+def reformat(skill, rnd):
+    """``skill`` in another case, with doubled spaces"""
+    formatted = rnd.choice([skill.upper(), skill.title(), skill.capitalize()])
+    return formatted.replace(" ", "  ")
+
+
+def build_queries(catalog, args):
+    """``[(query, expected skill, kind)]`` for every catalog skill long enough to misspell"""
+    rnd = random.Random(args.seed)
+    queries = []
+    for skill in catalog:
+        queries.append((reformat(skill, rnd), skill, "reformatted"))
+        # Short names like "js" or "c#" are different skills after any typo
+        if sum(char.isalpha() for char in skill) >= args.min_length:
+            queries.extend((misspell(skill, rnd), skill, "typo") for _ in range(args.typos_per_skill))
+    return [(query, skill, kind) for query, skill, kind in queries if query.lower() != skill.lower()]
+
+
+def stored_vectors(vectors, precision):
+    """L2-normalized rows as they are compared after storing them at ``precision``"""
+    from quantization import cosine_codes, quantize
+    from skill_index import SkillIndex
+
+    vectors = np.array([cosine_codes(quantize(row, precision)) for row in vectors], dtype=np.float32)
+    return SkillIndex([""] * vectors.shape[0], vectors).matrix
+
+
+def precision_deltas(encoder, catalog, queries, precisions, threshold):
+    """Cosine errors of every query x catalog pair at each stored precision vs float32"""
+    query_vectors = np.asarray(encoder.encode([query for query, _, _ in queries]), dtype=np.float32)
+    catalog_vectors = np.asarray(encoder.encode(catalog), dtype=np.float32)
+    typo_rows = np.array([kind == "typo" for _, _, kind in queries])
+
+    def cosines(precision):
+        return stored_vectors(query_vectors, precision) @ stored_vectors(catalog_vectors, precision).T
+
+    exact = cosines("float32")
+    results = {"pairs": int(exact.size)}
+    for precision in precisions:
+        quantized = cosines(precision)
+        errors = np.abs(quantized - exact)
+        results[precision] = {
+            "meanCosineError": float(f"{errors.mean():.2e}"),
+            "maxCosineError": float(f"{errors.max():.2e}"),
+            "flippedAtThreshold": round(float(np.mean((quantized >= threshold) != (exact >= threshold))), 6),
+            "typoTop1Changed": round(float(np.mean(
+                quantized[typo_rows].argmax(axis=1) != exact[typo_rows].argmax(axis=1)
+            )), 6)
+        }
+    return results
+
+
+def quantization_accuracy(catalog, queries, precisions, threshold):
+    """``precision_deltas`` of the transformer encoder, or why it could not be measured"""
+    from transformer_engine import encoder_name, load_encoder
+
+    try:
+        encoder = load_encoder()
+    except Exception as e:
+        message = f"the transformer model could not be loaded ({e}); only transformer embeddings are quantized"
+        print(f"Skipping --precisions: {message}", file=sys.stderr)
+        return {"skipped": message}
+    return dict(precision_deltas(encoder, catalog, queries, precisions, threshold), model=encoder_name())
+
+
+def evaluate(engine_name, catalog, queries, random_pairs, threshold):
+    from matching_engine import create_matching_engine
+
+    started = time.perf_counter()
+    engine = create_matching_engine(engine_name)
+    snapshot = engine.snapshot()
+    index = snapshot.build_index(catalog)
+    load_seconds = time.perf_counter() - started
+
+    results = {"loadSeconds": round(load_seconds, 3), "modelVersion": snapshot.version}
+    started = time.perf_counter()
+    for kind in ("reformatted", "typo"):
+        kind_queries = [(query, skill) for query, skill, query_kind in queries if query_kind == kind]
+        top1 = top5 = 0
+        for query, skill in kind_queries:
+            found = [match["skill"].lower() for match in snapshot.top_k(query, index, k=5)]
+            top1 += bool(found) and found[0] == skill.lower()
+            top5 += skill.lower() in found
+        results[kind] = {
+            "queries": len(kind_queries),
+            "top1": round(top1 / len(kind_queries), 4),
+            "top5": round(top5 / len(kind_queries), 4)
+        }
+    search_seconds = time.perf_counter() - started
+
+    typo_pairs = [(query, skill) for query, skill, kind in queries if kind == "typo"]
+    typo_scores = np.array([snapshot.similarity(query, skill) for query, skill in typo_pairs])
+    random_scores = np.array([snapshot.similarity(skill1, skill2) for skill1, skill2 in random_pairs])
+    # Probability that a typo pair outscores a random pair, ties counting half
+    ranks = np.searchsorted(np.sort(random_scores), typo_scores, side="left")
+    ties = np.searchsorted(np.sort(random_scores), typo_scores, side="right") - ranks
+    results["pairs"] = {
+        "typoMeanSimilarity": round(float(typo_scores.mean()), 4),
+        "randomMeanSimilarity": round(float(random_scores.mean()), 4),
+        "typoAtThreshold": round(float(np.mean(typo_scores >= threshold)), 4),
+        "randomAtThreshold": round(float(np.mean(random_scores >= threshold)), 4),
+        "auc": round(float(np.mean((ranks + ties / 2) / len(random_scores))), 4)
+    }
+    results["searchMsPerQuery"] = round(search_seconds * 1000 / len(queries), 3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=["tfidf", "hashing"])
+    parser.add_argument("--typos-per-skill", type=int, default=3)
+    parser.add_argument("--min-length", type=int, default=4, help="letters a skill needs to get typo queries")
+    parser.add_argument("--random-pairs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--precisions", nargs="*", default=[], choices=["float16", "int8"],
+        help="stored precisions to compare with float32 on every query x catalog pair of transformer embeddings"
+    )
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    import logging
+    from scoring import SIMILARITY_THRESHOLD
+    from skill_index import load_skill_catalog
+    logging.getLogger("semantic-matching-service").setLevel(logging.WARNING)
+
+    catalog = list(dict.fromkeys(load_skill_catalog(os.path.join(SERVICE_DIR, "skill_catalog.txt"))))
+    queries = build_queries(catalog, args)
+    rnd = random.Random(args.seed)
+    random_pairs = [tuple(rnd.sample(catalog, 2)) for _ in range(args.random_pairs)]
+
+    results = {}
+    for engine_name in args.engines:
+        try:
+            results[engine_name] = evaluate(engine_name, catalog, queries, random_pairs, SIMILARITY_THRESHOLD)
+        except Exception as e:
+            results[engine_name] = {"error": str(e)}
+
+    report = {
+        "meta": {
+            "catalogSkills": len(catalog),
+            "queries": len(queries),
+            "randomPairs": len(random_pairs),
+            "threshold": SIMILARITY_THRESHOLD,
+            "seed": args.seed
+        },
+        "engines": results
+    }
+    if args.precisions:
+        report["quantization"] = quantization_accuracy(catalog, queries, args.precisions, SIMILARITY_THRESHOLD)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Compare embedding backends: load time, per-batch encode latency, peak RSS and
+how close their embeddings are to each other.
+
+Each backend runs in its own subprocess so its imports and RSS are measured
+in isolation. Usage (from semantic-matching-service/):
+
+    python benchmarks/encode_backends.py --onnx-dir models/all-MiniLM-L6-v2 \\
+        --backends torch onnx onnx-quantized --output encode_backends.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+BACKEND_FILES = {"onnx": "model.onnx", "onnx-quantized": "model_quantized.onnx"}
+
+
+def load_backend(backend, args):
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(args.model)
+    from onnx_encoder import OnnxEncoder
+    return OnnxEncoder(args.onnx_dir, BACKEND_FILES[backend], threads=args.threads)
+
+
+def catalog_skills():
+    from skill_index import load_skill_catalog
+    return load_skill_catalog(os.path.join(SERVICE_DIR, "skill_catalog.txt"))
+
+
+def run_backend(backend, args):
+    """Benchmark one backend in this process and return its results"""
+    started = time.perf_counter()
+    model = load_backend(backend, args)
+    load_seconds = time.perf_counter() - started
+
+    skills = catalog_skills()
+    model.encode(skills[:8], batch_size=8)
+
+    batches = {}
+    for batch_size in args.batch_sizes:
+        texts = (skills * (batch_size // len(skills) + 1))[:batch_size]
+        timings = []
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            model.encode(texts, batch_size=batch_size)
+            timings.append((time.perf_counter() - started) * 1000)
+        batches[str(batch_size)] = {
+            "p50Ms": round(float(np.percentile(timings, 50)), 3),
+            "p95Ms": round(float(np.percentile(timings, 95)), 3),
+            "textsPerSecond": round(batch_size / (np.median(timings) / 1000), 1)
+        }
+
+    np.save(args.embeddings_path, np.asarray(model.encode(skills, batch_size=64), dtype=np.float32))
+    return {
+        "loadSeconds": round(load_seconds, 3),
+        "batches": batches,
+        # ru_maxrss is in KiB on Linux
+        "peakRssMb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+def compare(reference, other):
+    """Cosine agreement of two embedding matrices for the same skills"""
+    a = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    b = other / np.linalg.norm(other, axis=1, keepdims=True)
+    cosines = (a * b).sum(axis=1)
+    pair_error = np.abs(a @ a.T - b @ b.T)
+    return {
+        "minCosineToReference": round(float(cosines.min()), 6),
+        "meanCosineToReference": round(float(cosines.mean()), 6),
+        "maxPairSimilarityError": round(float(pair_error.max()), 6)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-quantized"],
+                        choices=["torch"] + list(BACKEND_FILES))
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+    parser.add_argument("--onnx-dir", default=os.getenv("ONNX_MODEL_DIR", ""))
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32, 64])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--output")
+    parser.add_argument("--run-backend", help=argparse.SUPPRESS)
+    parser.add_argument("--embeddings-path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_backend:
+        print(json.dumps(run_backend(args.run_backend, args)))
+        return
+
+    results = {}
+    embeddings = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends:
+            path = os.path.join(workdir, f"{backend}.npy")
+            command = [sys.executable, __file__, "--run-backend", backend, "--embeddings-path", path,
+                       "--model", args.model, "--onnx-dir", args.onnx_dir, "--threads", str(args.threads),
+                       "--repeats", str(args.repeats), "--batch-sizes"] + [str(size) for size in args.batch_sizes]
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                results[backend] = {"error": completed.stderr.strip().splitlines()[-1]}
+                continue
+            results[backend] = json.loads(completed.stdout.strip().splitlines()[-1])
+            embeddings[backend] = np.load(path)
+
+    if embeddings:
+        reference = args.backends[0] if args.backends[0] in embeddings else next(iter(embeddings))
+        for backend, matrix in embeddings.items():
+            if backend != reference:
+                results[backend]["agreement"] = dict(compare(embeddings[reference], matrix), reference=reference)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
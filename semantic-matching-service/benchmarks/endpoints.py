@@ -0,0 +1,259 @@
+"""Benchmark the matching engines in-process and every main endpoint over HTTP.
+
+Each engine runs in its own subprocess so its imports and peak RSS are
+measured in isolation. Skills are drawn from synthetic corpora built from the
+skill catalog (one corpus per --sizes entry), and /analyze-match uses
+synthetic employee profiles of each --profile-sizes length. Endpoints are
+called through the FastAPI test client, so requests go through routing,
+validation, the matching executor and JSON encoding without a network hop.
+Caches stay warm between runs of a case, as they would in production.
+
+Usage (from semantic-matching-service/):
+
+    python benchmarks/endpoints.py --engines tfidf transformer --output benchmark.json
+    python benchmarks/endpoints.py --engines tfidf --baseline benchmark.json
+
+With --baseline, p50 and p95 latencies are compared with a stored result file
+and the script exits with status 1 when any case is slower by more than
+--tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+QUALIFIERS = [
+    "developer", "engineer", "architecture", "administration", "testing", "migration",
+    "performance tuning", "security", "cloud", "advanced", "basics", "certified",
+    "framework", "integration", "automation", "consulting", "lead", "support"
+]
+
+
+def synthetic_corpus(size, seed=0):
+    """``size`` distinct skill names: catalog skills, pairs of them and qualified variants"""
+    from skill_index import load_skill_catalog
+
+    catalog = list(dict.fromkeys(load_skill_catalog(os.path.join(SERVICE_DIR, "skill_catalog.txt"))))
+    rnd = random.Random(seed)
+    corpus = dict.fromkeys(catalog[:size])
+    while len(corpus) < size:
+        parts = [rnd.choice(catalog)]
+        if rnd.random() < 0.5:
+            parts.append(rnd.choice(catalog))
+        if rnd.random() < 0.6:
+            parts.append(rnd.choice(QUALIFIERS))
+        corpus[" ".join(parts)] = None
+    skills = list(corpus)
+    rnd.shuffle(skills)
+    return skills
+
+
+def synthetic_profile(corpus, size, rnd):
+    """An /analyze-match request for an employee with ``size`` skills"""
+    employee_skills = rnd.sample(corpus, min(size, len(corpus)))
+    demand_skills = rnd.sample(corpus, min(max(3, size // 2), len(corpus)))
+    return {
+        "employeeSkills": employee_skills,
+        "employeeExperience": {skill: rnd.randint(0, 10) for skill in employee_skills},
+        "demandSkills": demand_skills,
+        "demandRequirements": {
+            "primarySkill": demand_skills[0],
+            "experienceRange": {"min": 2, "max": 6}
+        }
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def measure(call, args, items=1):
+    """Latency percentiles and throughput of repeated calls, after one warmup call"""
+    call()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < args.repeats:
+        call_started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - call_started) * 1000)
+        if len(timings) >= args.min_repeats and time.perf_counter() - started > args.max_seconds:
+            break
+    mean = float(np.mean(timings))
+    return {
+        "runs": len(timings),
+        "p50Ms": round(float(np.percentile(timings, 50)), 3),
+        "p95Ms": round(float(np.percentile(timings, 95)), 3),
+        "p99Ms": round(float(np.percentile(timings, 99)), 3),
+        "meanMs": round(mean, 3),
+        "requestsPerSecond": round(1000 / mean, 2),
+        "itemsPerSecond": round(items * 1000 / mean, 1),
+        "peakRssMb": peak_rss_mb()
+    }
+
+
+def post(client, path, body):
+    def call():
+        response = client.post(path, json=body)
+        response.raise_for_status()
+    return call
+
+
+def run_engine(engine_name, args):
+    """Benchmark one engine in this process and return its results"""
+    os.environ["MATCHING_ENGINE"] = engine_name
+    import logging
+    from fastapi.testclient import TestClient
+
+    started = time.perf_counter()
+    import main
+    logging.getLogger("semantic-matching-service").setLevel(logging.WARNING)
+    engine = main.engine
+
+    cases = {}
+    with TestClient(main.app) as client:
+        engine.load()
+        while not engine.readiness()["ready"]:
+            if engine.readiness()["status"] == "failed":
+                raise RuntimeError(engine.readiness()["error"])
+            time.sleep(0.1)
+        load_seconds = time.perf_counter() - started
+
+        for size in args.sizes:
+            corpus = synthetic_corpus(size, args.seed)
+            rnd = random.Random(args.seed)
+            pairs = [rnd.sample(corpus, 2) if size > 1 else corpus * 2 for _ in range(256)]
+            pair_cycle = iter(pairs * (args.repeats // len(pairs) + 2))
+            skill_cycle = iter(corpus * (args.repeats // size + 2))
+
+            def similarity():
+                skill1, skill2 = next(pair_cycle)
+                engine.snapshot().similarity(skill1, skill2)
+
+            def encode():
+                engine.snapshot().encode([next(skill_cycle)])
+
+            cases[f"inprocess/similarity/n={size}"] = measure(similarity, args)
+            cases[f"inprocess/encode/n={size}"] = measure(encode, args)
+
+            skill1, skill2 = pairs[0]
+            cases[f"http/match-skills/n={size}"] = measure(
+                post(client, "/match-skills", {"skill1": skill1, "skill2": skill2}), args
+            )
+            cases[f"http/find-similar-skills/n={size}"] = measure(
+                post(client, "/find-similar-skills", {"targetSkill": corpus[0], "skillList": corpus, "k": args.k}),
+                args, items=size
+            )
+            # In each engine's default output (sparse for the hashing engine)
+            embed_skills = corpus[:args.embed_batch]
+            cases[f"http/embed-skills/n={size}"] = measure(
+                post(client, "/embed-skills", {"skills": embed_skills}), args, items=len(embed_skills)
+            )
+            for profile_size in args.profile_sizes:
+                profile = synthetic_profile(corpus, profile_size, rnd)
+                cases[f"http/analyze-match/n={size}/profile={profile_size}"] = measure(
+                    post(client, "/analyze-match", profile), args
+                )
+            print(f"{engine_name}: n={size} done", file=sys.stderr)
+
+    return {
+        "loadSeconds": round(load_seconds, 3),
+        "peakRssMb": peak_rss_mb(),
+        "cases": cases
+    }
+
+
+def compare(baseline, results, tolerance):
+    """Latency ratios (current / baseline) per case, and the cases that regressed"""
+    comparison = {}
+    regressions = []
+    for engine_name, engine_results in results.items():
+        baseline_cases = baseline.get("engines", {}).get(engine_name, {}).get("cases", {})
+        for case, stats in engine_results.get("cases", {}).items():
+            if case not in baseline_cases:
+                continue
+            ratios = {
+                metric: round(stats[metric] / baseline_cases[case][metric], 3)
+                for metric in ("p50Ms", "p95Ms")
+                if baseline_cases[case].get(metric)
+            }
+            comparison[f"{engine_name}/{case}"] = ratios
+            if any(ratio > 1 + tolerance for ratio in ratios.values()):
+                regressions.append(f"{engine_name}/{case}")
+    return comparison, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=["tfidf", "transformer"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000, 100000])
+    parser.add_argument("--profile-sizes", nargs="+", type=int, default=[5, 20, 50])
+    parser.add_argument("--k", type=int, default=10, help="k for /find-similar-skills")
+    parser.add_argument("--embed-batch", type=int, default=100, help="skills per /embed-skills request")
+    parser.add_argument("--repeats", type=int, default=50, help="maximum timed runs per case")
+    parser.add_argument("--min-repeats", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="stop a case after this many seconds once it has --min-repeats runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline", help="result file to compare latencies with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown before a case counts as a regression")
+    parser.add_argument("--run-engine", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_engine:
+        print(json.dumps(run_engine(args.run_engine, args)))
+        return
+
+    results = {}
+    for engine_name in args.engines:
+        command = [sys.executable, __file__, "--run-engine", engine_name] + sys.argv[1:]
+        completed = subprocess.run(command, capture_output=True, text=True, cwd=SERVICE_DIR)
+        if completed.returncode != 0:
+            lines = completed.stderr.strip().splitlines()
+            results[engine_name] = {"error": lines[-1] if lines else f"exit status {completed.returncode}"}
+            continue
+        results[engine_name] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "executor": os.getenv("MATCHING_EXECUTOR", "thread"),
+            "sizes": args.sizes,
+            "profileSizes": args.profile_sizes
+        },
+        "engines": results
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report["comparison"], regressions = compare(json.load(baseline_file), results, args.tolerance)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
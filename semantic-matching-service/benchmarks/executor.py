@@ -0,0 +1,142 @@
+"""Compare matching executor kinds and pool sizes under concurrent CPU-bound requests.
+
+Each configuration runs in its own subprocess. ``--concurrency`` clients keep
+one /analyze-match/bulk request each in flight through ``MatchingExecutor``
+(the same call path as the endpoint, without HTTP) until ``--requests``
+requests are done, and the script reports throughput and request latency
+percentiles. Usage (from semantic-matching-service/):
+
+    python benchmarks/executor.py --kinds thread process --workers 1 2 4 8 --output executor.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+
+def bulk_request(main, corpus, candidates, rnd):
+    demand_skills = rnd.sample(corpus, 5)
+    return main.BulkMatchAnalysisRequest(
+        demandSkills=demand_skills,
+        demandRequirements={"primarySkill": demand_skills[0], "experienceRange": {"min": 2, "max": 6}},
+        candidates=[
+            main.CandidateProfile(
+                employeeId=f"e{i}",
+                skills=(skills := rnd.sample(corpus, rnd.randint(2, 8))),
+                experience={skill: rnd.randint(0, 10) for skill in skills}
+            )
+            for i in range(candidates)
+        ]
+    )
+
+
+async def drive(executor, requests, compute, concurrency):
+    """Latencies (ms) of every request when ``concurrency`` clients share the executor"""
+    queue = list(requests)
+    latencies = []
+
+    async def client():
+        while queue:
+            request = queue.pop()
+            started = time.perf_counter()
+            await executor.run(compute, request)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+def run_config(kind, workers, args):
+    import logging
+
+    from endpoints import synthetic_corpus
+
+    import main
+    from executor import MatchingExecutor
+    logging.getLogger("semantic-matching-service").setLevel(logging.WARNING)
+
+    main.engine.load()
+    rnd = random.Random(args.seed)
+    corpus = synthetic_corpus(args.corpus, args.seed)
+    requests = [bulk_request(main, corpus, args.candidates, rnd) for _ in range(args.requests)]
+    # Vectors are cached before forking, as they are after warmup in production
+    for request in requests:
+        main.compute_bulk_analysis(request)
+
+    executor = MatchingExecutor(kind, workers, prepare=main.engine.load)
+    asyncio.run(drive(executor, requests[:workers], main.compute_bulk_analysis, workers))
+    started = time.perf_counter()
+    latencies = asyncio.run(drive(executor, requests, main.compute_bulk_analysis, args.concurrency))
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+    return {
+        "requestsPerSecond": round(len(latencies) / elapsed, 2),
+        "p50Ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95Ms": round(float(np.percentile(latencies, 95)), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", default=os.getenv("MATCHING_ENGINE", "tfidf"))
+    parser.add_argument("--kinds", nargs="+", default=["thread", "process"])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--candidates", type=int, default=200, help="candidates per bulk request")
+    parser.add_argument("--corpus", type=int, default=1000, help="distinct skills requests draw from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    parser.add_argument("--run-config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_config:
+        kind, workers = args.run_config.split(":")
+        print(json.dumps(run_config(kind, int(workers), args)))
+        return
+
+    results = {}
+    environment = dict(os.environ, MATCHING_ENGINE=args.engine, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    for kind in args.kinds:
+        for workers in args.workers:
+            command = [sys.executable, __file__, "--run-config", f"{kind}:{workers}"] + sys.argv[1:]
+            completed = subprocess.run(command, capture_output=True, text=True, cwd=SERVICE_DIR, env=environment)
+            if completed.returncode != 0:
+                lines = completed.stderr.strip().splitlines()
+                result = {"error": lines[-1] if lines else f"exit status {completed.returncode}"}
+            else:
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results[f"{kind}:{workers}"] = result
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "engine": args.engine,
+            "concurrency": args.concurrency,
+            "candidates": args.candidates
+        },
+        "results": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Defaults sized for the 512 MB Render plan
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "64"))
+EMBEDDING_CACHE_TTL_SECONDS = float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "0"))
+
+
+def normalize_key(text):
+    """Case- and whitespace-insensitive cache key"""
+    return " ".join(text.lower().split())
+
+
+def entry_size(key, value):
+    """Approximate resident bytes of one cache entry"""
+    size = sys.getsizeof(key)
+    if hasattr(value, "indptr"):
+        # scipy sparse row
+        size += value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    elif hasattr(value, "nbytes"):
+        size += value.nbytes
+    else:
+        size += sys.getsizeof(value)
+    return size
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache for skill vectors with an entry and byte budget.
+
+    Keys are normalized with ``normalize_key`` so case and whitespace variants
+    share one entry. Entries older than ``ttl_seconds`` (when > 0) are treated
+    as misses and dropped.
+    """
+
+    def __init__(self, max_entries=EMBEDDING_CACHE_MAX_ENTRIES, max_bytes=None,
+                 ttl_seconds=EMBEDDING_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = int(EMBEDDING_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, text):
+        return self.get(text, count=False) is not None
+
+    def get(self, text, count=True):
+        key = normalize_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0 and time.monotonic() - entry[1] > self.ttl_seconds:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def record_lookups(self, hits, misses):
+        """Count lookups made with ``get(count=False)`` whose outcome the caller decides"""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def put(self, text, value):
+        key = normalize_key(text)
+        size = entry_size(key, value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic(), size)
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "ttlSeconds": self.ttl_seconds or None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
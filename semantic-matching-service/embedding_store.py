@@ -0,0 +1,187 @@
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+
+from embedding_cache import normalize_key
+from quantization import EMBEDDING_PRECISION, PRECISIONS, check_precision, stored_width
+
+logger = logging.getLogger("semantic-matching-service")
+
+# render.yaml mounts the persistent disk at /app/data; empty disables the store
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "/app/data/embeddings")
+
+# Rows the matrix file grows by at a time; readers remap it once per chunk
+# instead of once per appended embedding
+EMBEDDING_STORE_CHUNK_ROWS = int(os.getenv("EMBEDDING_STORE_CHUNK_ROWS", "4096"))
+
+# File extension of the embedding matrix per precision
+MATRIX_EXTENSIONS = {"float32": "f32", "float16": "f16", "int8": "i8"}
+
+
+def store_name(model_name, precision):
+    """File name stem of a model's store; float32 keeps the original unsuffixed name"""
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+    return name if precision == "float32" else f"{name}-{precision}"
+
+
+class EmbeddingStore:
+    """Append-only on-disk embedding matrix for one model, read through numpy.memmap.
+
+    ``<model>.f32`` holds raw little-endian float32 rows and ``<model>.index``
+    maps each normalized skill to its row, one ``row<TAB>json-key`` line per
+    append. Quantized stores use ``<model>-float16.f16`` or ``<model>-int8.i8``
+    (rows in ``quantization.quantize`` form) with their own index, so switching
+    ``EMBEDDING_PRECISION`` never mixes precisions in one file.
+
+    The matrix file is extended ``EMBEDDING_STORE_CHUNK_ROWS`` zero rows at a
+    time and only rows named in the index are valid, so a reader remaps it
+    once per chunk and cached rows keep few old maps alive. Vectors are
+    written before their index line, so a crash never leaves an index entry
+    pointing at a missing row; the unindexed row is reused by the next append.
+    Appends take an exclusive ``flock``, which keeps concurrent workers sharing
+    the disk consistent. The index is kept in memory and re-read only when its
+    file's size or modification time changed.
+    """
+
+    def __init__(self, directory, model_name, dimensions, precision=EMBEDDING_PRECISION):
+        os.makedirs(directory, exist_ok=True)
+        name = store_name(model_name, check_precision(precision))
+        self.model_name = model_name
+        self.dimensions = dimensions
+        self.precision = precision
+        self.dtype = PRECISIONS[precision]
+        self.width = stored_width(precision, dimensions)
+        self.row_bytes = self.width * self.dtype.itemsize
+        self.matrix_path = os.path.join(directory, f"{name}.{MATRIX_EXTENSIONS[precision]}")
+        self.index_path = os.path.join(directory, f"{name}.index")
+        self.meta_path = os.path.join(directory, f"{name}.meta.json")
+
+        self._check_meta()
+        for path in (self.matrix_path, self.index_path):
+            open(path, "ab").close()
+
+        self._rows = {}
+        self._next_row = 0
+        self._index_offset = 0
+        self._index_stamp = None
+        self._matrix = None
+        self._lock = threading.Lock()
+        self._read_index()
+        logger.info(f"Opened embedding store {self.matrix_path}: {len(self._rows)} embeddings")
+
+    def _check_meta(self):
+        meta = {"model": self.model_name, "dimensions": self.dimensions, "dtype": self.dtype.str}
+        if self.precision == "int8":
+            meta["scale"] = "trailing <f4"
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as meta_file:
+                existing = json.load(meta_file)
+            if existing != meta:
+                raise ValueError(f"Embedding store {self.meta_path} was written for {existing}, not {meta}")
+        else:
+            with open(self.meta_path, "w") as meta_file:
+                json.dump(meta, meta_file)
+
+    def _read_index(self):
+        """Pick up index lines appended since the last read (possibly by other processes)"""
+        stat = os.stat(self.index_path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp == self._index_stamp:
+            return
+        self._index_stamp = stamp
+        with open(self.index_path, "rb") as index_file:
+            index_file.seek(self._index_offset)
+            for line in index_file:
+                if not line.endswith(b"\n"):
+                    break  # partially written line; re-read once the file changes
+                self._index_offset += len(line)
+                row, key = line.decode("utf-8").rstrip("\n").split("\t", 1)
+                self._rows[json.loads(key)] = int(row)
+                self._next_row = max(self._next_row, int(row) + 1)
+
+    def _map(self):
+        rows = os.path.getsize(self.matrix_path) // self.row_bytes
+        if rows == 0:
+            self._matrix = None
+        else:
+            self._matrix = np.memmap(self.matrix_path, dtype=self.dtype, mode="r", shape=(rows, self.width))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, text):
+        """Memory-mapped embedding row for text, or None"""
+        key = normalize_key(text)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self._read_index()
+                row = self._rows.get(key)
+                if row is None:
+                    return None
+            if self._matrix is None or row >= self._matrix.shape[0]:
+                self._map()
+            return self._matrix[row]
+
+    def append(self, text, embedding):
+        """Store an embedding that is already in this store's quantized form"""
+        key = normalize_key(text)
+        vector = np.asarray(embedding, dtype=self.dtype).reshape(self.width)
+        with self._lock:
+            if key in self._rows:
+                return
+            with open(self.index_path, "ab") as index_file:
+                fcntl.flock(index_file, fcntl.LOCK_EX)
+                try:
+                    # Another process may have stored it since our last index read
+                    self._read_index()
+                    if key in self._rows:
+                        return
+                    row = self._next_row
+                    with open(self.matrix_path, "r+b") as matrix_file:
+                        if (row + 1) * self.row_bytes > os.fstat(matrix_file.fileno()).st_size:
+                            chunks = row // EMBEDDING_STORE_CHUNK_ROWS + 1
+                            matrix_file.truncate(chunks * EMBEDDING_STORE_CHUNK_ROWS * self.row_bytes)
+                        matrix_file.seek(row * self.row_bytes)
+                        matrix_file.write(vector.tobytes())
+                        matrix_file.flush()
+                    index_file.write(f"{row}\t{json.dumps(key)}\n".encode("utf-8"))
+                    index_file.flush()
+                finally:
+                    fcntl.flock(index_file, fcntl.LOCK_UN)
+            self._rows[key] = row
+            self._next_row = row + 1
+
+    def stats(self):
+        return {
+            "path": self.matrix_path,
+            "embeddings": len(self._rows),
+            "dimensions": self.dimensions,
+            "chunk_rows": EMBEDDING_STORE_CHUNK_ROWS,
+            "precision": self.precision,
+            "bytes": os.path.getsize(self.matrix_path)
+        }
+
+
+def open_embedding_store(model_name, dimensions=None, directory=EMBEDDING_STORE_DIR,
+                         precision=EMBEDDING_PRECISION):
+    """Open the store for a model, or return None when disabled or dimensions are unknown.
+
+    Without ``dimensions`` the store can still be opened from an existing
+    metadata file, which lets a restarted instance serve stored embeddings
+    before its model is loaded.
+    """
+    if not directory:
+        return None
+    if dimensions is None:
+        meta_path = os.path.join(directory, f"{store_name(model_name, precision)}.meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as meta_file:
+            dimensions = json.load(meta_file)["dimensions"]
+    return EmbeddingStore(directory, model_name, dimensions, precision)
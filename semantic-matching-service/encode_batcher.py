@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger("semantic-matching-service")
+
+# How long the first request of a batch waits for others to join
+ENCODE_BATCH_WAIT_MS = float(os.getenv("ENCODE_BATCH_WAIT_MS", "5"))
+
+# Upper bounds of the batch size and queue depth histogram buckets
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, float("inf"))
+
+
+class Histogram:
+    """Fixed-bucket histogram of small integer observations"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        return {
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in zip(self.buckets, self.counts)},
+            "count": self.count,
+            "sum": self.sum
+        }
+
+
+class EncodeBatcher:
+    """Cross-request micro-batcher in front of a blocking ``encode(list)`` function.
+
+    Concurrent handlers ``await encode(texts)``; a single worker task takes the
+    first waiting request, collects more for up to ``max_wait_ms`` or until
+    ``max_batch_size`` texts are queued, runs one de-duplicated encode in a
+    worker thread and resolves every caller's future with its own rows.
+    """
+
+    def __init__(self, encode, max_batch_size=64, max_wait_ms=ENCODE_BATCH_WAIT_MS):
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self.batch_sizes = Histogram()
+        self.queue_depths = Histogram()
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def encode(self, texts):
+        """Encode texts together with whatever other requests arrive meanwhile"""
+        if not texts:
+            return []
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((list(texts), future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        self.queue_depths.observe(self._queue.qsize() + 1)
+        queued = len(pending[0][0])
+        deadline = self._loop.time() + self.max_wait
+
+        while queued < self.max_batch_size:
+            if self._queue.empty():
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            pending.append(item)
+            queued += len(item[0])
+        return pending
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            texts = list(dict.fromkeys(text for request_texts, _ in pending for text in request_texts))
+            self.batch_sizes.observe(len(texts))
+
+            try:
+                vectors = await self._loop.run_in_executor(None, self._encode, texts)
+            except Exception as e:
+                logger.error(f"Error in batched encode: {str(e)}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            by_text = dict(zip(texts, vectors))
+            for request_texts, future in pending:
+                if not future.done():
+                    future.set_result([by_text[text] for text in request_texts])
+
+    def stats(self):
+        return {
+            "queueDepth": self._queue.qsize() if self._queue is not None else 0,
+            "maxBatchSize": self.max_batch_size,
+            "maxWaitMs": self.max_wait * 1000,
+            "batchSizes": self.batch_sizes.snapshot(),
+            "queueDepths": self.queue_depths.snapshot()
+        }
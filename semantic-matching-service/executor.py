@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from metrics import current_trace, run_traced
+
+logger = logging.getLogger("semantic-matching-service")
+
+# "thread", "process" or "inline" (run on the event loop, for debugging)
+MATCHING_EXECUTOR = os.getenv("MATCHING_EXECUTOR", "thread")
+# Matching work mostly holds the GIL, so threads beyond a couple only add
+# contention (see benchmarks/executor.py); use "process" to scale with cores
+MATCHING_WORKERS = int(os.getenv("MATCHING_WORKERS", "0")) or min(2, os.cpu_count() or 1)
+
+# Returned by next() once a generator is exhausted
+_DONE = object()
+
+
+class MatchingExecutor:
+    """Runs CPU-bound matching work off the event loop.
+
+    Thread workers share the process's matching state. Process workers are
+    forked, so each one sees the module state as it was when the pool was
+    created; call ``reset`` after replacing that state so new workers fork
+    from the current one. ``prepare`` runs in a thread before each fork, so
+    lazily loaded state is in place when the workers copy it.
+
+    Generators (streaming endpoints) cannot move between processes, so the
+    process executor advances them in a thread pool of the same size.
+    """
+
+    def __init__(self, kind=MATCHING_EXECUTOR, workers=MATCHING_WORKERS, prepare=None):
+        if kind not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown MATCHING_EXECUTOR: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.prepare = prepare
+        self._pool = None
+        self._stream_pool = None
+
+    def _get_pool(self):
+        if self._pool is None and self.kind != "inline":
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("fork")
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="matching")
+            logger.info(f"Started {self.kind} matching executor with {self.workers} workers")
+        return self._pool
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in the pool and await its result"""
+        if self.kind == "process" and self._pool is None and self.prepare is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.prepare)
+        return await self._run(self._get_pool(), fn, *args)
+
+    async def iterate(self, fn, *args):
+        """Async iterator over the generator fn(*args), advancing it in the pool"""
+        pool = self._get_stream_pool()
+        generator = await self._run(pool, fn, *args)
+        try:
+            while True:
+                item = await self._run(pool, next, generator, _DONE)
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            generator.close()
+
+    def _get_stream_pool(self):
+        if self.kind != "process":
+            return self._get_pool()
+        if self._stream_pool is None:
+            self._stream_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="matching")
+        return self._stream_pool
+
+    async def _run(self, pool, fn, *args):
+        # Workers do not see the request's context, so traced work brings its trace back
+        trace = current_trace.get()
+        if trace is not None:
+            result, worker_trace = await self._submit(pool, run_traced, fn, *args)
+            trace.merge(worker_trace)
+            return result
+        return await self._submit(pool, fn, *args)
+
+    @staticmethod
+    async def _submit(pool, fn, *args):
+        if pool is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+    def reset(self):
+        """Replace process workers so they pick up the current module state"""
+        if self.kind == "process" and self._pool is not None:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False)
+
+    def shutdown(self):
+        for pool in (self._pool, self._stream_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._pool = None
+        self._stream_pool = None
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "workers": self.workers
+        }
@@ -0,0 +1,219 @@
+import functools
+import hashlib
+import logging
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+from matching_engine import MatchingEngine, timed
+from metrics import stage, trace_count
+from text_processing import STOP_WORDS
+from tfidf_engine import TfidfState, default_skill_catalog
+
+logger = logging.getLogger("semantic-matching-service")
+
+# Size of the hashed feature space; vectors are only comparable within one size
+HASHING_FEATURES = int(os.getenv("HASHING_FEATURES", str(2 ** 18)))
+
+# Lengths of the character n-grams taken from each word; short n-grams keep
+# one-letter typos of short words ("Pyhton") close to the correct spelling
+CHAR_NGRAM_RANGE = (2, 3)
+
+# Weight of the whole word relative to one of its character n-grams
+WORD_WEIGHT = 0.5
+
+# Weight of each word bigram relative to one word (a word's features have unit norm)
+BIGRAM_WEIGHT = 0.5
+
+# Words whose hashed n-grams are memoized
+WORD_CACHE_SIZE = 65536
+
+
+def skill_words(skill):
+    """Lower-cased words of a skill, keeping digits and the + and # of c++ or c#"""
+    words = re.sub(r"[^a-z0-9+#]+", " ", skill.lower()).split()
+    return [word for word in words if word not in STOP_WORDS] or words
+
+
+def hash_feature(feature):
+    # crc32 is stable across processes and Python versions, unlike hash()
+    return zlib.crc32(feature.encode("utf-8")) % HASHING_FEATURES
+
+
+@functools.lru_cache(maxsize=WORD_CACHE_SIZE)
+def word_features(word):
+    """Hashed columns of a word's character n-grams and of the word itself, with unit-norm weights.
+
+    Normalizing each word on its own makes every word of a skill count the
+    same, so a long shared word ("developer") does not outweigh the short
+    words that tell two skills apart ("Java" vs "Python").
+    """
+    padded = f" {word} "
+    grams = [
+        padded[i:i + n]
+        for n in range(CHAR_NGRAM_RANGE[0], CHAR_NGRAM_RANGE[1] + 1)
+        for i in range(max(len(padded) - n + 1, 1))
+    ]
+    columns = [hash_feature(f"c:{gram}") for gram in dict.fromkeys(grams)]
+    weights = [1.0] * len(columns)
+    columns.append(hash_feature(f"w:{word}"))
+    weights.append(WORD_WEIGHT)
+    norm = float(np.sqrt(np.dot(weights, weights)))
+    return columns, [weight / norm for weight in weights]
+
+
+def skill_features(skill):
+    """Hashed columns and weights of a skill's n-grams, words and word bigrams"""
+    words = skill_words(skill)
+    columns = []
+    weights = []
+    for word in words:
+        word_columns, word_weights = word_features(word)
+        columns.extend(word_columns)
+        weights.extend(word_weights)
+    for first, second in zip(words, words[1:]):
+        columns.append(hash_feature(f"b:{first} {second}"))
+        weights.append(BIGRAM_WEIGHT)
+    return columns, weights
+
+
+class HashedSkillModel:
+    """Stateless skill vectors from hashed character and word n-grams.
+
+    Every feature is hashed straight into a fixed ``HASHING_FEATURES``-column
+    space, so there is no vocabulary to fit and nothing to mutate: any thread
+    or process builds the same vector for the same skill. Character n-grams
+    of each word make misspellings ("Javscript") share most features with the
+    correct spelling, and words outside any catalog still match. Without IDF
+    weights, common words such as "developer" count as much as rare ones,
+    but no more than one word.
+    """
+
+    def __init__(self):
+        self.dimensions = HASHING_FEATURES
+        config = f"{HASHING_FEATURES}:{CHAR_NGRAM_RANGE}:{WORD_WEIGHT}:{BIGRAM_WEIGHT}:unit-words"
+        self.version = f"hashing-{hashlib.sha1(config.encode('utf-8')).hexdigest()[:10]}"
+
+    @stage("vectorization")
+    def vectorize(self, skills, cache=True):
+        """Return a CSR matrix with one L2-normalized row per skill (nothing to cache)"""
+        trace_count("vectorsHashed", len(skills))
+        indptr = np.zeros(len(skills) + 1, dtype=np.int64)
+        columns = []
+        weights = []
+        for i, skill in enumerate(skills):
+            skill_columns, skill_weights = skill_features(skill)
+            columns.extend(skill_columns)
+            weights.extend(skill_weights)
+            indptr[i + 1] = len(columns)
+
+        matrix = sparse.csr_matrix(
+            (np.array(weights, dtype=np.float32), np.array(columns, dtype=np.int32), indptr),
+            shape=(len(skills), self.dimensions)
+        )
+        # Hash collisions and repeated words add up
+        matrix.sum_duplicates()
+        # Scale the data in place; scipy's multiply and diags products allocate
+        # work arrays as wide as the hashed space, for every call
+        rows = np.repeat(np.arange(len(skills)), np.diff(matrix.indptr))
+        norms = np.sqrt(np.bincount(rows, weights=matrix.data ** 2, minlength=len(skills)))
+        matrix.data /= np.where(norms == 0, 1, norms)[rows].astype(np.float32)
+        return matrix
+
+    def similarity_matrix(self, skills_a, skills_b):
+        """Cosine similarity between every skill in ``skills_a`` and ``skills_b``"""
+        vectors_a = self.vectorize(skills_a)
+        vectors_b = self.vectorize(skills_b)
+        return np.asarray((vectors_a @ vectors_b.T).todense(), dtype=np.float64)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "dimensions": self.dimensions,
+            # Vectors are rebuilt from memoized word n-grams rather than cached
+            "cachedVectors": 0
+        }
+
+
+class HashingState(TfidfState):
+    """A hashed skill model and its catalog index, scored with the TF-IDF engine's synonym boosts"""
+
+    def vocabulary(self):
+        # Hashed columns have no feature names
+        return None
+
+
+def create_hashing_state(catalog):
+    state = HashingState(HashedSkillModel(), None)
+    state.index = state.build_index(list(dict.fromkeys(catalog)))
+    return state
+
+
+class HashingEngine(MatchingEngine):
+    """Hashed character and word n-gram vectors, with synonym boosts.
+
+    Nothing is fitted, so the only state is the catalog index. It is built in
+    a background thread at startup and index registrations swap in a new
+    state, so request work reads it without locks. Worker processes build
+    identical vectors on their own and share nothing.
+    """
+
+    name = "hashing"
+    label = "Hashed n-grams + Cosine Similarity"
+    embedding_model = "Hashed n-grams"
+    # Dense vectors are HASHING_FEATURES wide with a few dozen non-zeros
+    sparse_vectors = True
+
+    def __init__(self):
+        super().__init__()
+        self.state = None
+        self.lock = threading.RLock()
+
+    def start(self):
+        threading.Thread(target=self.snapshot, name="matching-state-loader", daemon=True).start()
+
+    def snapshot(self):
+        if self.state is None:
+            with self.lock:
+                if self.state is None:
+                    with timed(self.timings, "matchingState"):
+                        self.state = create_hashing_state(default_skill_catalog())
+                    logger.info(f"Matching state ready, load timings: {self.timings}")
+        return self.state
+
+    @property
+    def version(self):
+        state = self.state
+        return state.version if state is not None else None
+
+    def register_index(self, skills):
+        with self.lock:
+            current = self.snapshot()
+            index = current.build_index(list(dict.fromkeys(skills)))
+            self.state = HashingState(current.model, index)
+        logger.info(f"Registered skill index: {len(index)} skills")
+        return index
+
+    def readiness(self):
+        state = self.state
+        return {
+            "ready": state is not None,
+            "status": "ready" if state is not None else "loading",
+            "modelVersion": state.version if state is not None else None,
+            "timings": self.timings
+        }
+
+    def stats(self):
+        cache_info = word_features.cache_info()
+        return {
+            "word_feature_cache": {
+                "entries": cache_info.currsize,
+                "maxEntries": cache_info.maxsize,
+                "hits": cache_info.hits,
+                "misses": cache_info.misses
+            }
+        }
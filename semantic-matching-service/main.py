@@ -1,62 +1,47 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# Taken before the other imports so /health can report how long they took
+IMPORTS_STARTED = time.perf_counter()
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Any, Literal, Union
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import os
 import logging
+import json
+import secrets
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
-import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import PorterStemmer
-
-# Global variables for NLTK components
-NLTK_AVAILABLE = True
-stop_words = set()
-stemmer = None
-
-# Download required NLTK data and set up components
-def setup_nltk():
-    global NLTK_AVAILABLE, stop_words, stemmer
-    
-    try:
-        # Try to download punkt_tab (newer NLTK versions)
-        try:
-            nltk.data.find('tokenizers/punkt_tab')
-        except LookupError:
-            nltk.download('punkt_tab', quiet=True)
-        
-        # Fallback to punkt (older NLTK versions)
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
-        
-        # Download stopwords
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords', quiet=True)
-        
-        # Initialize components
-        stop_words = set(stopwords.words('english'))
-        stemmer = PorterStemmer()
-        NLTK_AVAILABLE = True
-        
-    except Exception as e:
-        print(f"Warning: NLTK setup failed: {e}")
-        print("Falling back to basic text processing")
-        NLTK_AVAILABLE = False
-        # Fallback stopwords
-        stop_words = {'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the', 'to', 'was', 'will', 'with'}
-        stemmer = None
+from pair_cache import PairCache
+from profiles import ProfileBatch
+from skill_gaps import iter_skill_gaps
+from similar_skills import FIND_SIMILAR_CHUNK_SIZE, chunk_indexes, find_similar, iter_similar_skills
+from executor import MatchingExecutor
+from matching_engine import create_matching_engine
+from metrics import (
+    CONTENT_TYPE, DEBUG_TRACE_HEADER, REQUEST_SECONDS, SERVER_TIMING, RequestTrace, current_trace,
+    observe_stages, process_rss_bytes, render_metrics
+)
+from profiler import ADMIN_TOKEN, PROFILE_MAX_SECONDS, ProfilerBusy, StackSampler, collapsed_text
+from quantization import encode_for_transport
+from transport import (
+    BinaryMatrix, DenseTooLarge, NotAcceptable, binary_headers, check_dense_size, encode_matrix, negotiate
+)
+from scoring import SIMILARITY_THRESHOLD, MATCH_SCORING, analyze_match as score_match, score_candidates
 
-# Initialize NLTK
-setup_nltk()
+# Seconds spent in each startup phase; the engine adds its own model timings
+startup_timings = {"imports": round(time.perf_counter() - IMPORTS_STARTED, 4)}
+
+@contextmanager
+def startup_phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = round(time.perf_counter() - started, 4)
 
 # Configure logging
 logging.basicConfig(
@@ -68,11 +53,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("semantic-matching-service")
 
+# Matching engine selected by MATCHING_ENGINE; every endpoint goes through it
+with startup_phase("engineImport"):
+    engine = create_matching_engine()
+
+@asynccontextmanager
+async def lifespan(app):
+    """Load the model in the background so the server accepts requests right away"""
+    engine.start()
+    yield
+
 # Initialize FastAPI app
 app = FastAPI(
-    title="Semantic Skill Matching API (Lightweight)",
-    description="Lightweight semantic skill matching using TF-IDF and cosine similarity",
-    version="1.0.0"
+    title="Semantic Skill Matching API",
+    description=f"Semantic skill matching for iBridge-AI using {engine.label}",
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -84,60 +80,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize text processing components
-stemmer = PorterStemmer()
-stop_words = set(stopwords.words('english'))
-
-# Skill synonyms for better matching
-SKILL_SYNONYMS = {
-    'javascript': ['js', 'node', 'nodejs', 'react', 'angular', 'vue'],
-    'python': ['django', 'flask', 'fastapi', 'pandas', 'numpy'],
-    'java': ['spring', 'springboot', 'maven', 'gradle'],
-    'react': ['reactjs', 'jsx', 'redux', 'javascript'],
-    'angular': ['angularjs', 'typescript', 'javascript'],
-    'vue': ['vuejs', 'nuxt', 'javascript'],
-    'html': ['html5', 'css', 'css3', 'bootstrap'],
-    'css': ['css3', 'sass', 'scss', 'bootstrap', 'tailwind'],
-    'sql': ['mysql', 'postgresql', 'database', 'db'],
-    'nosql': ['mongodb', 'redis', 'elasticsearch'],
-    'aws': ['amazon', 'ec2', 's3', 'lambda', 'cloud'],
-    'docker': ['container', 'kubernetes', 'k8s', 'devops'],
-    'git': ['github', 'gitlab', 'version control', 'vcs']
-}
-
-def preprocess_text(text):
-    """Preprocess text for better matching"""
-    # Convert to lowercase
-    text = text.lower().strip()
-    
-    # Remove special characters and numbers
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-    
-    # Tokenize
-    tokens = word_tokenize(text)
-    
-    # Remove stopwords and stem
-    tokens = [stemmer.stem(token) for token in tokens if token not in stop_words]
-    
-    return ' '.join(tokens)
+# CPU-bound request work runs here so the event loop stays responsive; process
+# workers are only forked once the engine has loaded its model
+matching_executor = MatchingExecutor(prepare=engine.load)
 
-def expand_skill_with_synonyms(skill):
-    """Expand skill with synonyms for better matching"""
-    skill_lower = skill.lower().strip()
-    expanded = [skill_lower]
-    
-    for key, synonyms in SKILL_SYNONYMS.items():
-        if key in skill_lower or any(syn in skill_lower for syn in synonyms):
-            expanded.extend([key] + synonyms)
-    
-    return ' '.join(set(expanded))
+stack_sampler = StackSampler()
 
-# Global TF-IDF vectorizer (reused for consistency)
-vectorizer = TfidfVectorizer(
-    max_features=5000,
-    stop_words='english',
-    ngram_range=(1, 2)
-)
+# Memoized skill-pair similarities for /match-skills, /find-similar-skills and
+# /analyze-match; each process worker keeps its own
+pair_cache = PairCache()
 
 # Request/Response models
 class SkillMatchRequest(BaseModel):
@@ -150,17 +101,59 @@ class SkillMatchResponse(BaseModel):
     similarity: float
     timestamp: str
 
+class BatchSkillMatchRequest(BaseModel):
+    skillsA: List[str]
+    skillsB: List[str]
+    sparse: bool = False
+    threshold: float = SIMILARITY_THRESHOLD
+
+class SparseSimilarities(BaseModel):
+    rows: List[int]
+    cols: List[int]
+    values: List[float]
+
+class BatchSkillMatchResponse(BaseModel):
+    skillsA: List[str]
+    skillsB: List[str]
+    shape: List[int]
+    similarities: Optional[List[List[float]]] = None
+    pairs: Optional[SparseSimilarities] = None
+    threshold: Optional[float] = None
+    modelVersion: str
+    timestamp: str
+
 class EmbedSkillsRequest(BaseModel):
     skills: List[str]
+    # Response encoding: float16 rounds values, int8 sends codes plus a per-skill scale
+    precision: Literal["float32", "float16", "int8"] = "float32"
+    # Only the non-zero entries of each vector, as indices + values (default: the
+    # engine's choice; the hashing engine's vectors are sparse)
+    sparse: Optional[bool] = None
+
+class SparseEmbedding(BaseModel):
+    indices: List[int]
+    values: Union[List[int], List[float]]
 
 class EmbedSkillsResponse(BaseModel):
-    embeddings: Dict[str, List[float]]
+    embeddings: Optional[Dict[str, Union[List[int], List[float]]]] = None
+    sparseEmbeddings: Optional[Dict[str, SparseEmbedding]] = None
+    scales: Optional[Dict[str, float]] = None
     dimensions: int
     model: str
+    # Vectors from the same modelVersion share one feature space
+    modelVersion: str
+    precision: str
+
+class VocabularyResponse(BaseModel):
+    version: str
+    dimensions: int
+    terms: List[str]
 
 class SimilarSkillsRequest(BaseModel):
     targetSkill: str
-    skillList: List[str]
+    skillList: Optional[List[str]] = None
+    k: Optional[int] = Field(None, ge=0)
+    minSimilarity: Optional[float] = None
 
 class SimilarSkill(BaseModel):
     skill: str
@@ -170,12 +163,63 @@ class SimilarSkillsResponse(BaseModel):
     targetSkill: str
     similarSkills: List[SimilarSkill]
 
+class RefitModelRequest(BaseModel):
+    skills: List[str] = []
+    replace: bool = False
+
+class ModelInfoResponse(BaseModel):
+    version: str
+    revision: Optional[int] = None
+    catalogSize: Optional[int] = None
+    dimensions: int
+    cachedVectors: int
+
+class RegisterSkillIndexRequest(BaseModel):
+    skills: List[str]
+
+class SkillIndexResponse(BaseModel):
+    size: int
+    dimensions: int
+    version: Optional[str] = None
+
 class MatchAnalysisRequest(BaseModel):
     employeeSkills: List[str]
     employeeExperience: Dict[str, int]
     demandSkills: List[str]
     demandRequirements: Dict[str, Any]
 
+class CandidateProfile(BaseModel):
+    employeeId: str
+    skills: List[str]
+    experience: Dict[str, int] = {}
+
+class BulkMatchAnalysisRequest(BaseModel):
+    demandSkills: List[str]
+    demandRequirements: Dict[str, Any]
+    candidates: List[CandidateProfile]
+    limit: Optional[int] = None
+
+class CandidateMatch(BaseModel):
+    employeeId: str
+    matchScore: float
+    matchType: str
+    missingSkills: List[str]
+    primarySkillSimilarity: float
+
+class BulkMatchAnalysisResponse(BaseModel):
+    candidatesScored: int
+    results: List[CandidateMatch]
+
+class DemandProfile(BaseModel):
+    demandId: str
+    demandSkills: List[str]
+    demandRequirements: Dict[str, Any]
+    priority: Optional[str] = None
+
+class SkillGapRequest(BaseModel):
+    demands: List[DemandProfile]
+    candidates: List[CandidateProfile]
+
 class SkillMatch(BaseModel):
     skill: str
     required: bool
@@ -191,201 +235,469 @@ class MatchAnalysisResponse(BaseModel):
     skillsMatched: List[SkillMatch]
     semanticInsights: Optional[Dict[str, Any]] = None
 
-def calculate_similarity(skill1, skill2):
-    """Calculate similarity using TF-IDF and cosine similarity"""
+async def add_debug_breakdown(response, trace):
+    """Copy of a JSON object response with the trace breakdown added under debug"""
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    content = json.loads(body)
+    if isinstance(content, dict):
+        content["debug"] = trace.breakdown()
+        body = json.dumps(content).encode("utf-8")
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return Response(content=body, status_code=response.status_code, headers=headers)
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """Record each request's latency for /metrics and its stage timings as Server-Timing"""
+    started = time.perf_counter()
+    status = "500"
+    debug = request.headers.get(DEBUG_TRACE_HEADER, "").lower() in ("1", "true")
+    trace = RequestTrace() if SERVER_TIMING == "on" or debug else None
+    token = current_trace.set(trace)
     try:
-        # Preprocess and expand skills
-        expanded_skill1 = expand_skill_with_synonyms(skill1)
-        expanded_skill2 = expand_skill_with_synonyms(skill2)
-        
-        processed_skill1 = preprocess_text(expanded_skill1)
-        processed_skill2 = preprocess_text(expanded_skill2)
-        
-        # Create TF-IDF vectors
-        corpus = [processed_skill1, processed_skill2]
-        tfidf_matrix = vectorizer.fit_transform(corpus)
-        
-        # Calculate cosine similarity
-        similarity_matrix = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
-        similarity = float(similarity_matrix[0][0])
-        
-        # Boost similarity for exact matches or synonyms
-        if skill1.lower().strip() == skill2.lower().strip():
-            similarity = 1.0
-        elif any(syn in skill2.lower() for syn in SKILL_SYNONYMS.get(skill1.lower(), [])):
-            similarity = max(similarity, 0.8)
-        
-        return similarity
-        
-    except Exception as e:
-        logger.error(f"Error calculating similarity: {str(e)}")
-        return 0.0
+        response = await call_next(request)
+        status = str(response.status_code)
+        if trace is not None:
+            # Streamed bodies are produced after the headers, so only the work before them is included
+            response.headers["Server-Timing"] = trace.server_timing()
+            if debug and response.headers.get("content-type", "").startswith("application/json"):
+                response = await add_debug_breakdown(response, trace)
+        return response
+    finally:
+        current_trace.reset(token)
+        if trace is not None:
+            observe_stages(trace)
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started, request.method, route.path if route is not None else "unmatched", status
+        )
 
 # API endpoints
 @app.get("/")
 async def root():
     return {
-        "message": "Lightweight Semantic Skill Matching API is running",
+        "message": "Semantic Skill Matching API is running",
         "version": "1.0.0",
-        "model": "TF-IDF + Cosine Similarity",
+        "engine": engine.name,
+        "model": engine.label,
+        "modelVersion": engine.version,
+        "scoring": MATCH_SCORING,
         "endpoints": [
             "/match-skills",
+            "/match-skills/batch",
             "/embed-skills",
             "/find-similar-skills",
-            "/analyze-match"
+            "/find-similar-skills/stream",
+            "/analyze-match",
+            "/analyze-match/bulk",
+            "/skill-gaps",
+            "/skill-index",
+            "/model",
+            "/model/vocabulary",
+            "/model/refit",
+            "/livez",
+            "/readyz",
+            "/metrics"
         ]
     }
 
+# Request work, run by matching_executor. Each function takes one engine
+# snapshot so a concurrent refit never mixes two model versions.
+def compute_skill_match(request):
+    return {
+        "skill1": request.skill1,
+        "skill2": request.skill2,
+        "similarity": pair_cache.similarity(engine.snapshot(), request.skill1, request.skill2),
+        "timestamp": datetime.now().isoformat()
+    }
+
+def compute_batch_similarities(request, media_type=None):
+    snapshot = engine.snapshot()
+    matrix = snapshot.similarity_matrix(request.skillsA, request.skillsB)
+    if media_type is not None:
+        return encode_matrix(
+            matrix.astype(np.float32), media_type, request.skillsA, request.skillsB, snapshot.version
+        )
+    
+    response = {
+        "skillsA": request.skillsA,
+        "skillsB": request.skillsB,
+        "shape": [len(request.skillsA), len(request.skillsB)],
+        "modelVersion": snapshot.version,
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    if request.sparse:
+        # Only pairs at or above the threshold, as coordinate lists
+        rows, cols = np.nonzero(matrix >= request.threshold)
+        response["pairs"] = {
+            "rows": rows.tolist(),
+            "cols": cols.tolist(),
+            "values": matrix[rows, cols].tolist()
+        }
+        response["threshold"] = request.threshold
+    else:
+        response["similarities"] = matrix.tolist()
+    
+    return response
+
+def sparse_rows(matrix):
+    """(indices, values) of the non-zero entries of every row, indices ascending"""
+    if hasattr(matrix, "indptr"):
+        matrix = matrix.tocsr()
+        matrix.sort_indices()
+        return [
+            (matrix.indices[start:end], matrix.data[start:end])
+            for start, end in zip(matrix.indptr[:-1], matrix.indptr[1:])
+        ]
+    rows = []
+    for row in matrix:
+        indices = np.flatnonzero(row)
+        rows.append((indices, row[indices]))
+    return rows
+
+def compute_skill_embeddings(request, media_type=None):
+    snapshot = engine.snapshot()
+    if not request.sparse:
+        check_dense_size(len(request.skills), snapshot.dimensions)
+    # Encode with the loaded model (no per-request fit), so every response of one
+    # model version uses the same feature space
+    matrix = snapshot.encode(request.skills)
+    if media_type is not None:
+        dense = matrix.toarray() if hasattr(matrix, "toarray") else matrix
+        dtype = np.float16 if request.precision == "float16" else np.float32
+        return encode_matrix(dense.astype(dtype), media_type, request.skills, model_version=snapshot.version)
+    
+    response = {
+        "dimensions": matrix.shape[1],
+        "model": engine.embedding_model,
+        "modelVersion": snapshot.version,
+        "precision": request.precision
+    }
+    
+    if request.sparse:
+        rows = sparse_rows(matrix)
+        encoded, scales = encode_for_transport([values for _, values in rows], request.precision)
+        response["sparseEmbeddings"] = {
+            skill: {"indices": indices.tolist(), "values": values}
+            for skill, (indices, _), values in zip(request.skills, rows, encoded)
+        }
+    else:
+        # TF-IDF rows are sparse
+        rows = [(row.toarray()[0] if hasattr(row, "toarray") else row) for row in matrix]
+        encoded, scales = encode_for_transport(rows, request.precision)
+        response["embeddings"] = dict(zip(request.skills, encoded))
+    
+    if scales is not None:
+        # value = code * scale
+        response["scales"] = dict(zip(request.skills, scales))
+    return response
+
+def compute_similar_skills(request):
+    snapshot = engine.snapshot()
+    if request.skillList is not None and len(request.skillList) <= FIND_SIMILAR_CHUNK_SIZE:
+        # Short ad-hoc lists are scored from memoized pairs once seen
+        similar_skills = pair_cache.top_k(
+            snapshot, request.targetSkill, request.skillList, k=request.k, min_similarity=request.minSimilarity
+        )
+    else:
+        # Long lists are indexed chunk by chunk and merged in a bounded heap;
+        # without a list the registered catalog index is searched
+        similar_skills = find_similar(
+            snapshot, request.targetSkill, request.skillList, k=request.k, min_similarity=request.minSimilarity
+        )
+    
+    return {
+        "targetSkill": request.targetSkill,
+        "similarSkills": similar_skills
+    }
+
+def compute_match_analysis(request):
+    primary_demand_skill = request.demandRequirements.get("primarySkill", "")
+    
+    # One employee x (demand skills + primary skill) similarity matrix per request
+    similarities = pair_cache.similarity_matrix(
+        engine.snapshot(), request.employeeSkills, request.demandSkills + [primary_demand_skill]
+    )
+    return score_match(
+        request.employeeSkills, request.employeeExperience,
+        request.demandSkills, request.demandRequirements, similarities
+    )
+
+def compute_bulk_analysis(request):
+    batch = ProfileBatch([(candidate.skills, candidate.experience) for candidate in request.candidates])
+    primary_demand_skill = request.demandRequirements.get("primarySkill", "")
+    
+    # Each distinct candidate skill is compared against the demand once
+    vocabulary_similarities = engine.snapshot().similarity_matrix(
+        batch.vocabulary, request.demandSkills + [primary_demand_skill]
+    )
+    scores = score_candidates(request.demandSkills, request.demandRequirements, batch, vocabulary_similarities)
+    
+    # Highest score first, keeping request order for equal scores
+    ranking = np.argsort(-scores["matchScores"], kind="stable")
+    if request.limit is not None:
+        ranking = ranking[:max(request.limit, 0)]
+    
+    results = []
+    for i in ranking:
+        results.append({
+            "employeeId": request.candidates[i].employeeId,
+            "matchScore": float(scores["matchScores"][i]),
+            "matchType": str(scores["matchTypes"][i]),
+            "missingSkills": [skill for skill, missing in zip(request.demandSkills, scores["missing"][i]) if missing],
+            "primarySkillSimilarity": float(scores["primarySimilarities"][i])
+        })
+    
+    return {
+        "candidatesScored": batch.size,
+        "results": results
+    }
+
 @app.post("/match-skills", response_model=SkillMatchResponse)
 async def match_skills(request: SkillMatchRequest):
     """Calculate semantic similarity between two skills"""
     try:
-        similarity = calculate_similarity(request.skill1, request.skill2)
-        
-        return {
-            "skill1": request.skill1,
-            "skill2": request.skill2,
-            "similarity": similarity,
-            "timestamp": datetime.now().isoformat()
-        }
+        await engine.prepare([request.skill1, request.skill2])
+        return await matching_executor.run(compute_skill_match, request)
     except Exception as e:
         logger.error(f"Error in match_skills: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/embed-skills", response_model=EmbedSkillsResponse)
-async def embed_skills(request: EmbedSkillsRequest):
-    """Create TF-IDF embeddings for multiple skills"""
+def binary_response(result):
+    """Response for a compute function's result: JSON dict or serialized matrix"""
+    if isinstance(result, BinaryMatrix):
+        return Response(content=result.body, media_type=result.media_type, headers=binary_headers(result))
+    return result
+
+@app.post("/match-skills/batch", response_model=BatchSkillMatchResponse, response_model_exclude_none=True)
+async def match_skills_batch(request: BatchSkillMatchRequest, http_request: Request):
+    """Calculate the full skillsA x skillsB similarity matrix in one request"""
+    media_type = negotiate(http_request.headers.get("accept"))
+    if media_type is not None and request.sparse:
+        raise HTTPException(status_code=400, detail="Sparse similarities are only available as JSON")
     try:
-        # Process all skills
-        processed_skills = []
-        for skill in request.skills:
-            expanded = expand_skill_with_synonyms(skill)
-            processed = preprocess_text(expanded)
-            processed_skills.append(processed)
-        
-        # Create TF-IDF matrix
-        tfidf_matrix = vectorizer.fit_transform(processed_skills)
-        
-        # Convert to dictionary
-        embeddings = {}
-        for i, skill in enumerate(request.skills):
-            embeddings[skill] = tfidf_matrix[i].toarray()[0].tolist()
-        
-        return {
-            "embeddings": embeddings,
-            "dimensions": tfidf_matrix.shape[1],
-            "model": "TF-IDF"
-        }
+        await engine.prepare(request.skillsA + request.skillsB)
+        return binary_response(await matching_executor.run(compute_batch_similarities, request, media_type))
+    except NotAcceptable as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in match_skills_batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/embed-skills", response_model=EmbedSkillsResponse, response_model_exclude_none=True)
+async def embed_skills(request: EmbedSkillsRequest, http_request: Request):
+    """Embed multiple skills and return their vector representations"""
+    media_type = negotiate(http_request.headers.get("accept"))
+    if media_type is not None and (request.sparse or request.precision == "int8"):
+        raise HTTPException(status_code=400, detail="Binary embeddings are dense float32 or float16")
+    if request.sparse is None:
+        request.sparse = engine.sparse_vectors and media_type is None
+    try:
+        await engine.prepare(request.skills)
+        return binary_response(await matching_executor.run(compute_skill_embeddings, request, media_type))
+    except DenseTooLarge as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotAcceptable as e:
+        raise HTTPException(status_code=406, detail=str(e))
     except Exception as e:
         logger.error(f"Error in embed_skills: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def similar_skills_to_prepare(request):
+    """Skills to batch-encode up front; longer lists are encoded chunk by chunk as they are scored"""
+    skill_list = request.skillList or []
+    if len(skill_list) > FIND_SIMILAR_CHUNK_SIZE:
+        return [request.targetSkill]
+    return [request.targetSkill] + skill_list
+
 @app.post("/find-similar-skills", response_model=SimilarSkillsResponse)
 async def find_similar_skills(request: SimilarSkillsRequest):
     """Find skills that are similar to a target skill"""
     try:
-        similar_skills = []
-        for skill in request.skillList:
-            similarity = calculate_similarity(request.targetSkill, skill)
-            similar_skills.append({"skill": skill, "similarity": similarity})
-        
-        # Sort by similarity (descending)
-        similar_skills.sort(key=lambda x: x["similarity"], reverse=True)
-        
-        return {
-            "targetSkill": request.targetSkill,
-            "similarSkills": similar_skills
-        }
+        await engine.prepare(similar_skills_to_prepare(request))
+        return await matching_executor.run(compute_similar_skills, request)
     except Exception as e:
         logger.error(f"Error in find_similar_skills: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/find-similar-skills/stream")
+async def find_similar_skills_stream(request: SimilarSkillsRequest):
+    """Stream each chunk's similar skills as NDJSON, followed by the overall top-k"""
+    try:
+        await engine.prepare(similar_skills_to_prepare(request))
+        snapshot = await run_in_threadpool(engine.snapshot)
+        
+        return StreamingResponse(
+            matching_executor.iterate(
+                iter_similar_skills,
+                snapshot, request.targetSkill, request.skillList, request.k, request.minSimilarity
+            ),
+            media_type="application/x-ndjson"
+        )
+    except Exception as e:
+        logger.error(f"Error in find_similar_skills_stream: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/analyze-match", response_model=MatchAnalysisResponse)
 async def analyze_match(request: MatchAnalysisRequest):
     """Perform comprehensive match analysis"""
     try:
-        # Simplified analysis using TF-IDF similarity
-        primary_demand_skill = request.demandRequirements.get("primarySkill", "")
-        min_experience = request.demandRequirements.get("experienceRange", {}).get("min", 0)
-        max_experience = request.demandRequirements.get("experienceRange", {}).get("max", 5)
-        
-        # Find best matching skill
-        best_match = {"skill": "", "similarity": 0, "experience": 0}
-        for emp_skill in request.employeeSkills:
-            similarity = calculate_similarity(emp_skill, primary_demand_skill)
-            if similarity > best_match["similarity"]:
-                best_match = {
-                    "skill": emp_skill,
-                    "similarity": similarity,
-                    "experience": request.employeeExperience.get(emp_skill, 0)
-                }
-        
-        # Calculate match score
-        match_score = 0
-        if best_match["similarity"] >= 0.65:
-            exp_score = min(100, (best_match["experience"] / max(min_experience, 1)) * 100)
-            match_score = int((best_match["similarity"] * 70) + (exp_score * 0.3))
-        
-        # Determine match type
-        if match_score >= 85:
-            match_type = "Exact"
-        elif match_score >= 70:
-            match_type = "Near"
-        else:
-            match_type = "Not Eligible"
-        
-        # Find missing skills
-        missing_skills = []
-        for demand_skill in request.demandSkills:
-            has_skill = False
-            for emp_skill in request.employeeSkills:
-                if calculate_similarity(emp_skill, demand_skill) >= 0.65:
-                    has_skill = True
-                    break
-            if not has_skill:
-                missing_skills.append(demand_skill)
-        
-        # Generate skills matched
-        skills_matched = []
-        for emp_skill in request.employeeSkills:
-            for demand_skill in request.demandSkills:
-                similarity = calculate_similarity(emp_skill, demand_skill)
-                if similarity >= 0.65:
-                    skills_matched.append({
-                        "skill": emp_skill,
-                        "required": demand_skill == primary_demand_skill,
-                        "employeeExperience": request.employeeExperience.get(emp_skill, 0),
-                        "requiredExperience": min_experience,
-                        "similarity": int(similarity * 100),
-                        "matchQuality": "good" if similarity >= 0.8 else "fair"
-                    })
-        
-        return {
-            "matchScore": match_score,
-            "matchType": match_type,
-            "missingSkills": missing_skills,
-            "skillsMatched": skills_matched,
-            "semanticInsights": {
-                "primarySkillSimilarity": best_match["similarity"],
-                "skillGapSeverity": "high" if len(missing_skills) > 2 else "medium" if len(missing_skills) > 0 else "none",
-                "experienceAlignment": "good" if best_match["experience"] >= min_experience else "needs_improvement"
-            }
-        }
-        
+        await engine.prepare(
+            request.employeeSkills + request.demandSkills + [request.demandRequirements.get("primarySkill", "")]
+        )
+        return await matching_executor.run(compute_match_analysis, request)
     except Exception as e:
         logger.error(f"Error in analyze_match: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze-match/bulk", response_model=BulkMatchAnalysisResponse)
+async def analyze_match_bulk(request: BulkMatchAnalysisRequest):
+    """Score and rank many candidate profiles against one demand"""
+    try:
+        await engine.prepare(
+            [skill for candidate in request.candidates for skill in candidate.skills]
+            + request.demandSkills + [request.demandRequirements.get("primarySkill", "")]
+        )
+        return await matching_executor.run(compute_bulk_analysis, request)
+    except Exception as e:
+        logger.error(f"Error in analyze_match_bulk: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/skill-gaps")
+async def skill_gaps(request: SkillGapRequest):
+    """Stream best matches per demand and organization-wide skill gaps as NDJSON"""
+    try:
+        batch = ProfileBatch([(candidate.skills, candidate.experience) for candidate in request.candidates])
+        employee_ids = [candidate.employeeId for candidate in request.candidates]
+        demand_skills = [skill for demand in request.demands for skill in demand.demandSkills]
+        primary_skills = [demand.demandRequirements.get("primarySkill", "") for demand in request.demands]
+        await engine.prepare(batch.vocabulary + demand_skills + primary_skills)
+        snapshot = await run_in_threadpool(engine.snapshot)
+        
+        return StreamingResponse(
+            matching_executor.iterate(
+                iter_skill_gaps, request.demands, batch, employee_ids, snapshot.similarity_matrix, score_candidates
+            ),
+            media_type="application/x-ndjson"
+        )
+    except Exception as e:
+        logger.error(f"Error in skill_gaps: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/skill-index", response_model=SkillIndexResponse)
+async def skill_index_info():
+    """Describe the registered skill catalog index"""
+    index = await run_in_threadpool(lambda: engine.snapshot().index)
+    return index.info()
+
+@app.post("/skill-index", response_model=SkillIndexResponse)
+async def register_index(request: RegisterSkillIndexRequest):
+    """Register the skill catalog that find-similar-skills searches by default"""
+    try:
+        await engine.prepare(request.skills)
+        index = await run_in_threadpool(engine.register_index, request.skills)
+        matching_executor.reset()
+        return index.info()
+    except Exception as e:
+        logger.error(f"Error in register_index: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/model", response_model=ModelInfoResponse)
+async def model_info():
+    """Describe the currently active model version"""
+    snapshot = await run_in_threadpool(engine.snapshot)
+    return snapshot.info()
+
+@app.get("/model/vocabulary", response_model=VocabularyResponse)
+async def model_vocabulary(request: Request):
+    """Feature names of the active model, indexed like /embed-skills vectors"""
+    snapshot = await run_in_threadpool(engine.snapshot)
+    # The vocabulary never changes within a model version
+    etag = f'"{snapshot.version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    terms = snapshot.vocabulary()
+    if terms is None:
+        raise HTTPException(status_code=404, detail=f"The {engine.name} engine has no feature vocabulary")
+    return JSONResponse(
+        content={"version": snapshot.version, "dimensions": len(terms), "terms": terms},
+        headers={"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+@app.post("/model/refit", response_model=ModelInfoResponse)
+async def refit_model(request: RefitModelRequest):
+    """Refit the skill model, extending (or replacing) its catalog"""
+    if not engine.supports_refit:
+        raise HTTPException(status_code=400, detail=f"The {engine.name} engine does not support refitting")
+    try:
+        snapshot = await run_in_threadpool(engine.refit, request.skills, request.replace)
+        matching_executor.reset()
+        return snapshot.info()
+    except Exception as e:
+        logger.error(f"Error in refit_model: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Liveness: the process is up and serving, whether or not the model is loaded
+@app.get("/livez")
+async def liveness():
+    return {"status": "alive"}
+
+# Readiness: only route traffic here once the engine has loaded its model
+@app.get("/readyz")
+async def readiness():
+    content = engine.readiness()
+    ready = content.pop("ready")
+    content["timings"] = dict(startup_timings, **content["timings"])
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
+    # Never waits for the model; it is reported as null while still loading
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "model": "TF-IDF + Cosine Similarity",
-        "memory_usage": "< 256MB"
+        "engine": engine.name,
+        "model": engine.label,
+        "model_version": engine.version,
+        "scoring": MATCH_SCORING,
+        "startup": dict(startup_timings, **engine.timings),
+        "matching_executor": matching_executor.stats(),
+        "pair_cache": pair_cache.stats(),
+        "similar_index_cache": chunk_indexes.stats(),
+        **engine.stats(),
+        "memory_usage": f"{process_rss_bytes() / (1024 * 1024):.1f}MB"
     }
 
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow /debug endpoints only with the ADMIN_TOKEN; without one they do not exist"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/debug/profile", dependencies=[Depends(require_admin)])
+async def debug_profile(
+    seconds: float = Query(10, gt=0, le=PROFILE_MAX_SECONDS),
+    intervalMs: float = Query(5, ge=1, le=1000),
+    includeIdle: bool = False
+):
+    """Sample the running service's stacks and return them in the collapsed (flamegraph) format"""
+    try:
+        stacks, rounds = await run_in_threadpool(stack_sampler.sample, seconds, intervalMs / 1000, includeIdle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return Response(
+        content=collapsed_text(stacks),
+        media_type="text/plain",
+        headers={"X-Profile-Rounds": str(rounds), "X-Profile-Samples": str(sum(stacks.values()))}
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """Request, stage, cache, batch size and memory metrics in the Prometheus text format"""
+    return Response(content=render_metrics(engine, {"pair": pair_cache, "similar_index": chunk_indexes}), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
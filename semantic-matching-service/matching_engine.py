@@ -0,0 +1,118 @@
+import importlib
+import os
+import time
+from contextlib import contextmanager
+
+from skill_index import load_skill_catalog
+
+# Which engine serves the API: "tfidf", "transformer" or "hashing"
+MATCHING_ENGINE = os.getenv("MATCHING_ENGINE", "tfidf")
+
+# Skill catalog the engines fit on and search by default in find-similar-skills
+SKILL_CATALOG_PATH = os.getenv(
+    "SKILL_CATALOG_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_catalog.txt")
+)
+
+# Engine name -> (module, class); modules are imported only when selected so
+# e.g. the TF-IDF engine never needs sentence-transformers installed
+ENGINES = {
+    "tfidf": ("tfidf_engine", "TfidfEngine"),
+    "transformer": ("transformer_engine", "TransformerEngine"),
+    "hashing": ("hashing_engine", "HashingEngine")
+}
+
+
+def load_catalog_skills():
+    """Skills listed in SKILL_CATALOG_PATH, or none when the file is missing"""
+    return load_skill_catalog(SKILL_CATALOG_PATH) if os.path.exists(SKILL_CATALOG_PATH) else []
+
+
+@contextmanager
+def timed(timings, name):
+    """Record the seconds spent in a block under timings[name]"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(time.perf_counter() - started, 4)
+
+
+class MatchingEngine:
+    """Backend that turns skills into vectors and compares them.
+
+    The API only talks to engines through this interface, so every engine
+    serves the same endpoints with the same semantics. Request work calls
+    ``snapshot()`` once and uses the returned object for everything it
+    computes, so a concurrent refit or index registration never mixes two
+    model versions. A snapshot provides:
+
+    - ``version``, ``dimensions`` and ``index`` (the registered catalog ``SkillIndex``)
+    - ``encode(skills)``: one vector per skill (CSR or dense rows)
+    - ``similarity_matrix(skills_a, skills_b)`` and ``similarity(skill1, skill2)``
+    - ``build_index(skills, cache_vectors=True)`` and ``top_k(target_skill, index, k, min_similarity)``
+    - ``info()``: the /model description
+    - ``vocabulary()``: feature names in column order, or None for dense embeddings
+    - ``canonical_skill(skill)`` (skills with the same canonical form score the
+      same) and ``symmetric_similarity`` (whether similarity(a, b) == similarity(b, a))
+
+    ``snapshot()`` blocks until the model is loaded, so call it from worker
+    threads rather than the event loop.
+    """
+
+    name = None
+    # Shown as "model" in responses, and by /embed-skills for its vectors
+    label = None
+    embedding_model = None
+    # Whether /embed-skills returns only the non-zero entries unless asked for dense vectors
+    sparse_vectors = False
+    supports_refit = False
+    # EncodeBatcher whose batch sizes /metrics reports, for engines that batch model calls
+    encode_batcher = None
+
+    def __init__(self):
+        self.timings = {}
+
+    def start(self):
+        """Begin loading in the background; called once at application startup"""
+
+    def load(self):
+        """Block until the engine can serve requests"""
+        self.snapshot()
+
+    def snapshot(self):
+        raise NotImplementedError
+
+    async def prepare(self, skills):
+        """Hook for engines that batch encode work across concurrent requests"""
+
+    @property
+    def version(self):
+        """Model version once loaded, else None; never blocks"""
+        return None
+
+    def register_index(self, skills):
+        """Replace the catalog index that find-similar-skills searches by default"""
+        raise NotImplementedError
+
+    def refit(self, skills, replace=False):
+        raise NotImplementedError(f"The {self.name} engine does not support refitting")
+
+    def readiness(self):
+        """``{"ready": bool, "status": str, ...}`` without blocking"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Engine-specific /health fields"""
+        return {}
+
+    def caches(self):
+        """Name -> EmbeddingCache of the vector caches /metrics reports"""
+        return {}
+
+
+def create_matching_engine(name=MATCHING_ENGINE):
+    if name not in ENGINES:
+        raise ValueError(f"Unknown MATCHING_ENGINE: {name} (expected one of {', '.join(ENGINES)})")
+    module_name, class_name = ENGINES[name]
+    return getattr(importlib.import_module(module_name), class_name)()
@@ -0,0 +1,263 @@
+import functools
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# "on" traces every request and adds its stage timings as a Server-Timing
+# header; "off" only traces requests that ask for a debug breakdown
+SERVER_TIMING = os.getenv("SERVER_TIMING", "on")
+if SERVER_TIMING not in ("on", "off"):
+    raise ValueError(f"Unknown SERVER_TIMING: {SERVER_TIMING}")
+
+# Request header that asks for the stage breakdown and counters in the JSON body
+DEBUG_TRACE_HEADER = "x-debug-trace"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f"{name}=\"{value}\"" for name, value in zip(labels, escaped)) + "}"
+
+
+class HistogramFamily:
+    """Thread-safe Prometheus histogram with one series per label combination"""
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+            series = [(label_values, list(counts), count, total) for label_values, (counts, count, total) in series]
+        for label_values, counts, count, total in series:
+            labels = dict(zip(self.label_names, label_values))
+            lines.extend(render_buckets(self.name, labels, self.buckets, counts))
+            lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(float(total))}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+
+def render_buckets(name, labels, buckets, counts):
+    """Cumulative ``_bucket`` lines from per-bucket counts"""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(buckets, counts):
+        cumulative += count
+        bucket_labels = dict(labels, le=format_value(float(bound)))
+        lines.append(f"{name}_bucket{format_labels(bucket_labels)} {cumulative}")
+    return lines
+
+
+def render_metric(name, metric_type, help_text, samples):
+    """Lines for a counter or gauge from ``[(labels, value), ...]``"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{name}{format_labels(labels)} {format_value(value)}" for labels, value in samples)
+    return lines
+
+
+class RequestTrace:
+    """Stage timings and counters of one request.
+
+    Set as ``current_trace`` for the request; stages and ``trace_count``
+    calls made while it is set add to it. Work that runs in the matching
+    executor gets its own trace, which is merged back when the work returns.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # name -> [seconds, calls]
+        self.stages = {}
+        self.counts = {}
+
+    def add_stage(self, name, seconds, calls=1):
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [seconds, calls]
+        else:
+            entry[0] += seconds
+            entry[1] += calls
+
+    def count(self, name, value=1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def merge(self, other):
+        for name, (seconds, calls) in other.stages.items():
+            self.add_stage(name, seconds, calls)
+        for name, value in other.counts.items():
+            self.count(name, value)
+
+    def server_timing(self):
+        """Server-Timing header value; stages nest, so their durations overlap"""
+        entries = [
+            f"{name};dur={seconds * 1000:.3f};desc=\"{calls} calls\""
+            for name, (seconds, calls) in self.stages.items()
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.3f}")
+        return ", ".join(entries)
+
+    def breakdown(self):
+        return {
+            "totalMs": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages": {
+                name: {"ms": round(seconds * 1000, 3), "calls": calls}
+                for name, (seconds, calls) in self.stages.items()
+            },
+            "counts": dict(self.counts)
+        }
+
+
+current_trace = ContextVar("current_trace", default=None)
+
+
+def trace_count(name, value=1):
+    """Add to a counter of the current request's trace, if it is traced"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.count(name, value)
+
+
+def run_traced(fn, *args):
+    """Run fn(*args) under a fresh trace and return ``(result, trace)``; used by the matching executor"""
+    trace = RequestTrace()
+    token = current_trace.set(trace)
+    try:
+        return fn(*args), trace
+    finally:
+        current_trace.reset(token)
+
+
+REQUEST_SECONDS = HistogramFamily(
+    "semantic_matching_request_duration_seconds",
+    "Time from receiving a request to sending its response headers",
+    ("method", "endpoint", "status")
+)
+
+STAGE_SECONDS = HistogramFamily(
+    "semantic_matching_stage_duration_seconds",
+    "Time a traced request spent in each matching stage",
+    ("stage",)
+)
+
+
+@contextmanager
+def observe_stage(name):
+    """Add the seconds spent in a block to a stage of the current request's trace, if it is traced"""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_stage(name, time.perf_counter() - started)
+
+
+def stage(name):
+    """Decorator form of ``observe_stage``; an untraced call costs one context-variable lookup"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = current_trace.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                trace.add_stage(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def observe_stages(trace):
+    """One ``STAGE_SECONDS`` observation per stage of a finished request, rather than one per call"""
+    for name, (seconds, _) in trace.stages.items():
+        STAGE_SECONDS.observe(seconds, name)
+
+
+def process_rss_bytes():
+    """Current resident set size, or the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def render_cache_metrics(caches):
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    lines = []
+    for suffix, metric_type, key, help_text in (
+        ("hits_total", "counter", "hits", "Cache lookups that found a vector"),
+        ("misses_total", "counter", "misses", "Cache lookups that found no vector"),
+        ("evictions_total", "counter", "evictions", "Vectors evicted to stay within the cache budget"),
+        ("entries", "gauge", "entries", "Vectors held in the cache"),
+        ("bytes", "gauge", "bytes", "Approximate bytes held by the cache")
+    ):
+        lines.extend(render_metric(
+            f"semantic_matching_cache_{suffix}", metric_type, help_text,
+            [({"cache": name}, cache_stats[key]) for name, cache_stats in stats.items()]
+        ))
+    return lines
+
+
+def render_batch_sizes(histogram):
+    name = "semantic_matching_encode_batch_size"
+    lines = [f"# HELP {name} Distinct texts per batched model encode call", f"# TYPE {name} histogram"]
+    lines.extend(render_buckets(name, {}, histogram.buckets, histogram.counts))
+    lines.append(f"{name}_sum {histogram.sum}")
+    lines.append(f"{name}_count {histogram.count}")
+    return lines
+
+
+def render_metrics(engine, caches=None):
+    """The /metrics page in the Prometheus text exposition format; ``caches`` adds caches kept outside the engine"""
+    lines = REQUEST_SECONDS.render() + STAGE_SECONDS.render()
+    lines.extend(render_cache_metrics(dict(engine.caches(), **(caches or {}))))
+    if engine.encode_batcher is not None:
+        lines.extend(render_batch_sizes(engine.encode_batcher.batch_sizes))
+    lines.extend(render_metric(
+        "semantic_matching_model_ready", "gauge", "1 once the engine can serve requests",
+        [({"engine": engine.name}, int(engine.readiness()["ready"]))]
+    ))
+    lines.extend(render_metric(
+        "process_resident_memory_bytes", "gauge", "Resident memory size in bytes", [({}, process_rss_bytes())]
+    ))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger("semantic-matching-service")
+
+# Local directory of the exported model: tokenizer.json plus the .onnx file,
+# either directly inside it or in an onnx/ subdirectory (the Hugging Face layout)
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "")
+
+# model.onnx, or e.g. model_quantized.onnx written by `python onnx_encoder.py quantize`
+ONNX_MODEL_FILE = os.getenv("ONNX_MODEL_FILE", "model.onnx")
+
+# ONNX Runtime intra-op threads; 0 lets it use every core
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+
+NORMALIZE_MODULE = "sentence_transformers.models.Normalize"
+
+
+def find_model_file(model_dir, model_file=ONNX_MODEL_FILE):
+    for path in (os.path.join(model_dir, model_file), os.path.join(model_dir, "onnx", model_file)):
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No {model_file} in {model_dir} or {os.path.join(model_dir, 'onnx')}")
+
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as json_file:
+        return json.load(json_file)
+
+
+class OnnxEncoder:
+    """Sentence embeddings from an exported ONNX transformer, without PyTorch.
+
+    Reproduces the sentence-transformers pipeline: tokenize, run the
+    transformer, mean-pool the token embeddings over the attention mask and
+    L2-normalize when the model's modules.json has a Normalize module (as
+    all-MiniLM-L6-v2 does; assumed when modules.json is missing). Everything
+    is read from ``model_dir``, so it never touches the network. Offers the
+    ``encode`` and ``get_sentence_embedding_dimension`` methods the
+    transformer engine uses from ``SentenceTransformer``.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, model_file=ONNX_MODEL_FILE, threads=ONNX_THREADS):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        if not model_dir:
+            raise ValueError("ONNX_MODEL_DIR must point at a local model directory")
+        self.model_path = find_model_file(model_dir, model_file)
+
+        modules = read_json(os.path.join(model_dir, "modules.json"), None)
+        self.normalize = modules is None or any(module.get("type") == NORMALIZE_MODULE for module in modules)
+        max_length = read_json(os.path.join(model_dir, "sentence_bert_config.json"), {}).get("max_seq_length", 256)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        pad_token = "[PAD]" if self.tokenizer.token_to_id("[PAD]") is not None else "<pad>"
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {graph_input.name for graph_input in self.session.get_inputs()}
+        self._dimensions = None
+        logger.info(f"Loaded ONNX model {self.model_path} (normalize={self.normalize}, max_length={max_length})")
+
+    def get_sentence_embedding_dimension(self):
+        if self._dimensions is None:
+            dimension = self.session.get_outputs()[0].shape[-1]
+            self._dimensions = dimension if isinstance(dimension, int) else self.encode(["a"]).shape[1]
+        return self._dimensions
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feed = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+        }
+        output = self.session.run(None, {name: value for name, value in feed.items() if name in self.input_names})[0]
+
+        if output.ndim == 3:
+            # Mean of the token embeddings, ignoring padding
+            mask = attention_mask[:, :, None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            norms = np.linalg.norm(output, axis=1, keepdims=True)
+            output = output / np.clip(norms, 1e-12, None)
+        return output.astype(np.float32)
+
+    def encode(self, texts, batch_size=32):
+        if isinstance(texts, str):
+            return self.encode([texts], batch_size)[0]
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.vstack([
+            self._encode_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ])
+
+
+def quantize_model(model_dir, model_file="model.onnx", output_file="model_quantized.onnx"):
+    """Write a dynamically int8-quantized copy of the model next to it"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    source = find_model_file(model_dir, model_file)
+    target = os.path.join(os.path.dirname(source), output_file)
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    return target
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tools for the ONNX embedding backend")
+    commands = parser.add_subparsers(dest="command", required=True)
+    quantize = commands.add_parser("quantize", help="Dynamically quantize an exported model to int8")
+    quantize.add_argument("model_dir")
+    quantize.add_argument("--model-file", default="model.onnx")
+    quantize.add_argument("--output-file", default="model_quantized.onnx")
+    args = parser.parse_args()
+
+    print(quantize_model(args.model_dir, args.model_file, args.output_file))
@@ -0,0 +1,177 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import trace_count
+from skill_index import top_k_positions
+
+# Maximum number of memoized skill-pair similarities (about 300 bytes each)
+PAIR_CACHE_MAX_ENTRIES = int(os.getenv("PAIR_CACHE_MAX_ENTRIES", "100000"))
+
+# Approximate resident bytes of one entry besides its skill strings: key
+# tuple, float and OrderedDict slot
+ENTRY_OVERHEAD_BYTES = 160
+
+
+class PairCache:
+    """Bounded LRU memo of skill-pair similarities for one model version.
+
+    Keys are the snapshot's canonical form of both skills, sorted when its
+    similarity is symmetric so (a, b) and (b, a) share an entry, plus the
+    kind of computation that produced the value ("similarity", "matrix" or
+    "rank"). Kinds are kept apart because they round differently in the last
+    bits, so e.g. /match-skills never returns a value that came from the
+    float32 index scores. Entries of an older model version are dropped as
+    soon as a newer version is seen.
+    """
+
+    def __init__(self, max_entries=PAIR_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = OrderedDict()
+        # kind -> dtype of the matrices that kind's values came from
+        self._dtypes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, snapshot, kind, skill1, skill2):
+        skill1, skill2 = snapshot.canonical_skill(skill1), snapshot.canonical_skill(skill2)
+        if snapshot.symmetric_similarity and skill2 < skill1:
+            skill1, skill2 = skill2, skill1
+        return kind, skill1, skill2
+
+    def _use_version(self, version):
+        # Called with the lock held
+        if version != self.version:
+            self._entries.clear()
+            self._dtypes.clear()
+            self._bytes = 0
+            self.version = version
+
+    def get_many(self, version, keys):
+        """Memoized values for keys, None for misses"""
+        with self._lock:
+            self._use_version(version)
+            values = []
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                values.append(value)
+            hits = len(values) - values.count(None)
+            self.hits += hits
+            self.misses += len(values) - hits
+        trace_count("pairCacheHits", hits)
+        trace_count("pairCacheMisses", len(values) - hits)
+        return values
+
+    def put_many(self, version, items):
+        with self._lock:
+            self._use_version(version)
+            for key, value in items:
+                if key not in self._entries:
+                    self._bytes += sys.getsizeof(key[1]) + sys.getsizeof(key[2]) + ENTRY_OVERHEAD_BYTES
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                (_, skill1, skill2), _ = self._entries.popitem(last=False)
+                self._bytes -= sys.getsizeof(skill1) + sys.getsizeof(skill2) + ENTRY_OVERHEAD_BYTES
+                self.evictions += 1
+
+    def similarity(self, snapshot, skill1, skill2):
+        """``snapshot.similarity(skill1, skill2)``, memoized once it succeeds"""
+        key = self.key(snapshot, "similarity", skill1, skill2)
+        value, = self.get_many(snapshot.version, [key])
+        if value is None:
+            value = snapshot.similarity(skill1, skill2)
+            self.put_many(snapshot.version, [(key, value)])
+        return value
+
+    def similarity_matrix(self, snapshot, skills_a, skills_b):
+        """``snapshot.similarity_matrix(skills_a, skills_b)``, computing only the pairs not memoized yet.
+
+        Skills seen for the first time get their whole row from one product;
+        the remaining misses come from one product over just their rows and
+        columns.
+        """
+        keys = [self.key(snapshot, "matrix", a, b) for a in skills_a for b in skills_b]
+        values = self.get_many(snapshot.version, keys)
+        with self._lock:
+            dtype = self._dtypes.get("matrix")
+        shape = (len(skills_a), len(skills_b))
+        missing = np.array([value is None for value in values], dtype=bool).reshape(shape)
+        if dtype is not None and not missing.any():
+            return np.array(values, dtype=dtype).reshape(shape)
+
+        if dtype is None:
+            # Nothing memoized for this version yet: one product for the whole matrix
+            blocks = [(np.arange(shape[0]), np.arange(shape[1]))]
+        else:
+            new_rows = np.flatnonzero(missing.all(axis=1))
+            rest = missing.copy()
+            rest[new_rows] = False
+            blocks = [(new_rows, np.arange(shape[1])), (np.flatnonzero(rest.any(axis=1)), np.flatnonzero(rest.any(axis=0)))]
+            blocks = [(rows, columns) for rows, columns in blocks if len(rows) and len(columns)]
+
+        matrix = None
+        computed = []
+        for rows, columns in blocks:
+            block = snapshot.similarity_matrix([skills_a[i] for i in rows], [skills_b[j] for j in columns])
+            if len(rows) == shape[0] and len(columns) == shape[1]:
+                matrix = block
+            else:
+                if matrix is None:
+                    matrix = np.array([0 if value is None else value for value in values], dtype=block.dtype)
+                    matrix = matrix.reshape(shape)
+                matrix[np.ix_(rows, columns)] = block
+            computed.append((rows, columns, block))
+
+        with self._lock:
+            self._dtypes["matrix"] = matrix.dtype
+        self.put_many(snapshot.version, (
+            (keys[i * shape[1] + j], value)
+            for rows, columns, block in computed
+            for i, row in zip(rows, block.tolist())
+            for j, value in zip(columns, row)
+        ))
+        return matrix
+
+    def top_k(self, snapshot, target_skill, skills, k=None, min_similarity=None):
+        """``snapshot.top_k`` over an ad-hoc skill list, scoring it from memoized pairs when all are known"""
+        keys = [self.key(snapshot, "rank", target_skill, skill) for skill in skills]
+        values = self.get_many(snapshot.version, keys)
+        if None in values:
+            # Every candidate's score, so all of them can be memoized
+            scored = snapshot.top_k(target_skill, snapshot.build_index(skills))
+            by_skill = {match["skill"]: match["similarity"] for match in scored}
+            values = [by_skill[skill] for skill in skills]
+            self.put_many(snapshot.version, zip(keys, values))
+
+        positions, similarities = top_k_positions(np.array(values, dtype=np.float64), k, min_similarity)
+        return [
+            {"skill": skills[i], "similarity": float(similarity)}
+            for i, similarity in zip(positions, similarities)
+        ]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,87 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+# Token that /debug/* endpoints require in the X-Admin-Token header; they are
+# disabled while it is empty
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Longest /debug/profile run accepted
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+# (file name, function) of leaf frames where a thread is blocked waiting, not working
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("connection.py", "_poll")
+}
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already being recorded"""
+
+
+def frame_label(frame):
+    code = frame.f_code
+    # ';' separates frames and ' ' the count in the collapsed format
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def thread_group(name):
+    """Thread name without its pool index, so all workers of a pool share one root"""
+    return re.sub(r"[\d_-]+$", "", name).replace(" ", "_").replace(";", ":") or "thread"
+
+
+def is_idle(frame):
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+
+class StackSampler:
+    """Statistical profiler over ``sys._current_frames``.
+
+    Every ``interval`` seconds it records the Python stack of each other
+    thread, so it sees request work in the event loop and the matching
+    executor's threads with no setup and little overhead. Output is the
+    collapsed-stack format (``thread;outer;...;leaf count``) read by
+    flamegraph.pl, speedscope and similar tools. Only threads of this
+    process are sampled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(self, seconds, interval=0.005, include_idle=False):
+        """Sample for ``seconds`` and return ``(collapsed stack -> samples, sampling rounds)``"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already being recorded")
+        try:
+            own_thread = threading.get_ident()
+            stacks = Counter()
+            rounds = 0
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_thread or (not include_idle and is_idle(frame)):
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(frame_label(frame))
+                        frame = frame.f_back
+                    labels.append(thread_group(names.get(ident, "thread")))
+                    stacks[";".join(reversed(labels))] += 1
+                rounds += 1
+                time.sleep(interval)
+            return stacks, rounds
+        finally:
+            self._lock.release()
+
+
+def collapsed_text(stacks):
+    """Collapsed stacks, most sampled first"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
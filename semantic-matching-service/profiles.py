@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class ProfileBatch:
+    """Flattened view of many employee skill profiles for vectorized scoring.
+
+    Every (profile, skill) entry becomes one row: ``skill_ids`` points into the
+    de-duplicated ``vocabulary`` and ``owners`` holds the profile index. Rows of
+    one profile are contiguous, so per-profile reductions are ``reduceat``
+    calls over ``offsets`` instead of Python loops.
+    """
+
+    def __init__(self, profiles):
+        self.vocabulary = []
+        vocabulary_index = {}
+        skill_ids = []
+        experience = []
+        counts = []
+
+        for skills, skill_experience in profiles:
+            counts.append(len(skills))
+            for skill in skills:
+                skill_id = vocabulary_index.get(skill)
+                if skill_id is None:
+                    skill_id = vocabulary_index[skill] = len(self.vocabulary)
+                    self.vocabulary.append(skill)
+                skill_ids.append(skill_id)
+                experience.append(skill_experience.get(skill, 0))
+
+        self.size = len(counts)
+        self.counts = np.array(counts, dtype=np.int64)
+        self.skill_ids = np.array(skill_ids, dtype=np.int64)
+        self.experience = np.array(experience, dtype=np.float64)
+        self.owners = np.repeat(np.arange(self.size), self.counts)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]]).astype(np.int64)
+        self.non_empty = self.counts > 0
+
+    def entries(self, vocabulary_values):
+        """Expand per-vocabulary rows to one row per (profile, skill) entry"""
+        return vocabulary_values[self.skill_ids]
+
+    def segment_max(self, values, empty=0.0):
+        """Per-profile maximum of per-entry values along axis 0"""
+        result = np.full((self.size,) + values.shape[1:], empty, dtype=np.result_type(values, empty))
+        if len(values):
+            result[self.non_empty] = np.maximum.reduceat(values, self.offsets[self.non_empty], axis=0)
+        return result
+
+    def segment_any(self, values):
+        """Per-profile logical OR of boolean per-entry values along axis 0"""
+        return self.segment_max(values.astype(np.uint8), empty=0).astype(bool)
+
+    def segment_first_argmax(self, values):
+        """Entry index of the first per-profile maximum of a 1-D array (-1 when empty)"""
+        first = np.full(self.size, -1, dtype=np.int64)
+        if not len(values):
+            return first
+
+        maxima = self.segment_max(values, empty=-np.inf)
+        hits = np.flatnonzero(values == maxima[self.owners])
+        owners, positions = np.unique(self.owners[hits], return_index=True)
+        first[owners] = hits[positions]
+        return first
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+
+# How the transformer engine holds embeddings in its cache and on-disk store:
+# "float32" (exact), "float16" (half the memory) or "int8" (per-vector scaled,
+# about a quarter of the memory)
+EMBEDDING_PRECISION = os.getenv("EMBEDDING_PRECISION", "float32")
+
+# Precision -> numpy dtype of the stored values
+PRECISIONS = {
+    "float32": np.dtype("<f4"),
+    "float16": np.dtype("<f2"),
+    "int8": np.dtype("i1")
+}
+
+# int8 vectors carry their float32 scale in the last 4 bytes
+SCALE_BYTES = 4
+
+
+def check_precision(precision):
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown embedding precision: {precision} (expected one of {', '.join(PRECISIONS)})")
+    return precision
+
+
+def stored_width(precision, dimensions):
+    """Number of stored values per vector"""
+    return dimensions + SCALE_BYTES if precision == "int8" else dimensions
+
+
+def quantize(vector, precision=EMBEDDING_PRECISION):
+    """One vector in its stored form: a flat array of PRECISIONS[precision].
+
+    int8 uses a per-vector symmetric scale (max |x| / 127), so every vector
+    keeps its full int8 range; codes are followed by the scale's bytes.
+    """
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    if precision == "float32":
+        return vector
+    if precision == "float16":
+        return vector.astype("<f2")
+
+    peak = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = np.float32(peak / 127 if peak > 0 else 1.0)
+    codes = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+    return np.concatenate([codes, np.array([scale], dtype="<f4").view(np.int8)])
+
+
+def split_int8(stored):
+    """(codes, scale) of a stored int8 vector"""
+    return stored[:-SCALE_BYTES], float(stored[-SCALE_BYTES:].view("<f4")[0])
+
+
+def dequantize(stored):
+    """Approximate float32 values of a stored vector"""
+    if stored.dtype == np.int8:
+        codes, scale = split_int8(stored)
+        return codes.astype(np.float32) * np.float32(scale)
+    return np.asarray(stored, dtype=np.float32)
+
+
+def cosine_codes(stored):
+    """float32 values with the same direction as the original vector.
+
+    Cosine similarity ignores each vector's scale, so int8 codes are used as
+    they are and only widened to float32 for the BLAS matrix product.
+    """
+    if stored.dtype == np.int8:
+        return stored[:-SCALE_BYTES].astype(np.float32)
+    return np.asarray(stored, dtype=np.float32)
+
+
+def encode_for_transport(rows, precision):
+    """JSON-ready rows (and int8 scales, else None) for a requested response precision"""
+    if precision == "float32":
+        return [row.tolist() for row in rows], None
+    if precision == "float16":
+        # float(str(...)) keeps float16's shortest repr, e.g. 0.0123 instead of 0.0123443603515625
+        return [[float(str(value)) for value in row.astype(np.float16)] for row in rows], None
+
+    encoded, scales = [], []
+    for row in rows:
+        codes, scale = split_int8(quantize(row, "int8"))
+        encoded.append(codes.tolist())
+        scales.append(scale)
+    return encoded, scales
+
+
+check_precision(EMBEDDING_PRECISION)
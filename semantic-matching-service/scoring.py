@@ -0,0 +1,405 @@
+import os
+
+import numpy as np
+
+from metrics import stage
+
+# Minimum similarity for two skills to count as a match
+SIMILARITY_THRESHOLD = 0.65
+
+# "simple" scores on the primary skill and its experience (the TF-IDF service's
+# rules); "weighted" adds secondary skills and experience-range penalties
+MATCH_SCORING = os.getenv("MATCH_SCORING", "simple")
+
+SCORING_RULES = ("simple", "weighted")
+if MATCH_SCORING not in SCORING_RULES:
+    raise ValueError(f"Unknown MATCH_SCORING: {MATCH_SCORING}")
+
+
+def _divide(numerator, denominator):
+    """IEEE division for scalars and arrays alike: x / 0 is +-inf (0 / 0 is nan) instead of an error"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.true_divide(numerator, np.float64(denominator))
+
+
+@stage("scoring")
+def score_candidates(demand_skills, demand_requirements, batch, vocabulary_similarities, rules=MATCH_SCORING):
+    """Apply the analyze-match scoring rules to every profile of a ProfileBatch at once.
+
+    ``vocabulary_similarities`` has one row per ``batch.vocabulary`` skill and one
+    column per demand skill plus a last column for the primary skill.
+    """
+    if rules == "weighted":
+        return score_candidates_weighted(demand_skills, demand_requirements, batch, vocabulary_similarities)
+    return score_candidates_simple(demand_skills, demand_requirements, batch, vocabulary_similarities)
+
+
+@stage("scoring")
+def analyze_match(employee_skills, experience, demand_skills, demand_requirements, similarities, rules=MATCH_SCORING):
+    """Detailed analyze-match response for one employee.
+
+    ``similarities`` is the employee skills x (demand skills + primary skill)
+    similarity matrix.
+    """
+    if rules == "weighted":
+        return analyze_match_weighted(employee_skills, experience, demand_skills, demand_requirements, similarities)
+    return analyze_match_simple(employee_skills, experience, demand_skills, demand_requirements, similarities)
+
+
+def score_candidates_simple(demand_skills, demand_requirements, batch, vocabulary_similarities):
+    min_experience = demand_requirements.get("experienceRange", {}).get("min", 0)
+    
+    similarities = batch.entries(vocabulary_similarities)
+    primary_similarities = similarities[:, -1]
+    similarities = similarities[:, :-1]
+    
+    # Best matching skill per candidate (first one wins on ties, must be > 0)
+    best_entry = batch.segment_first_argmax(primary_similarities)
+    has_best = best_entry >= 0
+    best_similarity = np.zeros(batch.size)
+    best_experience = np.zeros(batch.size)
+    best_similarity[has_best] = primary_similarities[best_entry[has_best]]
+    best_experience[has_best] = batch.experience[best_entry[has_best]]
+    positive = best_similarity > 0
+    best_similarity = np.where(positive, best_similarity, 0)
+    best_experience = np.where(positive, best_experience, 0)
+    
+    # Calculate match scores
+    exp_score = np.minimum(100, (best_experience / max(min_experience, 1)) * 100)
+    match_scores = np.where(
+        best_similarity >= SIMILARITY_THRESHOLD,
+        np.trunc((best_similarity * 70) + (exp_score * 0.3)),
+        0
+    )
+    match_types = np.select(
+        [match_scores >= 85, match_scores >= 70],
+        ["Exact", "Near"],
+        default="Not Eligible"
+    )
+    
+    missing = ~batch.segment_any(similarities >= SIMILARITY_THRESHOLD)
+    
+    return {
+        "matchScores": match_scores,
+        "matchTypes": match_types,
+        "missing": missing,
+        "primarySimilarities": best_similarity
+    }
+
+
+def analyze_match_simple(employee_skills, experience, demand_skills, demand_requirements, similarities):
+    primary_demand_skill = demand_requirements.get("primarySkill", "")
+    min_experience = demand_requirements.get("experienceRange", {}).get("min", 0)
+    
+    employee_experience = np.array(
+        [experience.get(skill, 0) for skill in employee_skills], dtype=np.float64
+    )
+    
+    primary_similarities = similarities[:, -1]
+    similarities = similarities[:, :-1]
+    matches = similarities >= SIMILARITY_THRESHOLD
+    
+    # Find best matching skill (first one wins on ties)
+    best_match = {"skill": "", "similarity": 0, "experience": 0}
+    if len(employee_skills) > 0:
+        best_index = int(np.argmax(primary_similarities))
+        if primary_similarities[best_index] > 0:
+            best_match = {
+                "skill": employee_skills[best_index],
+                "similarity": float(primary_similarities[best_index]),
+                "experience": int(employee_experience[best_index])
+            }
+    
+    # Calculate match score
+    match_score = 0
+    if best_match["similarity"] >= SIMILARITY_THRESHOLD:
+        exp_score = min(100, (best_match["experience"] / max(min_experience, 1)) * 100)
+        match_score = int((best_match["similarity"] * 70) + (exp_score * 0.3))
+    
+    # Determine match type
+    if match_score >= 85:
+        match_type = "Exact"
+    elif match_score >= 70:
+        match_type = "Near"
+    else:
+        match_type = "Not Eligible"
+    
+    # Demand skills no employee skill reaches the threshold for
+    missing_mask = ~matches.any(axis=0)
+    missing_skills = [skill for skill, missing in zip(demand_skills, missing_mask) if missing]
+    
+    # Generate skills matched (row-major, i.e. employee skill order first)
+    skills_matched = []
+    for i, j in np.argwhere(matches):
+        similarity = similarities[i, j]
+        skills_matched.append({
+            "skill": employee_skills[i],
+            "required": demand_skills[j] == primary_demand_skill,
+            "employeeExperience": int(employee_experience[i]),
+            "requiredExperience": min_experience,
+            "similarity": int(similarity * 100),
+            "matchQuality": "good" if similarity >= 0.8 else "fair"
+        })
+    
+    return {
+        "matchScore": match_score,
+        "matchType": match_type,
+        "missingSkills": missing_skills,
+        "skillsMatched": skills_matched,
+        "semanticInsights": {
+            "primarySkillSimilarity": best_match["similarity"],
+            "skillGapSeverity": "high" if len(missing_skills) > 2 else "medium" if len(missing_skills) > 0 else "none",
+            "experienceAlignment": "good" if best_match["experience"] >= min_experience else "needs_improvement"
+        }
+    }
+
+
+def determine_match_type(score, missing_skills):
+    """Determine match type based on score and missing skills"""
+    if score >= 85 and len(missing_skills) == 0:
+        return "Exact"
+    elif score >= 70:
+        return "Near"
+    elif score >= 50:
+        return "Near"
+    else:
+        return "Not Eligible"
+
+
+def score_candidates_weighted(demand_skills, demand_requirements, batch, vocabulary_similarities):
+    primary_demand_skill = demand_requirements.get("primarySkill", "")
+    min_experience = demand_requirements.get("experienceRange", {}).get("min", 0)
+    max_experience = demand_requirements.get("experienceRange", {}).get("max", 5)
+    weights = {
+        "primarySkill": 50,
+        "secondarySkills": 25,
+        "experience": 15,
+        "availability": 10
+    }
+    
+    similarities = batch.entries(vocabulary_similarities).astype(np.float64)
+    primary_similarities = similarities[:, -1]
+    similarities = similarities[:, :-1]
+    matches = similarities >= SIMILARITY_THRESHOLD
+    
+    # Best matching skill per candidate for the primary demand skill (must be > 0)
+    best_entry = batch.segment_first_argmax(primary_similarities)
+    has_best = best_entry >= 0
+    best_similarity = np.zeros(batch.size)
+    best_similarity[has_best] = primary_similarities[best_entry[has_best]]
+    emp_exp = np.zeros(batch.size)
+    emp_exp[has_best] = batch.experience[best_entry[has_best]]
+    positive = best_similarity > 0
+    best_similarity = np.where(positive, best_similarity, 0)
+    emp_exp = np.where(positive, emp_exp, 0)
+    
+    in_range = (emp_exp >= min_experience) & (emp_exp <= max_experience)
+    over_qualified = emp_exp > max_experience
+    experience_ratio = _divide(emp_exp, min_experience)
+    over_qualification_penalty = np.minimum(0.1, _divide(emp_exp - max_experience, max_experience) * 0.1)
+    
+    # Primary skill score with the experience-range penalties
+    primary_weight = weights["primarySkill"] * best_similarity
+    primary_skill_score = np.where(
+        best_similarity >= SIMILARITY_THRESHOLD,
+        np.select(
+            [in_range, over_qualified, emp_exp >= min_experience * 0.8],
+            [
+                primary_weight,
+                primary_weight * (0.95 - over_qualification_penalty),
+                primary_weight * (0.7 + (experience_ratio * 0.25))
+            ],
+            default=primary_weight * np.maximum(0.3, experience_ratio * 0.6)
+        ),
+        primary_weight * 0.5
+    )
+    
+    # Secondary skills score
+    secondary_columns = np.array([skill != primary_demand_skill for skill in demand_skills], dtype=bool)
+    if secondary_columns.any():
+        experience_weights = np.minimum(1, batch.experience / 2)
+        weighted = np.where(matches, experience_weights[:, None] * similarities, 0)[:, secondary_columns]
+        best_secondary = batch.segment_max(weighted)
+        matched_secondary = (best_secondary > 0).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            secondary_skill_score = np.where(
+                matched_secondary > 0,
+                weights["secondarySkills"]
+                * (matched_secondary / best_secondary.shape[1])
+                * (np.where(best_secondary > 0, best_secondary, 0).sum(axis=1) / matched_secondary),
+                0
+            )
+    else:
+        secondary_skill_score = np.full(batch.size, weights["secondarySkills"] * 0.8)
+    
+    # Experience quality bonus
+    experience_score = np.select(
+        [in_range, over_qualified],
+        [weights["experience"], weights["experience"] * 0.9],
+        default=weights["experience"] * np.maximum(0.2, experience_ratio)
+    )
+    
+    match_scores = primary_skill_score + secondary_skill_score + experience_score + weights["availability"] * 0.8
+    match_scores = np.minimum(np.round(match_scores), 100)
+    
+    missing = ~batch.segment_any(matches)
+    match_types = np.select(
+        [(match_scores >= 85) & ~missing.any(axis=1), match_scores >= 50],
+        ["Exact", "Near"],
+        default="Not Eligible"
+    )
+    
+    return {
+        "matchScores": match_scores,
+        "matchTypes": match_types,
+        "missing": missing,
+        "primarySimilarities": best_similarity
+    }
+
+
+def analyze_match_weighted(employee_skills, experience, demand_skills, demand_requirements, similarities):
+    # Get primary demand skill
+    primary_demand_skill = demand_requirements.get("primarySkill", "")
+    min_experience = demand_requirements.get("experienceRange", {}).get("min", 0)
+    max_experience = demand_requirements.get("experienceRange", {}).get("max", 5)
+    
+    # Calculate match score
+    match_score = 0
+    weights = {
+        "primarySkill": 50,
+        "secondarySkills": 25,
+        "experience": 15,
+        "availability": 10
+    }
+    
+    employee_experience = np.array(
+        [experience.get(skill, 0) for skill in employee_skills], dtype=np.float64
+    )
+    
+    primary_similarities = similarities[:, -1]
+    similarities = similarities[:, :-1]
+    matches = similarities >= SIMILARITY_THRESHOLD
+    
+    # Find best matching employee skill for primary demand skill (first one wins on ties)
+    best_primary_match = {"skill": "", "similarity": 0, "experience": 0}
+    if len(employee_skills) > 0:
+        best_index = int(np.argmax(primary_similarities))
+        if primary_similarities[best_index] > 0:
+            best_primary_match = {
+                "skill": employee_skills[best_index],
+                "similarity": float(primary_similarities[best_index]),
+                "experience": experience.get(employee_skills[best_index], 0)
+            }
+    
+    # Calculate primary skill score
+    primary_skill_score = 0
+    if best_primary_match["similarity"] >= SIMILARITY_THRESHOLD:
+        emp_exp = best_primary_match["experience"]
+    
+        if emp_exp >= min_experience and emp_exp <= max_experience:
+            # Perfect experience range match
+            primary_skill_score = weights["primarySkill"] * best_primary_match["similarity"]
+        elif emp_exp > max_experience:
+            # Over-qualified - still good but slight penalty
+            # An empty range (max 0) takes the full penalty, as in score_candidates_weighted
+            over_qualification_penalty = min(0.1, float(_divide(emp_exp - max_experience, max_experience)) * 0.1)
+            primary_skill_score = weights["primarySkill"] * best_primary_match["similarity"] * (0.95 - over_qualification_penalty)
+        elif emp_exp >= min_experience * 0.8:
+            # Slightly under-qualified but close
+            experience_ratio = float(_divide(emp_exp, min_experience))
+            primary_skill_score = weights["primarySkill"] * best_primary_match["similarity"] * (0.7 + (experience_ratio * 0.25))
+        else:
+            # Significantly under-qualified
+            experience_ratio = float(_divide(emp_exp, min_experience))
+            primary_skill_score = weights["primarySkill"] * best_primary_match["similarity"] * max(0.3, experience_ratio * 0.6)
+    else:
+        # Low similarity to primary skill
+        primary_skill_score = weights["primarySkill"] * best_primary_match["similarity"] * 0.5
+    
+    match_score += primary_skill_score
+    
+    # Calculate secondary skills match
+    secondary_skill_score = 0
+    secondary_columns = np.array([skill != primary_demand_skill for skill in demand_skills], dtype=bool)
+    
+    if secondary_columns.any():
+        # Best experience-weighted similarity per secondary demand skill
+        experience_weights = np.minimum(1, employee_experience / 2)
+        weighted = np.where(matches, experience_weights[:, None] * similarities, 0)
+        if len(employee_skills) > 0:
+            best_secondary = weighted[:, secondary_columns].max(axis=0)
+        else:
+            best_secondary = np.zeros(int(secondary_columns.sum()))
+    
+        matched_secondary_skills = int((best_secondary > 0).sum())
+        if matched_secondary_skills > 0:
+            match_ratio = matched_secondary_skills / len(best_secondary)
+            avg_skill_score = float(best_secondary[best_secondary > 0].sum()) / matched_secondary_skills
+            secondary_skill_score = weights["secondarySkills"] * match_ratio * avg_skill_score
+        else:
+            secondary_skill_score = 0
+    else:
+        # If no secondary skills required, give partial points
+        secondary_skill_score = weights["secondarySkills"] * 0.8
+    
+    match_score += secondary_skill_score
+    
+    # Experience quality bonus
+    experience_score = 0
+    if best_primary_match["experience"] >= min_experience and best_primary_match["experience"] <= max_experience:
+        # Perfect range
+        experience_score = weights["experience"]
+    elif best_primary_match["experience"] > max_experience:
+        # Over-qualified
+        experience_score = weights["experience"] * 0.9
+    else:
+        # Under-qualified
+        ratio = float(_divide(best_primary_match["experience"], min_experience))
+        experience_score = weights["experience"] * max(0.2, ratio)
+    
+    match_score += experience_score
+    
+    # Availability bonus (not available in this API context, give default)
+    match_score += weights["availability"] * 0.8
+    
+    # Ensure score is between 0-100
+    match_score = min(round(match_score), 100)
+    
+    # Demand skills no employee skill reaches the threshold for
+    missing_mask = ~matches.any(axis=0)
+    missing_skills = [skill for skill, missing in zip(demand_skills, missing_mask) if missing]
+    
+    # Generate skills matched (row-major, i.e. employee skill order first)
+    skills_matched = []
+    for i, j in np.argwhere(matches):
+        similarity = float(similarities[i, j])
+        is_primary = demand_skills[j] == primary_demand_skill
+        emp_exp = experience.get(employee_skills[i], 0)
+        req_exp = min_experience if is_primary else 0
+    
+        skills_matched.append({
+            "skill": employee_skills[i],
+            "required": is_primary,
+            "employeeExperience": emp_exp,
+            "requiredExperience": req_exp,
+            "similarity": round(similarity * 100),
+            "matchQuality": "good" if emp_exp >= req_exp else "needs_improvement"
+        })
+    
+    # Determine match type
+    match_type = determine_match_type(match_score, missing_skills)
+    
+    # Add semantic insights
+    semantic_insights = {
+        "primarySkillSimilarity": best_primary_match["similarity"],
+        "skillGapSeverity": "high" if len(missing_skills) > 2 else "medium" if len(missing_skills) > 0 else "none",
+        "experienceAlignment": "perfect" if best_primary_match["experience"] >= min_experience and best_primary_match["experience"] <= max_experience else "over_qualified" if best_primary_match["experience"] > max_experience else "under_qualified"
+    }
+    
+    return {
+        "matchScore": match_score,
+        "matchType": match_type,
+        "missingSkills": missing_skills,
+        "skillsMatched": skills_matched,
+        "semanticInsights": semantic_insights
+    }
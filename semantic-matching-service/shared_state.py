@@ -0,0 +1,148 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger("semantic-matching-service")
+
+# Directory (ideally on tmpfs) where workers share the fitted matching state;
+# empty keeps the state private to each process
+SHARED_STATE_DIR = os.getenv("SHARED_STATE_DIR", "")
+
+
+def state_key(prefix, texts, modules):
+    """Name for snapshots built from ``texts`` by the code of ``modules``.
+
+    Workers running another skill catalog or other matching code get another
+    key, so a snapshot left in SHARED_STATE_DIR by a previous deployment is
+    never mapped in place of a freshly fitted one.
+    """
+    fingerprint = hashlib.sha1("\n".join(texts).encode("utf-8"))
+    for module in modules:
+        with open(module.__file__, "rb") as source:
+            fingerprint.update(source.read())
+    return f"{prefix}-{fingerprint.hexdigest()[:12]}"
+
+
+class SharedStateDirectory:
+    """Read-only matching snapshots shared by every worker process on a host.
+
+    A snapshot is a directory of ``.npy`` arrays plus ``meta.json``. One process
+    writes it under an exclusive ``flock``, renames it into place and then
+    points the ``CURRENT`` file at it. Workers load the arrays with
+    ``mmap_mode="r"``, so the page cache (tmpfs under ``/dev/shm``) holds a
+    single copy no matter how many workers map it. Replaced snapshots are
+    unlinked, which is safe because existing mappings stay valid until the
+    workers drop them. Snapshots live in a ``key`` subdirectory (see
+    ``state_key``), so only workers of the same catalog and code share them.
+    """
+
+    def __init__(self, directory, key=""):
+        self.key = key
+        self.directory = os.path.join(directory, key) if key else directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.current_path = os.path.join(self.directory, "CURRENT")
+        self.lock_path = os.path.join(self.directory, ".lock")
+        self._seen = None
+        self._thread_lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+
+    @contextmanager
+    def lock(self):
+        """Exclusive lock across processes for loading or publishing a snapshot.
+
+        Reentrant within a process: only the outermost holder takes the flock.
+        """
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self._lock_file = open(self.lock_path, "a")
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.current_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def current(self):
+        """Name of the published snapshot, or None"""
+        try:
+            with open(self.current_path) as current_file:
+                return current_file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def changed(self):
+        """True when another process published a snapshot since our last load"""
+        return self._stamp() != self._seen
+
+    def publish(self, arrays, meta):
+        """Write a new snapshot and make it current; call while holding ``lock``"""
+        previous = self.current()
+        generation = int(previous.split("-")[1]) + 1 if previous else 1
+        name = f"snapshot-{generation}"
+        path = os.path.join(self.directory, name)
+        staging = f"{path}.tmp"
+
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for key, array in arrays.items():
+            np.save(os.path.join(staging, f"{key}.npy"), np.asarray(array))
+        with open(os.path.join(staging, "meta.json"), "w") as meta_file:
+            json.dump(dict(meta, arrays=sorted(arrays)), meta_file)
+        os.rename(staging, path)
+
+        with open(f"{self.current_path}.tmp", "w") as current_file:
+            current_file.write(name)
+        os.replace(f"{self.current_path}.tmp", self.current_path)
+
+        if previous:
+            shutil.rmtree(os.path.join(self.directory, previous), ignore_errors=True)
+        logger.info(f"Published shared matching state {path}")
+        return name
+
+    def load(self, name=None):
+        """Memory-map the arrays of a snapshot (the current one by default)"""
+        stamp = self._stamp()
+        name = name or self.current()
+        if name is None:
+            return None, None
+        path = os.path.join(self.directory, name)
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        arrays = {
+            key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r")
+            for key in meta["arrays"]
+        }
+        self._seen = stamp
+        return arrays, meta
+
+    def stats(self):
+        name = self.current()
+        size = 0
+        if name is not None:
+            path = os.path.join(self.directory, name)
+            size = sum(entry.stat().st_size for entry in os.scandir(path))
+        return {
+            "directory": self.directory,
+            "key": self.key,
+            "snapshot": name,
+            "bytes": size
+        }
@@ -0,0 +1,106 @@
+import hashlib
+import heapq
+import json
+import os
+
+from embedding_cache import EmbeddingCache
+
+# Candidate skills indexed and scored at a time by /find-similar-skills
+FIND_SIMILAR_CHUNK_SIZE = int(os.getenv("FIND_SIMILAR_CHUNK_SIZE", "4096"))
+
+# Budget for the built indexes of long skill lists, reused when the same list is searched again
+FIND_SIMILAR_INDEX_CACHE_MB = float(os.getenv("FIND_SIMILAR_INDEX_CACHE_MB", "128"))
+
+# Chunk indexes by model version and chunk content; each process worker keeps its own
+chunk_indexes = EmbeddingCache(max_entries=1024, max_bytes=int(FIND_SIMILAR_INDEX_CACHE_MB * 1024 * 1024),
+                               ttl_seconds=0)
+
+
+def chunk_index(snapshot, chunk):
+    """Index of one skill_list chunk, built once per model version and chunk content.
+
+    Building skips the per-skill vector cache: a list longer than that cache
+    would evict the rows its next chunk (or the next call) needs, so every
+    call re-vectorized the whole list.
+    """
+    digest = hashlib.sha1(json.dumps(chunk).encode("utf-8")).hexdigest()
+    key = f"{snapshot.version}:{digest}"
+    index = chunk_indexes.get(key)
+    if index is None:
+        index = snapshot.build_index(chunk, cache_vectors=False)
+        chunk_indexes.put(key, index)
+    return index
+
+
+class TopK:
+    """The k best matches seen so far, kept in a bounded min-heap.
+
+    Matches must be added in candidate order; earlier candidates win ties,
+    as in ``SkillIndex.top_k``. A k of None keeps every match.
+    """
+
+    def __init__(self, k=None):
+        if k is not None and k < 0:
+            raise ValueError(f"k must be non-negative, got {k}")
+        self.k = k
+        self.heap = []
+        self.seen = 0
+
+    def add(self, matches):
+        for match in matches:
+            entry = (match["similarity"], -self.seen, match)
+            self.seen += 1
+            if self.k is None or len(self.heap) < self.k:
+                heapq.heappush(self.heap, entry)
+            elif entry[:2] > self.heap[0][:2]:
+                heapq.heapreplace(self.heap, entry)
+
+    def results(self):
+        """Matches best first"""
+        return [match for _, _, match in sorted(self.heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+def iter_chunk_matches(snapshot, target_skill, skill_list=None, k=None, min_similarity=None,
+                       chunk_size=FIND_SIMILAR_CHUNK_SIZE):
+    """Yield ``(offset, size, matches)`` with the top-k matches of each chunk of skill_list.
+
+    Only one chunk's vectors and scores are held at a time. Without a
+    skill_list the registered catalog index is searched as a single chunk.
+    """
+    if skill_list is None:
+        index = snapshot.index
+        yield 0, len(index), snapshot.top_k(target_skill, index, k=k, min_similarity=min_similarity)
+        return
+
+    for offset in range(0, len(skill_list), chunk_size):
+        chunk = skill_list[offset:offset + chunk_size]
+        index = chunk_index(snapshot, chunk)
+        yield offset, len(chunk), snapshot.top_k(target_skill, index, k=k, min_similarity=min_similarity)
+
+
+def find_similar(snapshot, target_skill, skill_list=None, k=None, min_similarity=None,
+                 chunk_size=FIND_SIMILAR_CHUNK_SIZE):
+    """Top-k matches for target_skill across every chunk, best first"""
+    top = TopK(k)
+    for _, _, matches in iter_chunk_matches(snapshot, target_skill, skill_list, k, min_similarity, chunk_size):
+        top.add(matches)
+    return top.results()
+
+
+def iter_similar_skills(snapshot, target_skill, skill_list=None, k=None, min_similarity=None,
+                        chunk_size=FIND_SIMILAR_CHUNK_SIZE):
+    """Yield NDJSON lines: each chunk's top-k matches as soon as it is scored, then the overall top-k"""
+    top = TopK(k)
+    processed = 0
+    for offset, size, matches in iter_chunk_matches(
+        snapshot, target_skill, skill_list, k, min_similarity, chunk_size
+    ):
+        top.add(matches)
+        processed += size
+        yield json.dumps({"offset": offset, "candidates": size, "similarSkills": matches}) + "\n"
+
+    yield json.dumps({
+        "targetSkill": target_skill,
+        "similarSkills": top.results(),
+        "candidatesProcessed": processed
+    }) + "\n"
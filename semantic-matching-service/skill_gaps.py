@@ -0,0 +1,103 @@
+import json
+import os
+
+import numpy as np
+
+# Upper bound on similarity matrix elements (vocabulary x demand skills) held per block
+SKILL_GAP_BLOCK_ELEMENTS = int(os.getenv("SKILL_GAP_BLOCK_ELEMENTS", "4000000"))
+
+HIGH_URGENCY_PRIORITIES = {"Critical", "High"}
+
+
+def iter_demand_blocks(demands, max_columns):
+    """Group demands so each block's distinct skills fit in max_columns"""
+    block = []
+    block_skills = {}
+    for demand in demands:
+        primary_skill = demand.demandRequirements.get("primarySkill", "")
+        skills = [skill for skill in demand.demandSkills + [primary_skill] if skill not in block_skills]
+        new_skills = list(dict.fromkeys(skills))
+        if block and len(block_skills) + len(new_skills) > max_columns:
+            yield block, block_skills
+            block = []
+            block_skills = {}
+            new_skills = list(dict.fromkeys(demand.demandSkills + [primary_skill]))
+        for skill in new_skills:
+            block_skills[skill] = len(block_skills)
+        block.append(demand)
+    if block:
+        yield block, block_skills
+
+
+def iter_skill_gaps(demands, batch, employee_ids, similarity_matrix, score_candidates,
+                    block_elements=SKILL_GAP_BLOCK_ELEMENTS):
+    """Yield NDJSON lines: one result per demand, then the organization-wide gap summary.
+
+    Demand skills are de-duplicated per block and compared against the
+    de-duplicated employee vocabulary with one matrix product per block, so at
+    most ``block_elements`` similarities are held at a time regardless of how
+    many demands are analyzed.
+    """
+    skill_gaps = {}
+    max_columns = max(1, block_elements // max(len(batch.vocabulary), 1))
+
+    for block, block_skills in iter_demand_blocks(demands, max_columns):
+        block_similarities = similarity_matrix(batch.vocabulary, list(block_skills))
+
+        for demand in block:
+            primary_skill = demand.demandRequirements.get("primarySkill", "")
+            columns = [block_skills[skill] for skill in demand.demandSkills + [primary_skill]]
+            scores = score_candidates(
+                demand.demandSkills,
+                demand.demandRequirements,
+                batch,
+                block_similarities[:, columns]
+            )
+
+            if batch.size:
+                best = int(np.argmax(scores["matchScores"]))
+                best_missing = scores["missing"][best]
+                missing_counts = scores["missing"].sum(axis=0)
+                result = {
+                    "demandId": demand.demandId,
+                    "bestEmployeeId": employee_ids[best],
+                    "bestMatchScore": float(scores["matchScores"][best]),
+                    "bestMatchType": str(scores["matchTypes"][best])
+                }
+            else:
+                best_missing = np.ones(len(demand.demandSkills), dtype=bool)
+                missing_counts = np.zeros(len(demand.demandSkills), dtype=np.int64)
+                result = {
+                    "demandId": demand.demandId,
+                    "bestEmployeeId": None,
+                    "bestMatchScore": 0.0,
+                    "bestMatchType": "Not Eligible"
+                }
+
+            missing_skills = [skill for skill, missing in zip(demand.demandSkills, best_missing) if missing]
+            result["missingSkills"] = missing_skills
+            result["missingSkillFrequencies"] = {
+                skill: int(count) for skill, count in zip(demand.demandSkills, missing_counts) if count
+            }
+
+            # Skills even the best candidate lacks are organization-wide gaps
+            for skill in dict.fromkeys(missing_skills):
+                gap = skill_gaps.setdefault(skill, {
+                    "skill": skill,
+                    "demandCount": 0,
+                    "urgency": "medium",
+                    "affectedDemands": []
+                })
+                gap["demandCount"] += 1
+                gap["affectedDemands"].append(demand.demandId)
+                if demand.priority in HIGH_URGENCY_PRIORITIES:
+                    gap["urgency"] = "high"
+
+            yield json.dumps(result) + "\n"
+
+    summary = sorted(skill_gaps.values(), key=lambda gap: gap["demandCount"], reverse=True)
+    yield json.dumps({
+        "skillGaps": summary,
+        "demandsAnalyzed": len(demands),
+        "candidatesAnalyzed": batch.size
+    }) + "\n"
@@ -0,0 +1,148 @@
+import sys
+
+import numpy as np
+from scipy import sparse
+
+
+def load_skill_catalog(path):
+    """Load a skill catalog file (one skill per line, '#' starts a comment)"""
+    skills = []
+    with open(path, encoding="utf-8") as catalog_file:
+        for line in catalog_file:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                skills.append(line)
+    return skills
+
+
+def top_k_positions(scores, k=None, min_similarity=None):
+    """Indices and scores of the k highest scores at or above min_similarity, best first"""
+    if k is not None and k < 0:
+        raise ValueError(f"k must be non-negative, got {k}")
+    candidates = np.arange(len(scores))
+    if min_similarity is not None:
+        candidates = np.flatnonzero(scores >= min_similarity)
+
+    if k is not None and k < len(candidates):
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        candidate_scores = scores[candidates]
+        kth = -np.partition(-candidate_scores, k - 1)[k - 1]
+        # argpartition picks arbitrary members of a tie at the k-th score;
+        # candidates are in index order, so keep the lowest-indexed ones
+        above = candidates[candidate_scores > kth]
+        tied = candidates[candidate_scores == kth][:k - len(above)]
+        candidates = np.concatenate([above, tied])
+
+    # Highest score first, lowest index for ties
+    order = np.lexsort((candidates, -scores[candidates]))
+    candidates = candidates[order]
+    return candidates, scores[candidates]
+
+
+class SkillIndex:
+    """Exact top-k nearest-skill index over a catalog of skill vectors.
+
+    Rows are stored once as a contiguous, L2-normalized float32 matrix (dense
+    for embeddings, CSR for TF-IDF vectors), so a query is one matrix-vector
+    product followed by ``argpartition`` over the scores.
+    """
+
+    def __init__(self, skills, vectors, version=None, normalized=False):
+        self.skills = list(skills)
+        self.version = version
+
+        if normalized:
+            # Already float32 and L2-normalized (e.g. memory-mapped by from_arrays)
+            self.matrix = vectors
+        elif sparse.issparse(vectors):
+            matrix = sparse.csr_matrix(vectors, dtype=np.float32)
+            norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+            matrix = sparse.diags(1 / np.where(norms == 0, 1, norms)).astype(np.float32) @ matrix
+            self.matrix = matrix.tocsr()
+        else:
+            matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self.matrix = np.ascontiguousarray(matrix / np.where(norms == 0, 1, norms))
+
+        # Lower-cased skill lookups used for exact-match and synonym boosts
+        self.lowered = [skill.lower() for skill in self.skills]
+        self.positions = {}
+        for i, skill in enumerate(self.lowered):
+            self.positions.setdefault(skill.strip(), []).append(i)
+        self._substring_columns = {}
+
+    def __len__(self):
+        return len(self.skills)
+
+    @property
+    def dimensions(self):
+        return self.matrix.shape[1]
+
+    @property
+    def nbytes(self):
+        """Approximate resident bytes of the matrix and the skill strings"""
+        if sparse.issparse(self.matrix):
+            size = self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+        else:
+            size = self.matrix.nbytes
+        # The skills and their lower-cased copies
+        return size + 2 * sum(sys.getsizeof(skill) for skill in self.skills)
+
+    def columns_containing(self, substrings):
+        """Indices of catalog skills that contain any of the substrings (memoized)"""
+        key = tuple(substrings)
+        columns = self._substring_columns.get(key)
+        if columns is None:
+            columns = np.array(
+                [i for i, skill in enumerate(self.lowered) if any(sub in skill for sub in key)],
+                dtype=np.int64
+            )
+            self._substring_columns[key] = columns
+        return columns
+
+    def scores(self, query_vector):
+        """Cosine similarity of one query vector against every catalog skill"""
+        if sparse.issparse(query_vector):
+            query = np.asarray(query_vector.todense(), dtype=np.float32).ravel()
+        else:
+            query = np.asarray(query_vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        return np.asarray(self.matrix @ query, dtype=np.float64).ravel()
+
+    def top_k(self, scores, k=None, min_similarity=None):
+        """Indices and scores of the k best catalog skills, best first"""
+        return top_k_positions(scores, k=k, min_similarity=min_similarity)
+
+    @classmethod
+    def from_arrays(cls, skills, arrays, version=None):
+        """Wrap ``to_arrays`` output without copying or renormalizing it"""
+        if "matrix" in arrays:
+            matrix = arrays["matrix"]
+        else:
+            matrix = sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=tuple(int(n) for n in arrays["shape"]),
+                copy=False
+            )
+        return cls(skills, matrix, version=version, normalized=True)
+
+    def to_arrays(self):
+        """The normalized matrix as plain arrays, ready to be shared or saved"""
+        if sparse.issparse(self.matrix):
+            return {
+                "data": self.matrix.data,
+                "indices": self.matrix.indices,
+                "indptr": self.matrix.indptr,
+                "shape": np.array(self.matrix.shape, dtype=np.int64)
+            }
+        return {"matrix": self.matrix}
+
+    def info(self):
+        return {
+            "size": len(self.skills),
+            "dimensions": self.dimensions,
+            "version": self.version
+        }
@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import os
+import re
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+from embedding_cache import EmbeddingCache, normalize_key
+from metrics import stage, trace_count
+
+logger = logging.getLogger("semantic-matching-service")
+
+# Maximum number of transformed skill vectors kept per model
+VECTOR_CACHE_SIZE = int(os.getenv("SKILL_VECTOR_CACHE_SIZE", "20000"))
+
+# Hashed columns appended after the vocabulary for terms the catalog fit never saw
+OOV_FEATURES = 1024
+
+# Highest similarity reported for two skills that are not the same normalized string
+DISTINCT_SKILL_MAX_SIMILARITY = 0.99
+
+# Raw tokens with digits, + or #, which preprocessing strips ("3d", "c++", "html5")
+SYMBOL_TOKEN_PATTERN = re.compile(r"[a-z0-9+#]*[0-9+#][a-z0-9+#]*")
+
+
+class SkillVectorModel:
+    """TF-IDF skill model that is fitted once over a skill catalog.
+
+    Request-time code only calls ``transform`` on the fitted vectorizer, so
+    the IDF weights come from the whole catalog instead of a two-document
+    corpus. Transformed rows are L2-normalized sparse vectors and are cached
+    per skill, which turns cosine similarity into a sparse dot product.
+
+    Terms outside the fitted vocabulary (and raw tokens like "3d" or "c++"
+    that preprocessing strips) are hashed into ``OOV_FEATURES`` extra columns
+    weighted like the rarest catalog term, so "Salesforce Apex" and
+    "Salesforce" still differ although only "salesforce" was fitted.
+
+    A fitted model is never mutated; refitting builds a new instance with a
+    new ``version`` that callers swap in. Passing an already fitted
+    ``vectorizer`` (see ``from_arrays``) skips the fit.
+    """
+
+    def __init__(self, catalog, preprocess, revision=1, cache_size=VECTOR_CACHE_SIZE, vectorizer=None):
+        self.preprocess = preprocess
+        self.revision = revision
+        self.catalog = sorted({skill.strip() for skill in catalog if skill and skill.strip()})
+        if not self.catalog:
+            raise ValueError("Skill catalog is empty")
+
+        if vectorizer is None:
+            vectorizer = self._new_vectorizer()
+            vectorizer.fit([preprocess(skill) for skill in self.catalog])
+        self.vectorizer = vectorizer
+        self.analyzer = vectorizer.build_analyzer()
+        self.oov_idf = float(np.max(vectorizer.idf_))
+
+        vocabulary = sorted(self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get)
+        fingerprint = hashlib.sha1("\n".join(vocabulary).encode("utf-8"))
+        fingerprint.update(self.vectorizer.idf_.astype(np.float32).tobytes())
+        fingerprint.update(f"oov:{OOV_FEATURES}".encode("utf-8"))
+        self.version = f"tfidf-r{revision}-{fingerprint.hexdigest()[:10]}"
+
+        self.cache = EmbeddingCache(max_entries=cache_size)
+
+        logger.info(
+            f"Loaded skill model {self.version}: {len(self.catalog)} catalog skills, "
+            f"{self.dimensions} features"
+        )
+
+    @staticmethod
+    def _new_vectorizer():
+        # sklearn takes over half a second to import, so only load it with a model
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        return TfidfVectorizer(
+            max_features=5000,
+            stop_words='english',
+            ngram_range=(1, 2)
+        )
+
+    @classmethod
+    def from_arrays(cls, catalog, vocabulary, idf, preprocess, revision=1, cache_size=VECTOR_CACHE_SIZE):
+        """Rebuild a fitted model from ``to_arrays`` output without refitting"""
+        vectorizer = cls._new_vectorizer()
+        vectorizer.vocabulary_ = {term: i for i, term in enumerate(vocabulary)}
+        vectorizer.idf_ = idf
+        return cls(catalog, preprocess, revision=revision, cache_size=cache_size, vectorizer=vectorizer)
+
+    def to_arrays(self):
+        """Vocabulary terms in feature order and the IDF weights"""
+        vocabulary = sorted(self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get)
+        return vocabulary, self.vectorizer.idf_
+
+    def feature_names(self):
+        """Names of every column: the vocabulary, then the hashed OOV buckets"""
+        return self.to_arrays()[0] + [f"#oov-{i}" for i in range(OOV_FEATURES)]
+
+    @property
+    def dimensions(self):
+        return len(self.vectorizer.vocabulary_) + OOV_FEATURES
+
+    def _transform(self, keys):
+        """TF-IDF rows (raw counts times IDF, L2-normalized) for normalized skill keys"""
+        vocabulary = self.vectorizer.vocabulary_
+        idf = self.vectorizer.idf_
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        columns = []
+        weights = []
+        for i, key in enumerate(keys):
+            terms = self.analyzer(self.preprocess(key))
+            for term in terms:
+                column = vocabulary.get(term)
+                if column is not None:
+                    columns.append(column)
+                    weights.append(idf[column])
+                else:
+                    columns.append(self._oov_column(f"t:{term}"))
+                    weights.append(self.oov_idf)
+            for token in SYMBOL_TOKEN_PATTERN.findall(key):
+                columns.append(self._oov_column(f"s:{token}"))
+                weights.append(self.oov_idf)
+            indptr[i + 1] = len(columns)
+
+        matrix = sparse.csr_matrix(
+            (np.array(weights, dtype=np.float64), np.array(columns, dtype=np.int32), indptr),
+            shape=(len(keys), self.dimensions)
+        )
+        matrix.sum_duplicates()
+        rows = np.repeat(np.arange(len(keys)), np.diff(matrix.indptr))
+        norms = np.sqrt(np.bincount(rows, weights=matrix.data ** 2, minlength=len(keys)))
+        matrix.data /= np.where(norms == 0, 1, norms)[rows]
+        return matrix
+
+    def _oov_column(self, feature):
+        # crc32 is stable across processes, so shared snapshots agree on the columns
+        return len(self.vectorizer.vocabulary_) + zlib.crc32(feature.encode("utf-8")) % OOV_FEATURES
+
+    @stage("vectorization")
+    def vectorize(self, skills, cache=True):
+        """Return a CSR matrix with one L2-normalized row per skill; ``cache=False`` keeps misses out of the cache"""
+        keys = [normalize_key(skill) for skill in skills]
+        rows = {}
+        for key in dict.fromkeys(keys):
+            row = self.cache.get(key)
+            if row is not None:
+                rows[key] = row
+
+        misses = [key for key in dict.fromkeys(keys) if key not in rows]
+        trace_count("cacheHits", len(rows))
+        trace_count("cacheMisses", len(misses))
+        if misses:
+            transformed = self._transform(misses)
+            for i, key in enumerate(misses):
+                row = transformed[i]
+                rows[key] = row
+                if cache:
+                    self.cache.put(key, row)
+
+        # Assemble the CSR arrays directly; vstack of many 1-row matrices is slow
+        ordered = [rows[key] for key in keys]
+        indptr = np.zeros(len(ordered) + 1, dtype=np.int64)
+        np.cumsum([row.nnz for row in ordered], out=indptr[1:])
+        if not ordered:
+            return sparse.csr_matrix((0, self.dimensions))
+        return sparse.csr_matrix(
+            (
+                np.concatenate([row.data for row in ordered]),
+                np.concatenate([row.indices for row in ordered]),
+                indptr
+            ),
+            shape=(len(ordered), self.dimensions)
+        )
+
+    def similarity_matrix(self, skills_a, skills_b):
+        """Cosine similarity between every skill in ``skills_a`` and ``skills_b``"""
+        vectors_a = self.vectorize(skills_a)
+        vectors_b = self.vectorize(skills_b)
+        return np.asarray((vectors_a @ vectors_b.T).todense(), dtype=np.float64)
+
+    def similarity(self, skill1, skill2):
+        return float(self.similarity_matrix([skill1], [skill2])[0, 0])
+
+    def info(self):
+        return {
+            "version": self.version,
+            "revision": self.revision,
+            "catalogSize": len(self.catalog),
+            "dimensions": self.dimensions,
+            "cachedVectors": len(self.cache)
+        }
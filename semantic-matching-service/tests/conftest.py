@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The service is a flat set of modules run from its own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Test client for main:app with the engine loaded"""
+    from fastapi.testclient import TestClient
+
+    import main
+    with TestClient(main.app) as test_client:
+        main.engine.load()
+        yield test_client
@@ -0,0 +1,91 @@
+"""Bulk endpoints return what the equivalent single-pair requests do"""
+import pytest
+
+EMPLOYEES = [
+    ("e1", ["Python", "Django", "PostgreSQL"], {"Python": 4, "Django": 2}),
+    ("e2", ["JavaScript", "React", "Node.js"], {"React": 3}),
+    ("e3", [], {}),
+    ("e4", ["Java", "Spring Boot", "Pyhton"], {"Java": 6, "Pyhton": 1}),
+    ("e5", ["Machine Learning", "python"], {"python": 2}),
+]
+
+DEMANDS = [
+    (["Python", "Django", "AWS"], {"primarySkill": "Python", "experienceRange": {"min": 2, "max": 5}}),
+    (["React", "TypeScript"], {"primarySkill": "React", "experienceRange": {"min": 1, "max": 3}}),
+    ([], {"primarySkill": "Java", "experienceRange": {"min": 3, "max": 6}}),
+]
+
+
+def test_batch_matrix_matches_single_pairs(client):
+    skills_a = ["Python", "React", "Pyhton", "Amazon Web Services"]
+    skills_b = ["python", "AWS", "ReactJS", "SQL", "Kubernetes"]
+    batch = client.post("/match-skills/batch", json={"skillsA": skills_a, "skillsB": skills_b}).json()
+
+    assert batch["shape"] == [len(skills_a), len(skills_b)]
+    for i, skill1 in enumerate(skills_a):
+        for j, skill2 in enumerate(skills_b):
+            single = client.post("/match-skills", json={"skill1": skill1, "skill2": skill2}).json()
+            assert batch["similarities"][i][j] == pytest.approx(single["similarity"], abs=1e-6)
+
+
+def test_sparse_batch_keeps_pairs_at_threshold(client):
+    request = {"skillsA": ["Python", "React"], "skillsB": ["python", "SQL", "React Native"]}
+    dense = client.post("/match-skills/batch", json=request).json()["similarities"]
+    sparse = client.post("/match-skills/batch", json={**request, "sparse": True, "threshold": 0.5}).json()
+
+    expected = [(i, j) for i, row in enumerate(dense) for j, value in enumerate(row) if value >= 0.5]
+    assert list(zip(sparse["pairs"]["rows"], sparse["pairs"]["cols"])) == expected
+    assert sparse["pairs"]["values"] == pytest.approx([dense[i][j] for i, j in expected])
+
+
+@pytest.mark.parametrize("demand_skills, requirements", DEMANDS)
+def test_bulk_analysis_matches_single_analysis(client, demand_skills, requirements):
+    bulk = client.post("/analyze-match/bulk", json={
+        "demandSkills": demand_skills,
+        "demandRequirements": requirements,
+        "candidates": [
+            {"employeeId": employee_id, "skills": skills, "experience": experience}
+            for employee_id, skills, experience in EMPLOYEES
+        ]
+    }).json()
+    assert bulk["candidatesScored"] == len(EMPLOYEES)
+
+    singles = {}
+    for employee_id, skills, experience in EMPLOYEES:
+        singles[employee_id] = client.post("/analyze-match", json={
+            "employeeSkills": skills,
+            "employeeExperience": experience,
+            "demandSkills": demand_skills,
+            "demandRequirements": requirements
+        }).json()
+
+    for result in bulk["results"]:
+        single = singles[result["employeeId"]]
+        assert result["matchScore"] == single["matchScore"]
+        assert result["matchType"] == single["matchType"]
+        assert result["missingSkills"] == single["missingSkills"]
+        assert result["primarySkillSimilarity"] == pytest.approx(
+            single["semanticInsights"]["primarySkillSimilarity"], abs=1e-6
+        )
+
+    # Highest score first, request order for equal scores
+    order = [employee_id for employee_id, _, _ in EMPLOYEES]
+    expected = sorted(order, key=lambda employee_id: (-singles[employee_id]["matchScore"], order.index(employee_id)))
+    assert [result["employeeId"] for result in bulk["results"]] == expected
+
+
+def test_bulk_analysis_limit(client):
+    demand_skills, requirements = DEMANDS[0]
+    request = {
+        "demandSkills": demand_skills,
+        "demandRequirements": requirements,
+        "candidates": [
+            {"employeeId": employee_id, "skills": skills, "experience": experience}
+            for employee_id, skills, experience in EMPLOYEES
+        ]
+    }
+    full = client.post("/analyze-match/bulk", json=request).json()["results"]
+    limited = client.post("/analyze-match/bulk", json={**request, "limit": 2}).json()
+
+    assert limited["candidatesScored"] == len(EMPLOYEES)
+    assert limited["results"] == full[:2]
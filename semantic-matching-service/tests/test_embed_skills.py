@@ -0,0 +1,39 @@
+import main
+import transport
+
+
+def test_dense_by_default_for_dense_engines(client):
+    body = client.post("/embed-skills", json={"skills": ["Python", "SQL"]}).json()
+    assert set(body["embeddings"]) == {"Python", "SQL"}
+    assert len(body["embeddings"]["Python"]) == body["dimensions"]
+    assert "sparseEmbeddings" not in body
+
+
+def test_sparse_by_default_for_sparse_engines(client, monkeypatch):
+    monkeypatch.setattr(main.engine, "sparse_vectors", True)
+    body = client.post("/embed-skills", json={"skills": ["Python", "SQL"]}).json()
+    assert "embeddings" not in body
+    assert set(body["sparseEmbeddings"]) == {"Python", "SQL"}
+
+    dense = client.post("/embed-skills", json={"skills": ["Python"], "sparse": False}).json()
+    sparse = body["sparseEmbeddings"]["Python"]
+    assert [dense["embeddings"]["Python"][i] for i in sparse["indices"]] == sparse["values"]
+
+
+def test_binary_output_stays_dense_for_sparse_engines(client, monkeypatch):
+    monkeypatch.setattr(main.engine, "sparse_vectors", True)
+    response = client.post("/embed-skills", json={"skills": ["Python"]}, headers={"Accept": "application/x-npy"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-npy"
+
+
+def test_large_dense_responses_are_rejected(client, monkeypatch):
+    dimensions = client.post("/embed-skills", json={"skills": ["Python"]}).json()["dimensions"]
+    monkeypatch.setattr(transport, "EMBED_MAX_DENSE_VALUES", 2 * dimensions)
+
+    assert client.post("/embed-skills", json={"skills": ["Python", "SQL"]}).status_code == 200
+    for headers in ({}, {"Accept": "application/x-npy"}):
+        response = client.post("/embed-skills", json={"skills": ["Python", "SQL", "Java"]}, headers=headers)
+        assert response.status_code == 400
+        assert "sparse" in response.json()["detail"]
+    assert client.post("/embed-skills", json={"skills": ["Python", "SQL", "Java"], "sparse": True}).status_code == 200
@@ -0,0 +1,102 @@
+"""EmbeddingCache eviction, expiry and byte accounting"""
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+
+import embedding_cache
+from embedding_cache import EmbeddingCache, entry_size
+
+
+def vector(value, dimensions=4):
+    return np.full(dimensions, value, dtype=np.float32)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_keys_are_case_and_whitespace_insensitive():
+    cache = EmbeddingCache(max_entries=10, max_bytes=1 << 20)
+    cache.put("Machine  Learning", vector(1))
+
+    np.testing.assert_array_equal(cache.get(" machine learning "), vector(1))
+    cache.put("MACHINE LEARNING", vector(2))
+    assert len(cache) == 1
+    np.testing.assert_array_equal(cache.get("machine learning"), vector(2))
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EmbeddingCache(max_entries=2, max_bytes=1 << 20)
+    cache.put("Python", vector(1))
+    cache.put("Java", vector(2))
+    # Reading Python makes Java the least recently used
+    cache.get("Python")
+    cache.put("Go", vector(3))
+
+    assert "Java" not in cache
+    assert "Python" in cache and "Go" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses(clock):
+    cache = EmbeddingCache(max_entries=10, max_bytes=1 << 20, ttl_seconds=60)
+    cache.put("Python", vector(1))
+    cache.put("Java", vector(2))
+
+    clock[0] += 30
+    cache.put("Java", vector(3))
+    clock[0] += 31
+    assert cache.get("Python") is None
+    np.testing.assert_array_equal(cache.get("Java"), vector(3))
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+    assert stats["entries"] == 1
+    assert stats["bytes"] == entry_size("java", vector(3))
+
+
+def test_entries_never_expire_without_a_ttl(clock):
+    cache = EmbeddingCache(max_entries=10, max_bytes=1 << 20, ttl_seconds=0)
+    cache.put("Python", vector(1))
+    clock[0] += 10 ** 9
+
+    assert cache.get("Python") is not None
+    assert cache.stats()["ttlSeconds"] is None
+
+
+def test_byte_budget_evicts_oldest_entries():
+    size = entry_size("skill 0", vector(0, 256))
+    cache = EmbeddingCache(max_entries=100, max_bytes=3 * size)
+    for i in range(5):
+        cache.put(f"skill {i}", vector(i, 256))
+
+    assert len(cache) == 3
+    assert [f"skill {i}" in cache for i in range(5)] == [False, False, True, True, True]
+    stats = cache.stats()
+    assert stats["bytes"] == 3 * size <= stats["maxBytes"]
+    assert stats["evictions"] == 2
+
+
+def test_an_entry_larger_than_the_budget_is_not_kept():
+    cache = EmbeddingCache(max_entries=100, max_bytes=1024)
+    cache.put("small", vector(1))
+    cache.put("large", vector(2, 1024))
+
+    assert len(cache) == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_sparse_rows_count_their_arrays():
+    row = csr_matrix(np.arange(8, dtype=np.float64).reshape(1, 8))
+    size = entry_size("python", row)
+
+    assert size >= row.data.nbytes + row.indices.nbytes + row.indptr.nbytes
+    cache = EmbeddingCache(max_entries=10, max_bytes=1 << 20)
+    cache.put("Python", row)
+    assert cache.stats()["bytes"] == size
+
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["bytes"] == 0
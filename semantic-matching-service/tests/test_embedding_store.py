@@ -0,0 +1,159 @@
+"""Append-only embedding store shared by worker processes"""
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import embedding_store
+from embedding_store import EmbeddingStore, open_embedding_store
+
+DIMENSIONS = 4
+
+
+def vector(seed):
+    return np.random.default_rng(seed).standard_normal(DIMENSIONS).astype(np.float32)
+
+
+@pytest.fixture
+def chunk_rows(monkeypatch):
+    monkeypatch.setattr(embedding_store, "EMBEDDING_STORE_CHUNK_ROWS", 4)
+    return 4
+
+
+def open_store(path):
+    return EmbeddingStore(str(path), "test/model", DIMENSIONS, "float32")
+
+
+def test_append_and_get(tmp_path):
+    store = open_store(tmp_path)
+    assert store.get("Python") is None
+
+    store.append("Python", vector(1))
+    store.append(" python ", vector(2))
+
+    assert len(store) == 1
+    np.testing.assert_array_equal(store.get("PYTHON"), vector(1))
+    assert not store.get("Python").flags.writeable
+
+
+def test_reopen_serves_stored_embeddings(tmp_path):
+    store = open_store(tmp_path)
+    for i, skill in enumerate(["Python", "Java", "Go"]):
+        store.append(skill, vector(i))
+
+    reopened = open_embedding_store("test/model", directory=str(tmp_path), precision="float32")
+    assert reopened.dimensions == DIMENSIONS
+    assert len(reopened) == 3
+    for i, skill in enumerate(["Python", "Java", "Go"]):
+        np.testing.assert_array_equal(reopened.get(skill), vector(i))
+
+    with pytest.raises(ValueError):
+        EmbeddingStore(str(tmp_path), "test/model", DIMENSIONS + 1, "float32")
+
+
+def test_file_grows_in_chunks_and_is_remapped_once_per_chunk(tmp_path, chunk_rows, monkeypatch):
+    store = open_store(tmp_path)
+    maps = []
+    memmap = np.memmap
+    monkeypatch.setattr(embedding_store.np, "memmap", lambda *args, **kwargs: maps.append(1) or memmap(*args, **kwargs))
+
+    rows = []
+    for i in range(10):
+        store.append(f"skill {i}", vector(i))
+        rows.append(store.get(f"skill {i}"))
+        assert os.path.getsize(store.matrix_path) == (i // chunk_rows + 1) * chunk_rows * store.row_bytes
+
+    assert len(maps) == 3
+    # Rows handed out earlier stay valid after the file grew
+    for i, row in enumerate(rows):
+        np.testing.assert_array_equal(row, vector(i))
+
+
+def test_an_unindexed_row_is_reused(tmp_path):
+    store = open_store(tmp_path)
+    store.append("Python", vector(1))
+    # A crash between writing a row and its index line leaves the row unindexed
+    with open(store.matrix_path, "r+b") as matrix_file:
+        matrix_file.seek(store.row_bytes)
+        matrix_file.write(vector(9).tobytes()[:5])
+
+    reopened = open_store(tmp_path)
+    reopened.append("Java", vector(2))
+    np.testing.assert_array_equal(open_store(tmp_path).get("Java"), vector(2))
+    assert reopened.get("Python") is not None
+
+
+def test_misses_do_not_reread_an_unchanged_index(tmp_path, monkeypatch):
+    store = open_store(tmp_path)
+    store.append("Python", vector(1))
+    store.get("Rust")
+
+    opened = []
+    monkeypatch.setattr(embedding_store, "open", lambda *args, **kwargs: opened.append(args[0]) or open(*args, **kwargs),
+                        raising=False)
+    for _ in range(5):
+        assert store.get("Rust") is None
+    assert opened == []
+
+    open_store(tmp_path).append("Rust", vector(3))
+    opened.clear()
+    np.testing.assert_array_equal(store.get("Rust"), vector(3))
+    assert opened == [store.index_path]
+
+
+def test_readers_see_appends_from_other_stores(tmp_path, chunk_rows):
+    writer = open_store(tmp_path)
+    reader = open_store(tmp_path)
+
+    for i in range(chunk_rows * 2 + 1):
+        writer.append(f"skill {i}", vector(i))
+        np.testing.assert_array_equal(reader.get(f"skill {i}"), vector(i))
+
+
+def test_concurrent_threads(tmp_path, chunk_rows):
+    store = open_store(tmp_path)
+    errors = []
+
+    def work(offset):
+        try:
+            for i in range(offset, 40, 4):
+                store.append(f"skill {i}", vector(i))
+                for j in range(i + 1):
+                    value = store.get(f"skill {j}")
+                    if value is not None:
+                        np.testing.assert_array_equal(value, vector(j))
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(store) == 40
+
+
+def append_range(path, start, stop):
+    store = open_store(path)
+    for i in range(start, stop):
+        store.append(f"skill {i % 30}", vector(i % 30))
+
+
+def test_concurrent_processes(tmp_path, chunk_rows):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=append_range, args=(tmp_path, start, start + 30)) for start in (0, 10, 20)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    store = open_store(tmp_path)
+    assert len(store) == 30
+    assert sorted(store._rows.values()) == list(range(30))
+    for i in range(30):
+        np.testing.assert_array_equal(store.get(f"skill {i}"), vector(i))
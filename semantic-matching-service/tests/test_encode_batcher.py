@@ -0,0 +1,116 @@
+"""EncodeBatcher merging concurrent requests into shared encode calls"""
+import asyncio
+import time
+
+import pytest
+
+from encode_batcher import EncodeBatcher, Histogram
+
+
+class RecordingEncoder:
+    """Encodes text to its length and records every batch it was called with"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        return [len(text) for text in texts]
+
+
+def test_concurrent_callers_share_one_encode():
+    encoder = RecordingEncoder()
+    batcher = EncodeBatcher(encoder, max_batch_size=64, max_wait_ms=50)
+
+    async def requests():
+        return await asyncio.gather(
+            batcher.encode(["Python", "SQL"]),
+            batcher.encode(["SQL", "Go"]),
+            batcher.encode(["Kubernetes"])
+        )
+
+    results = asyncio.run(requests())
+
+    assert results == [[6, 3], [3, 2], [10]]
+    # Texts requested by several callers are encoded once
+    assert encoder.calls == [["Python", "SQL", "Go", "Kubernetes"]]
+    stats = batcher.stats()
+    assert stats["batchSizes"]["count"] == 1 and stats["batchSizes"]["buckets"]["4"] == 1
+    assert stats["queueDepths"]["buckets"]["4"] == 1
+
+
+def test_batch_is_flushed_at_max_batch_size():
+    encoder = RecordingEncoder()
+    # A wait this long only ends early because the batch fills up
+    batcher = EncodeBatcher(encoder, max_batch_size=4, max_wait_ms=10000)
+
+    async def requests():
+        return await asyncio.gather(*(batcher.encode([f"a{i}", f"b{i}"]) for i in range(4)))
+
+    started = time.monotonic()
+    results = asyncio.run(requests())
+
+    assert time.monotonic() - started < 5
+    assert results == [[2, 2]] * 4
+    assert encoder.calls == [["a0", "b0", "a1", "b1"], ["a2", "b2", "a3", "b3"]]
+
+
+def test_batch_is_flushed_after_max_wait():
+    encoder = RecordingEncoder()
+    batcher = EncodeBatcher(encoder, max_batch_size=64, max_wait_ms=100)
+
+    async def requests():
+        async def later(delay, texts):
+            await asyncio.sleep(delay)
+            return await batcher.encode(texts)
+
+        # The second request joins the open batch; the third arrives after it flushed
+        return await asyncio.gather(batcher.encode(["Python"]), later(0.01, ["Go"]), later(1.0, ["Rust"]))
+
+    assert asyncio.run(requests()) == [[6], [2], [4]]
+    assert encoder.calls == [["Python", "Go"], ["Rust"]]
+
+
+def test_encoder_errors_reach_every_waiting_caller():
+    error = RuntimeError("model unavailable")
+    encoder = RecordingEncoder(error)
+    batcher = EncodeBatcher(encoder, max_batch_size=64, max_wait_ms=50)
+
+    async def requests():
+        results = await asyncio.gather(
+            batcher.encode(["Python"]),
+            batcher.encode(["Go", "Rust"]),
+            return_exceptions=True
+        )
+        # The worker keeps serving requests after a failed batch
+        encoder.error = None
+        return results, await batcher.encode(["SQL"])
+
+    results, after = asyncio.run(requests())
+
+    assert results == [error, error]
+    assert encoder.calls == [["Python", "Go", "Rust"], ["SQL"]]
+    assert after == [3]
+
+
+def test_empty_requests_do_not_encode():
+    encoder = RecordingEncoder()
+    batcher = EncodeBatcher(encoder)
+
+    assert asyncio.run(batcher.encode([])) == []
+    assert encoder.calls == []
+    assert batcher.stats()["queueDepth"] == 0
+
+
+@pytest.mark.parametrize("value, bucket", [(1, "1"), (3, "4"), (256, "256"), (1000, "+Inf")])
+def test_histogram_buckets(value, bucket):
+    histogram = Histogram()
+    histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"][bucket] == 1
+    assert sum(snapshot["buckets"].values()) == 1
+    assert (snapshot["count"], snapshot["sum"]) == (1, value)
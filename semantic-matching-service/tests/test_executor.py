@@ -0,0 +1,127 @@
+"""MatchingExecutor in its thread, process and inline modes"""
+import asyncio
+import os
+import threading
+
+import pytest
+
+from executor import MatchingExecutor
+from metrics import RequestTrace, current_trace, stage
+
+KINDS = ["thread", "process", "inline"]
+
+# Read by process workers, which see the module state as of the fork
+STATE = {"value": 1}
+
+
+@stage("test_work")
+def where(value):
+    return value, os.getpid(), threading.current_thread().name
+
+
+def read_state():
+    return STATE["value"]
+
+
+def count_up(limit):
+    for value in range(limit):
+        yield where(value)
+
+
+@pytest.fixture(params=KINDS)
+def executor(request):
+    executor = MatchingExecutor(request.param, workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_run_uses_the_configured_workers(executor):
+    value, pid, thread = asyncio.run(executor.run(where, 7))
+
+    assert value == 7
+    if executor.kind == "process":
+        assert pid != os.getpid()
+    else:
+        assert pid == os.getpid()
+        assert thread.startswith("matching") == (executor.kind == "thread")
+
+
+def test_iterate_advances_generators_off_the_event_loop(executor):
+    async def collect():
+        return [item async for item in executor.iterate(count_up, 3)]
+
+    items = asyncio.run(collect())
+
+    assert [value for value, _, _ in items] == [0, 1, 2]
+    # Generators stay in this process, in the executor's threads unless inline
+    assert {pid for _, pid, _ in items} == {os.getpid()}
+    assert all(thread.startswith("matching") == (executor.kind != "inline") for _, _, thread in items)
+
+
+def test_iterate_closes_an_abandoned_generator(executor):
+    closed = []
+
+    def numbers():
+        try:
+            yield 1
+            yield 2
+        finally:
+            closed.append(True)
+
+    async def first():
+        iterator = executor.iterate(numbers)
+        item = await iterator.__anext__()
+        await iterator.aclose()
+        return item
+
+    assert asyncio.run(first()) == 1
+    assert closed == [True]
+
+
+def test_worker_stages_are_merged_into_the_request_trace(executor):
+    trace = RequestTrace()
+
+    async def traced():
+        token = current_trace.set(trace)
+        try:
+            await executor.run(where, 1)
+            async for _ in executor.iterate(count_up, 2):
+                pass
+        finally:
+            current_trace.reset(token)
+
+    asyncio.run(traced())
+    assert trace.stages["test_work"][1] == 3
+
+
+def test_worker_errors_reach_the_caller(executor):
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(executor.run(divmod, 1, 0))
+
+
+def test_reset_reforks_process_workers(monkeypatch):
+    executor = MatchingExecutor("process", workers=1)
+    try:
+        assert asyncio.run(executor.run(read_state)) == 1
+        monkeypatch.setitem(STATE, "value", 2)
+        assert asyncio.run(executor.run(read_state)) == 1
+        executor.reset()
+        assert asyncio.run(executor.run(read_state)) == 2
+    finally:
+        executor.shutdown()
+
+
+def test_prepare_runs_before_process_workers_fork():
+    prepared = []
+    executor = MatchingExecutor("process", workers=1, prepare=lambda: prepared.append(True))
+    try:
+        asyncio.run(executor.run(read_state))
+        asyncio.run(executor.run(read_state))
+    finally:
+        executor.shutdown()
+    assert prepared == [True]
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        MatchingExecutor("fiber")
@@ -0,0 +1,47 @@
+import pytest
+
+from hashing_engine import HashedSkillModel, create_hashing_state, word_features
+from scoring import SIMILARITY_THRESHOLD
+from tfidf_engine import default_skill_catalog
+
+
+@pytest.fixture(scope="module")
+def state():
+    return create_hashing_state(default_skill_catalog())
+
+
+@pytest.mark.parametrize("typo, skill", [
+    ("Javscript", "JavaScript"),
+    ("Kubernets", "Kubernetes"),
+    ("Postgresql", "PostgreSQL"),
+    ("Machine Lerning", "Machine Learning"),
+])
+def test_typos_reach_the_threshold(state, typo, skill):
+    assert state.similarity(typo, skill) >= SIMILARITY_THRESHOLD
+
+
+@pytest.mark.parametrize("skill1, skill2", [
+    ("Java Developer", "Python Developer"),
+    ("Java", "JavaScript"),
+    ("React", "Angular"),
+])
+def test_different_skills_stay_below_the_threshold(state, skill1, skill2):
+    assert state.similarity(skill1, skill2) < SIMILARITY_THRESHOLD
+
+
+def test_typo_ranks_its_skill_first(state):
+    assert state.top_k("Pyhton", state.index, k=1)[0]["skill"] == "python"
+
+
+def test_every_word_has_unit_weight():
+    for word in ["c", "go", "developer", "kubernetes"]:
+        _, weights = word_features(word)
+        assert sum(weight * weight for weight in weights) == pytest.approx(1.0)
+
+
+def test_vectors_are_stateless():
+    skills = ["Python", "Data Science", "C++"]
+    first = HashedSkillModel().vectorize(skills)
+    second = HashedSkillModel().vectorize(list(reversed(skills)))[::-1]
+    assert (first != second).nnz == 0
+    assert HashedSkillModel().version == HashedSkillModel().version
@@ -0,0 +1,179 @@
+"""Request traces, Server-Timing and the /metrics page"""
+import re
+
+import pytest
+
+from metrics import STAGE_SECONDS, RequestTrace, current_trace, observe_stages, stage, trace_count
+
+
+@stage("test_stage")
+def traced_work(value):
+    return value * 2
+
+
+@pytest.fixture
+def trace():
+    trace = RequestTrace()
+    token = current_trace.set(trace)
+    yield trace
+    current_trace.reset(token)
+
+
+def stage_count(name):
+    series = STAGE_SECONDS._series.get((name,))
+    return 0 if series is None else series[1]
+
+
+def test_untraced_stages_are_not_timed():
+    before = stage_count("test_stage")
+    assert traced_work(2) == 4
+    trace_count("pairsEvaluated", 5)
+    assert stage_count("test_stage") == before
+
+
+def test_traced_stages_add_up_per_request(trace):
+    before = stage_count("test_stage")
+    for value in range(3):
+        traced_work(value)
+    trace_count("pairsEvaluated", 5)
+    trace_count("pairsEvaluated")
+
+    assert trace.stages["test_stage"][1] == 3
+    assert trace.counts == {"pairsEvaluated": 6}
+    # Calls only add to the trace; the histogram is observed once the request ends
+    assert stage_count("test_stage") == before
+    observe_stages(trace)
+    assert stage_count("test_stage") == before + 1
+
+
+def test_a_failing_stage_is_still_recorded(trace):
+    @stage("test_failure")
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        fail()
+    assert trace.stages["test_failure"][1] == 1
+
+
+def test_server_timing_and_breakdown():
+    trace = RequestTrace()
+    trace.add_stage("similarity", 0.002)
+    trace.add_stage("similarity", 0.001)
+    trace.add_stage("scoring", 0.0005)
+    other = RequestTrace()
+    other.add_stage("scoring", 0.0005, calls=2)
+    other.count("cacheHits", 4)
+    trace.merge(other)
+
+    entries = trace.server_timing().split(", ")
+    assert entries[:2] == ['similarity;dur=3.000;desc="2 calls"', 'scoring;dur=1.000;desc="3 calls"']
+    assert re.fullmatch(r"total;dur=\d+\.\d{3}", entries[2])
+
+    breakdown = trace.breakdown()
+    assert breakdown["stages"] == {"similarity": {"ms": 3.0, "calls": 2}, "scoring": {"ms": 1.0, "calls": 3}}
+    assert breakdown["counts"] == {"cacheHits": 4}
+
+
+def server_timing_stages(header):
+    return {entry.split(";")[0] for entry in header.split(", ")}
+
+
+def test_responses_carry_server_timing(client):
+    response = client.post("/match-skills/batch", json={"skillsA": ["Python", "Java"], "skillsB": ["Go"]})
+
+    assert response.status_code == 200
+    stages = server_timing_stages(response.headers["server-timing"])
+    assert {"similarity", "total"} <= stages
+    assert "debug" not in response.json()
+
+
+def test_debug_trace_adds_the_breakdown_to_json_bodies(client):
+    response = client.post(
+        "/match-skills/batch",
+        json={"skillsA": ["Python", "Java"], "skillsB": ["Go", "SQL"]},
+        headers={"X-Debug-Trace": "1"}
+    )
+
+    debug = response.json()["debug"]
+    assert set(debug["stages"]) == server_timing_stages(response.headers["server-timing"]) - {"total"}
+    assert debug["stages"]["similarity"]["calls"] >= 1
+    assert debug["counts"]["pairsEvaluated"] == 4
+    assert debug["totalMs"] > 0
+
+
+SAMPLE = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*",?)*\})? (\S+)')
+
+
+def parse_metrics(text):
+    """``{(name, labels): value}`` of a Prometheus text page, checking its syntax on the way"""
+    assert text.endswith("\n")
+    samples = {}
+    families = {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name = line.split(" ")[2]
+            assert name not in families, f"{name} is described twice"
+            families[name] = None
+        elif line.startswith("# TYPE "):
+            _, _, name, metric_type = line.split(" ")
+            assert families[name] is None and metric_type in ("counter", "gauge", "histogram")
+            families[name] = metric_type
+        else:
+            match = SAMPLE.fullmatch(line)
+            assert match, f"malformed sample: {line}"
+            name, labels, value = match.groups()
+            family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in families else name
+            assert family in families, f"{name} has no HELP/TYPE"
+            samples[(name, labels or "")] = float(value)
+    return samples
+
+
+def histogram_series(samples, name, labels):
+    """Cumulative bucket counts, sum and count of one histogram series, empty before its first observation"""
+    buckets = [value for (sample, sample_labels), value in samples.items()
+               if sample == f"{name}_bucket" and sample_labels.startswith("{" + labels + ",")]
+    labels = "{" + labels + "}"
+    return buckets, samples.get((f"{name}_sum", labels), 0.0), samples.get((f"{name}_count", labels), 0)
+
+
+def test_metrics_page_is_valid_exposition_format(client):
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    samples = parse_metrics(response.text)
+    assert samples[("semantic_matching_model_ready", '{engine="tfidf"}')] == 1
+    assert samples[("process_resident_memory_bytes", "")] > 0
+
+    buckets, _, count = histogram_series(samples, "semantic_matching_request_duration_seconds",
+                                         'method="GET",endpoint="/health",status="200"')
+    assert buckets == sorted(buckets) and buckets[-1] == count >= 1
+
+
+def test_metrics_count_a_request(client):
+    request_labels = 'method="POST",endpoint="/match-skills/batch",status="200"'
+    vector = '{cache="vector"}'
+
+    def read():
+        samples = parse_metrics(client.get("/metrics").text)
+        lookups = (samples[("semantic_matching_cache_hits_total", vector)]
+                   + samples[("semantic_matching_cache_misses_total", vector)])
+        return (
+            lookups,
+            histogram_series(samples, "semantic_matching_request_duration_seconds", request_labels),
+            histogram_series(samples, "semantic_matching_stage_duration_seconds", 'stage="similarity"')
+        )
+
+    lookups, (_, request_sum, request_count), (_, stage_sum, stage_count) = read()
+    client.post("/match-skills/batch", json={"skillsA": ["Python", "Java"], "skillsB": ["Go"]})
+    after_lookups, (buckets, after_request_sum, after_request_count), (_, after_stage_sum, after_stage_count) = read()
+
+    assert after_request_count == request_count + 1
+    assert after_request_sum > request_sum
+    assert buckets[-1] == after_request_count
+    # One stage observation per request, however many times the stage ran
+    assert after_stage_count == stage_count + 1
+    assert after_stage_sum > stage_sum
+    assert after_lookups == lookups + 3
@@ -0,0 +1,128 @@
+"""OnnxEncoder on a tiny generated model, and against sentence-transformers when a real export is available.
+
+The comparison with sentence-transformers needs ONNX_MODEL_DIR pointing at an
+export of EMBEDDING_MODEL (see the README's ONNX Runtime section).
+"""
+import json
+
+import numpy as np
+import pytest
+
+from matching_engine import load_catalog_skills
+from onnx_encoder import ONNX_MODEL_DIR, OnnxEncoder, find_model_file
+
+VOCAB = ["[PAD]", "[UNK]", "python", "java", "machine", "learning", "sql", "data"]
+DIMENSIONS = 8
+TEXTS = ["Python", "machine learning SQL", "java rust", "Data", "python python data machine learning"]
+
+MODULES = [
+    {"idx": 0, "name": "0", "path": "", "type": "sentence_transformers.models.Transformer"},
+    {"idx": 1, "name": "1", "path": "1_Pooling", "type": "sentence_transformers.models.Pooling"},
+    {"idx": 2, "name": "2", "path": "2_Normalize", "type": "sentence_transformers.models.Normalize"}
+]
+
+
+@pytest.fixture
+def runtime():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("tokenizers")
+
+
+def write_tiny_model(model_dir, modules):
+    """A word-level tokenizer and a graph returning per-token embeddings from a fixed table"""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers
+
+    tokenizer = Tokenizer(models.WordLevel({token: i for i, token in enumerate(VOCAB)}, unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.Lowercase()
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.save(str(model_dir / "tokenizer.json"))
+
+    table = np.random.default_rng(0).standard_normal((len(VOCAB), DIMENSIONS)).astype(np.float32)
+    # Only input_ids is a graph input, so the encoder has to leave out the other inputs
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["embeddings", "input_ids"], ["token_embeddings"])],
+        "tiny",
+        [helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "tokens"])],
+        [helper.make_tensor_value_info("token_embeddings", TensorProto.FLOAT, ["batch", "tokens", DIMENSIONS])],
+        [numpy_helper.from_array(table, "embeddings")]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    (model_dir / "onnx").mkdir()
+    onnx.save(model, str(model_dir / "onnx" / "model.onnx"))
+    if modules is not None:
+        (model_dir / "modules.json").write_text(json.dumps(modules))
+    return table
+
+
+def mean_pooled(table, texts):
+    """The expected embeddings: the mean of each text's token rows, padding excluded"""
+    ids = {token: i for i, token in enumerate(VOCAB)}
+    return np.array([table[[ids.get(word, 1) for word in text.lower().split()]].mean(axis=0) for text in texts])
+
+
+def test_tiny_model_is_mean_pooled_and_normalized(runtime, tmp_path):
+    table = write_tiny_model(tmp_path, MODULES)
+    encoder = OnnxEncoder(str(tmp_path), threads=1)
+
+    # Batches of two pad the shorter text in each
+    embeddings = encoder.encode(TEXTS, batch_size=2)
+
+    expected = mean_pooled(table, TEXTS)
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    assert embeddings.shape == (len(TEXTS), DIMENSIONS)
+    assert embeddings.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1, atol=1e-6)
+    np.testing.assert_allclose(embeddings, expected, atol=1e-5)
+    np.testing.assert_allclose(encoder.encode(TEXTS[1]), expected[1], atol=1e-5)
+
+
+def test_normalization_follows_modules_json(runtime, tmp_path):
+    table = write_tiny_model(tmp_path, MODULES[:2])
+    encoder = OnnxEncoder(str(tmp_path), threads=1)
+
+    assert not encoder.normalize
+    assert encoder.get_sentence_embedding_dimension() == DIMENSIONS
+    np.testing.assert_allclose(encoder.encode(TEXTS), mean_pooled(table, TEXTS), atol=1e-5)
+    assert encoder.encode([]).shape == (0, DIMENSIONS)
+
+
+def test_normalizes_without_modules_json(runtime, tmp_path):
+    write_tiny_model(tmp_path, None)
+
+    assert OnnxEncoder(str(tmp_path), threads=1).normalize
+
+
+def test_find_model_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        find_model_file(str(tmp_path))
+    (tmp_path / "onnx").mkdir()
+    (tmp_path / "onnx" / "model.onnx").touch()
+    assert find_model_file(str(tmp_path)) == str(tmp_path / "onnx" / "model.onnx")
+    (tmp_path / "model.onnx").touch()
+    assert find_model_file(str(tmp_path)) == str(tmp_path / "model.onnx")
+
+
+def test_matches_sentence_transformers(runtime):
+    if not ONNX_MODEL_DIR:
+        pytest.skip("ONNX_MODEL_DIR is not set")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    from transformer_engine import MODEL_NAME
+
+    try:
+        reference = sentence_transformers.SentenceTransformer(MODEL_NAME)
+    except OSError as e:
+        pytest.skip(f"{MODEL_NAME} is not available: {e}")
+    encoder = OnnxEncoder(ONNX_MODEL_DIR, "model.onnx")
+    skills = load_catalog_skills()[:64]
+
+    embeddings = encoder.encode(skills, batch_size=16)
+    expected = reference.encode(skills, batch_size=16)
+
+    assert encoder.get_sentence_embedding_dimension() == reference.get_sentence_embedding_dimension()
+    assert embeddings.shape == expected.shape
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1, atol=1e-5)
+    np.testing.assert_allclose(embeddings, expected, atol=1e-4)
+    np.testing.assert_allclose(embeddings @ embeddings.T, expected @ expected.T, atol=1e-4)
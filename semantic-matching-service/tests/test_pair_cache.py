@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from pair_cache import PairCache
+
+
+class FakeSnapshot:
+    """Snapshot stub that counts how often the engine is asked for a similarity"""
+
+    symmetric_similarity = True
+
+    def __init__(self, version, value=0.5, failures=0):
+        self.version = version
+        self.value = value
+        self.failures = failures
+        self.calls = 0
+
+    @staticmethod
+    def canonical_skill(skill):
+        return skill.lower()
+
+    def similarity(self, skill1, skill2):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("encoder unavailable")
+        return self.value
+
+    def similarity_matrix(self, skills_a, skills_b):
+        self.calls += 1
+        return np.full((len(skills_a), len(skills_b)), self.value)
+
+
+def test_repeated_and_reversed_pairs_hit_the_cache():
+    cache = PairCache()
+    snapshot = FakeSnapshot("v1")
+    assert cache.similarity(snapshot, "Python", "Java") == 0.5
+    assert cache.similarity(snapshot, "java", "python") == 0.5
+    assert snapshot.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_new_model_version_drops_old_entries():
+    cache = PairCache()
+    cache.similarity(FakeSnapshot("v1", value=0.5), "Python", "Java")
+    cache.similarity_matrix(FakeSnapshot("v1", value=0.5), ["Python"], ["Java", "Go"])
+
+    snapshot = FakeSnapshot("v2", value=0.9)
+    assert cache.similarity(snapshot, "Python", "Java") == 0.9
+    assert cache.similarity_matrix(snapshot, ["Python"], ["Java", "Go"]).tolist() == [[0.9, 0.9]]
+    assert snapshot.calls == 2
+    assert cache.stats()["version"] == "v2"
+    assert len(cache) == 3
+
+
+def test_failures_are_not_memoized():
+    cache = PairCache()
+    snapshot = FakeSnapshot("v1", failures=1)
+    with pytest.raises(RuntimeError):
+        cache.similarity(snapshot, "Python", "Java")
+    assert len(cache) == 0
+    assert cache.similarity(snapshot, "Python", "Java") == 0.5
+
+
+def test_eviction_keeps_the_most_recent_pairs():
+    cache = PairCache(max_entries=2)
+    snapshot = FakeSnapshot("v1")
+    for other in ["Java", "Go", "Rust"]:
+        cache.similarity(snapshot, "Python", other)
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+    cache.similarity(snapshot, "Python", "Rust")
+    assert snapshot.calls == 3
+
+
+class RecordingSnapshot(FakeSnapshot):
+    """Similarity is a function of the pair, and every matrix request is recorded"""
+
+    def __init__(self, version):
+        super().__init__(version)
+        self.requests = []
+
+    def similarity_matrix(self, skills_a, skills_b):
+        self.requests.append((list(skills_a), list(skills_b)))
+        return np.array([[len(a) * 10 + len(b) for b in skills_b] for a in skills_a], dtype=np.float64).reshape(
+            len(skills_a), len(skills_b)
+        )
+
+
+def test_only_unknown_rows_and_columns_are_computed():
+    cache = PairCache()
+    snapshot = RecordingSnapshot("v1")
+
+    cache.similarity_matrix(snapshot, ["Go", "Java"], ["SQL", "Rust"])
+    matrix = cache.similarity_matrix(snapshot, ["Go", "Python", "Java"], ["SQL", "Rust", "C"])
+
+    assert snapshot.requests[1:] == [(["Python"], ["SQL", "Rust", "C"]), (["Go", "Java"], ["C"])]
+    assert matrix.tolist() == [[23, 24, 21], [63, 64, 61], [43, 44, 41]]
+
+    snapshot.requests.clear()
+    cache.similarity_matrix(snapshot, ["Go", "Python"], ["SQL", "C"])
+    assert snapshot.requests == []
+
+
+def test_a_missing_row_only_recomputes_that_row():
+    cache = PairCache()
+    snapshot = RecordingSnapshot("v1")
+    cache.similarity_matrix(snapshot, ["Go", "Java"], ["SQL", "Rust"])
+
+    matrix = cache.similarity_matrix(snapshot, ["Go", "Python", "Java"], ["SQL", "Rust"])
+    assert snapshot.requests[1] == (["Python"], ["SQL", "Rust"])
+    assert matrix.tolist() == [[23, 24], [63, 64], [43, 44]]
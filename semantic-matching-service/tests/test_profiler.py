@@ -0,0 +1,106 @@
+"""StackSampler and the admin-only /debug/profile endpoint"""
+import re
+import threading
+import time
+
+import pytest
+
+import main
+from profiler import ProfilerBusy, StackSampler, collapsed_text, thread_group
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", TOKEN)
+    return TOKEN
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    """A thread doing CPU work for the sampler to find"""
+    stop = threading.Event()
+    thread = threading.Thread(target=spin, args=(stop,), name="busy-worker_3")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_sampler_records_collapsed_stacks(busy_thread):
+    stacks, rounds = StackSampler().sample(0.2, interval=0.005)
+
+    assert rounds > 0
+    busy = [stack for stack in stacks if stack.startswith("busy-worker;")]
+    assert busy
+    assert any(re.search(r";spin \(test_profiler\.py:\d+\)", stack) for stack in busy)
+    # The sampling thread itself is left out
+    assert not any("sample (profiler.py" in stack for stack in stacks)
+
+    lines = collapsed_text(stacks).splitlines()
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_only_one_profile_at_a_time():
+    sampler = StackSampler()
+    thread = threading.Thread(target=sampler.sample, args=(0.5,))
+    thread.start()
+    while not sampler._lock.locked():
+        time.sleep(0.001)
+
+    with pytest.raises(ProfilerBusy):
+        sampler.sample(0.01)
+    thread.join()
+    assert sampler.sample(0.01)[1] >= 1
+
+
+@pytest.mark.parametrize("name, group", [
+    ("matching_0", "matching"), ("ThreadPoolExecutor-0_1", "ThreadPoolExecutor"), ("Main Thread", "Main_Thread"), ("7", "thread")
+])
+def test_thread_group(name, group):
+    assert thread_group(name) == group
+
+
+def test_profile_is_hidden_without_an_admin_token(client, monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+
+    assert client.get("/debug/profile", params={"seconds": 0.01}).status_code == 404
+    assert client.get("/debug/profile", params={"seconds": 0.01}, headers={"X-Admin-Token": ""}).status_code == 404
+
+
+def test_profile_rejects_a_wrong_token(client, admin_token):
+    assert client.get("/debug/profile", params={"seconds": 0.01}).status_code == 403
+    response = client.get("/debug/profile", params={"seconds": 0.01}, headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Invalid admin token"
+
+
+def test_profile_returns_collapsed_stacks(client, admin_token, busy_thread):
+    response = client.get("/debug/profile", params={"seconds": 0.2, "intervalMs": 5}, headers={"X-Admin-Token": TOKEN})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert int(response.headers["x-profile-rounds"]) > 0
+    lines = response.text.splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == int(response.headers["x-profile-samples"])
+    assert any(line.startswith("busy-worker;") for line in lines)
+
+
+def test_profile_conflicts_with_a_running_profile(client, admin_token):
+    running = threading.Thread(target=main.stack_sampler.sample, args=(0.5,))
+    running.start()
+    while not main.stack_sampler._lock.locked():
+        time.sleep(0.001)
+
+    response = client.get("/debug/profile", params={"seconds": 0.01}, headers={"X-Admin-Token": TOKEN})
+    running.join()
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "A profile is already being recorded"
@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+import pytest
+
+from profiles import ProfileBatch
+from scoring import analyze_match, score_candidates
+
+SKILLS = ["Python", "Java", "React", "SQL", "Docker", "AWS"]
+
+
+def test_layout_with_empty_profiles():
+    batch = ProfileBatch([
+        ([], {}),
+        (["Python", "SQL"], {"Python": 3}),
+        ([], {}),
+        (["SQL"], {"SQL": 1}),
+        ([], {})
+    ])
+    assert batch.size == 5
+    assert batch.vocabulary == ["Python", "SQL"]
+    assert batch.counts.tolist() == [0, 2, 0, 1, 0]
+    assert batch.skill_ids.tolist() == [0, 1, 1]
+    assert batch.owners.tolist() == [1, 1, 3]
+    assert batch.experience.tolist() == [3, 0, 1]
+    assert batch.non_empty.tolist() == [False, True, False, True, False]
+
+
+def test_segment_reductions_skip_empty_profiles():
+    batch = ProfileBatch([([], {}), (["A", "B"], {}), ([], {}), (["C"], {}), ([], {})])
+    values = np.array([0.2, 0.7, 0.4])
+
+    assert batch.segment_max(values).tolist() == [0, 0.7, 0, 0.4, 0]
+    assert batch.segment_max(values, empty=-1.0).tolist() == [-1, 0.7, -1, 0.4, -1]
+    assert batch.segment_any(values > 0.5).tolist() == [False, True, False, False, False]
+    assert batch.segment_first_argmax(values).tolist() == [-1, 1, -1, 2, -1]
+
+
+def test_segment_first_argmax_keeps_first_of_ties():
+    batch = ProfileBatch([(["A", "B", "C"], {}), (["D", "E"], {})])
+    assert batch.segment_first_argmax(np.array([0.5, 0.9, 0.9, 0.3, 0.3])).tolist() == [1, 3]
+
+
+def test_all_profiles_empty():
+    batch = ProfileBatch([([], {}), ([], {})])
+    assert batch.vocabulary == []
+    assert batch.segment_max(np.zeros((0, 3))).shape == (2, 3)
+    assert batch.segment_any(np.zeros((0, 3), dtype=bool)).tolist() == [[False] * 3] * 2
+    assert batch.segment_first_argmax(np.zeros(0)).tolist() == [-1, -1]
+
+
+def test_no_profiles():
+    batch = ProfileBatch([])
+    assert batch.size == 0
+    assert batch.segment_max(np.zeros(0)).shape == (0,)
+    assert batch.segment_first_argmax(np.zeros(0)).shape == (0,)
+
+
+def test_no_demand_columns():
+    batch = ProfileBatch([(["A"], {}), ([], {}), (["B", "C"], {})])
+    assert batch.segment_any(np.zeros((3, 0), dtype=bool)).shape == (3, 0)
+
+
+def random_profiles(rnd, size):
+    profiles = []
+    for _ in range(size):
+        skills = rnd.sample(SKILLS, rnd.choice([0, 0, 1, 2, 4]))
+        profiles.append((skills, {skill: rnd.randint(0, 8) for skill in skills if rnd.random() < 0.8}))
+    return profiles
+
+
+@pytest.mark.parametrize("rules", ["simple", "weighted"])
+@pytest.mark.parametrize("seed", range(50))
+def test_score_candidates_matches_analyze_match(rules, seed):
+    rnd = random.Random(seed)
+    table = {(a, b): rnd.choice([0.0, 0.3, 0.65, 0.7, 0.85, 1.0]) for a in SKILLS for b in SKILLS}
+    profiles = random_profiles(rnd, rnd.randint(0, 8))
+    # Includes demands with no skills at all
+    demand_skills = rnd.sample(SKILLS, rnd.randint(0, 3))
+    low = rnd.randint(1, 4)
+    requirements = {
+        "primarySkill": rnd.choice(demand_skills or SKILLS),
+        "experienceRange": {"min": low, "max": low + rnd.randint(0, 3)}
+    }
+    columns = demand_skills + [requirements["primarySkill"]]
+
+    def matrix(skills):
+        return np.array([[table[a, b] for b in columns] for a in skills]).reshape(len(skills), len(columns))
+
+    batch = ProfileBatch(profiles)
+    scores = score_candidates(demand_skills, requirements, batch, matrix(batch.vocabulary), rules=rules)
+
+    assert scores["missing"].shape == (len(profiles), len(demand_skills))
+    for i, (skills, experience) in enumerate(profiles):
+        single = analyze_match(skills, experience, demand_skills, requirements, matrix(skills), rules=rules)
+        assert scores["matchScores"][i] == single["matchScore"]
+        assert scores["matchTypes"][i] == single["matchType"]
+        assert scores["primarySimilarities"][i] == single["semanticInsights"]["primarySkillSimilarity"]
+        missing = [skill for skill, flag in zip(demand_skills, scores["missing"][i]) if flag]
+        assert missing == single["missingSkills"]
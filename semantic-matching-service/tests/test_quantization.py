@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from quantization import (
+    PRECISIONS, check_precision, cosine_codes, dequantize, encode_for_transport, quantize, split_int8, stored_width
+)
+
+
+def vectors(count=50, dimensions=384, seed=0):
+    rng = np.random.default_rng(seed)
+    # Uneven per-dimension magnitudes, like sentence-transformer output
+    return (rng.standard_normal((count, dimensions)) * rng.uniform(0.01, 0.3, dimensions)).astype(np.float32)
+
+
+def cosine(a, b):
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+@pytest.mark.parametrize("precision", list(PRECISIONS))
+def test_stored_layout(precision):
+    vector = vectors(1)[0]
+    stored = quantize(vector, precision)
+    assert stored.dtype == PRECISIONS[precision]
+    assert stored.shape == (stored_width(precision, len(vector)),)
+
+
+def test_float32_round_trip_is_exact():
+    vector = vectors(1)[0]
+    assert np.array_equal(dequantize(quantize(vector, "float32")), vector)
+
+
+@pytest.mark.parametrize("precision, tolerance", [("float16", 1e-3), ("int8", 1 / 127)])
+def test_round_trip_error_is_bounded(precision, tolerance):
+    for vector in vectors():
+        restored = dequantize(quantize(vector, precision))
+        assert restored.dtype == np.float32
+        assert np.max(np.abs(restored - vector)) <= tolerance * np.abs(vector).max()
+
+
+def test_int8_uses_the_full_range_and_keeps_the_scale():
+    vector = vectors(1)[0]
+    codes, scale = split_int8(quantize(vector, "int8"))
+    assert np.abs(codes).max() == 127
+    assert scale == pytest.approx(np.abs(vector).max() / 127)
+
+
+def test_int8_zero_and_empty_vectors():
+    codes, scale = split_int8(quantize(np.zeros(8), "int8"))
+    assert not codes.any() and scale == 1.0
+    assert dequantize(quantize(np.zeros(0), "int8")).shape == (0,)
+
+
+@pytest.mark.parametrize("precision, tolerance", [("float32", 1e-6), ("float16", 5e-4), ("int8", 1e-2)])
+def test_cosine_codes_keep_similarities(precision, tolerance):
+    data = vectors()
+    for a, b in zip(data[:-1], data[1:]):
+        stored_a, stored_b = cosine_codes(quantize(a, precision)), cosine_codes(quantize(b, precision))
+        assert cosine(stored_a, stored_b) == pytest.approx(cosine(a, b), abs=tolerance)
+
+
+@pytest.mark.parametrize("precision", list(PRECISIONS))
+def test_transport_round_trip(precision):
+    rows = list(vectors(5))
+    encoded, scales = encode_for_transport(rows, precision)
+    assert (scales is None) == (precision != "int8")
+    for i, row in enumerate(rows):
+        restored = np.array(encoded[i], dtype=np.float32) * (scales[i] if scales else 1)
+        assert np.allclose(restored, row, atol=np.abs(row).max() / 127)
+
+
+def test_unknown_precision():
+    with pytest.raises(ValueError):
+        check_precision("int4")
@@ -0,0 +1,72 @@
+"""/livez and /readyz while the engine loads, after it failed and once it is ready"""
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import transformer_engine
+from test_transformer_engine import FakeEncoder
+
+
+@pytest.fixture
+def loading_engine(monkeypatch):
+    """An eagerly loaded transformer engine whose model load waits for ``release``"""
+    release = threading.Event()
+    outcome = {"error": None}
+
+    def load_encoder():
+        release.wait(5)
+        if outcome["error"] is not None:
+            raise outcome["error"]
+        return FakeEncoder()
+
+    monkeypatch.setattr(transformer_engine, "MODEL_LOAD_MODE", "eager")
+    monkeypatch.setattr(transformer_engine, "load_encoder", load_encoder)
+    engine = transformer_engine.TransformerEngine()
+    engine.embedding_store_failed = True
+    monkeypatch.setattr(main, "engine", engine)
+    return engine, release, outcome
+
+
+def wait_for_status(engine, status):
+    deadline = time.monotonic() + 5
+    while engine.status != status and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert engine.status == status
+
+
+def test_readyz_turns_ready_once_the_model_is_warm(loading_engine):
+    engine, release, _ = loading_engine
+
+    # Entering the client runs the lifespan handler, which starts loading
+    with TestClient(main.app) as client:
+        wait_for_status(engine, "loading")
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["status"] == "loading"
+        assert client.get("/livez").status_code == 200
+
+        release.set()
+        wait_for_status(engine, "ready")
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert "loadSeconds" in response.json()["timings"]
+        assert client.get("/livez").status_code == 200
+
+
+def test_readyz_stays_unavailable_after_a_failed_load(loading_engine):
+    engine, release, outcome = loading_engine
+    outcome["error"] = OSError("model files missing")
+
+    with TestClient(main.app) as client:
+        release.set()
+        wait_for_status(engine, "failed")
+
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["status"] == "failed"
+        assert response.json()["error"] == "model files missing"
+        assert client.get("/livez").json() == {"status": "alive"}
@@ -0,0 +1,230 @@
+"""analyze-match scoring on one similarity matrix vs the original per-pair loops.
+
+The reference functions are the baseline services' analyze-match bodies
+(main.py for "simple", main.original.py for "weighted"), calling
+``similarity`` once per skill pair.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from profiles import ProfileBatch
+from scoring import SIMILARITY_THRESHOLD, analyze_match, determine_match_type, score_candidates
+
+SKILLS = ["Python", "Java", "React", "SQL", "Docker", "AWS", "Go", "Rust"]
+
+# Includes values exactly at the threshold and the quality cut-offs
+SIMILARITY_VALUES = [0.0, 0.2, 0.5, SIMILARITY_THRESHOLD, 0.7, 0.8, 0.93, 1.0]
+
+
+def reference_simple(employee_skills, experience, demand_skills, requirements, similarity):
+    primary_demand_skill = requirements.get("primarySkill", "")
+    min_experience = requirements.get("experienceRange", {}).get("min", 0)
+
+    best_match = {"skill": "", "similarity": 0, "experience": 0}
+    for emp_skill in employee_skills:
+        value = similarity(emp_skill, primary_demand_skill)
+        if value > best_match["similarity"]:
+            best_match = {"skill": emp_skill, "similarity": value, "experience": experience.get(emp_skill, 0)}
+
+    match_score = 0
+    if best_match["similarity"] >= 0.65:
+        exp_score = min(100, (best_match["experience"] / max(min_experience, 1)) * 100)
+        match_score = int((best_match["similarity"] * 70) + (exp_score * 0.3))
+
+    if match_score >= 85:
+        match_type = "Exact"
+    elif match_score >= 70:
+        match_type = "Near"
+    else:
+        match_type = "Not Eligible"
+
+    missing_skills = [
+        demand_skill for demand_skill in demand_skills
+        if not any(similarity(emp_skill, demand_skill) >= 0.65 for emp_skill in employee_skills)
+    ]
+
+    skills_matched = []
+    for emp_skill in employee_skills:
+        for demand_skill in demand_skills:
+            value = similarity(emp_skill, demand_skill)
+            if value >= 0.65:
+                skills_matched.append({
+                    "skill": emp_skill,
+                    "required": demand_skill == primary_demand_skill,
+                    "employeeExperience": experience.get(emp_skill, 0),
+                    "requiredExperience": min_experience,
+                    "similarity": int(value * 100),
+                    "matchQuality": "good" if value >= 0.8 else "fair"
+                })
+
+    return {
+        "matchScore": match_score,
+        "matchType": match_type,
+        "missingSkills": missing_skills,
+        "skillsMatched": skills_matched,
+        "semanticInsights": {
+            "primarySkillSimilarity": best_match["similarity"],
+            "skillGapSeverity": "high" if len(missing_skills) > 2 else "medium" if len(missing_skills) > 0 else "none",
+            "experienceAlignment": "good" if best_match["experience"] >= min_experience else "needs_improvement"
+        }
+    }
+
+
+def reference_weighted(employee_skills, experience, demand_skills, requirements, similarity):
+    primary_demand_skill = requirements.get("primarySkill", "")
+    min_experience = requirements.get("experienceRange", {}).get("min", 0)
+    max_experience = requirements.get("experienceRange", {}).get("max", 5)
+    weights = {"primarySkill": 50, "secondarySkills": 25, "experience": 15, "availability": 10}
+
+    best = {"skill": "", "similarity": 0, "experience": 0}
+    for emp_skill in employee_skills:
+        value = similarity(emp_skill, primary_demand_skill)
+        if value > best["similarity"]:
+            best = {"skill": emp_skill, "similarity": value, "experience": experience.get(emp_skill, 0)}
+
+    if best["similarity"] >= 0.65:
+        emp_exp = best["experience"]
+        if min_experience <= emp_exp <= max_experience:
+            primary_skill_score = weights["primarySkill"] * best["similarity"]
+        elif emp_exp > max_experience:
+            penalty = min(0.1, (emp_exp - max_experience) / max_experience * 0.1)
+            primary_skill_score = weights["primarySkill"] * best["similarity"] * (0.95 - penalty)
+        elif emp_exp >= min_experience * 0.8:
+            primary_skill_score = weights["primarySkill"] * best["similarity"] * (0.7 + (emp_exp / min_experience * 0.25))
+        else:
+            primary_skill_score = weights["primarySkill"] * best["similarity"] * max(0.3, emp_exp / min_experience * 0.6)
+    else:
+        primary_skill_score = weights["primarySkill"] * best["similarity"] * 0.5
+
+    secondary_demand_skills = [skill for skill in demand_skills if skill != primary_demand_skill]
+    if secondary_demand_skills:
+        matched = 0
+        total = 0
+        for demand_skill in secondary_demand_skills:
+            best_match = 0
+            for emp_skill in employee_skills:
+                value = similarity(emp_skill, demand_skill)
+                if value >= 0.65:
+                    best_match = max(best_match, min(1, experience.get(emp_skill, 0) / 2) * value)
+            if best_match > 0:
+                matched += 1
+                total += best_match
+        secondary_skill_score = (
+            weights["secondarySkills"] * (matched / len(secondary_demand_skills)) * (total / matched) if matched else 0
+        )
+    else:
+        secondary_skill_score = weights["secondarySkills"] * 0.8
+
+    if min_experience <= best["experience"] <= max_experience:
+        experience_score = weights["experience"]
+    elif best["experience"] > max_experience:
+        experience_score = weights["experience"] * 0.9
+    else:
+        experience_score = weights["experience"] * max(0.2, best["experience"] / min_experience)
+
+    match_score = primary_skill_score + secondary_skill_score + experience_score + weights["availability"] * 0.8
+    match_score = min(round(match_score), 100)
+
+    missing_skills = [
+        demand_skill for demand_skill in demand_skills
+        if max([similarity(emp_skill, demand_skill) for emp_skill in employee_skills], default=0) < 0.65
+    ]
+
+    skills_matched = []
+    for emp_skill in employee_skills:
+        for demand_skill in demand_skills:
+            value = similarity(emp_skill, demand_skill)
+            if value >= 0.65:
+                is_primary = demand_skill == primary_demand_skill
+                emp_exp = experience.get(emp_skill, 0)
+                req_exp = min_experience if is_primary else 0
+                skills_matched.append({
+                    "skill": emp_skill,
+                    "required": is_primary,
+                    "employeeExperience": emp_exp,
+                    "requiredExperience": req_exp,
+                    "similarity": round(value * 100),
+                    "matchQuality": "good" if emp_exp >= req_exp else "needs_improvement"
+                })
+
+    experience_alignment = (
+        "perfect" if min_experience <= best["experience"] <= max_experience
+        else "over_qualified" if best["experience"] > max_experience else "under_qualified"
+    )
+    return {
+        "matchScore": match_score,
+        "matchType": determine_match_type(match_score, missing_skills),
+        "missingSkills": missing_skills,
+        "skillsMatched": skills_matched,
+        "semanticInsights": {
+            "primarySkillSimilarity": best["similarity"],
+            "skillGapSeverity": "high" if len(missing_skills) > 2 else "medium" if len(missing_skills) > 0 else "none",
+            "experienceAlignment": experience_alignment
+        }
+    }
+
+
+REFERENCES = {"simple": reference_simple, "weighted": reference_weighted}
+
+
+def random_case(rnd):
+    """Employee skills, experience, demand skills, requirements and a pair similarity function"""
+    table = {(a, b): rnd.choice(SIMILARITY_VALUES) for a in SKILLS for b in SKILLS}
+    for skill in SKILLS:
+        table[skill, skill] = 1.0
+    employee_skills = rnd.sample(SKILLS, rnd.randint(0, 5))
+    experience = {skill: rnd.randint(0, 8) for skill in employee_skills if rnd.random() < 0.8}
+    demand_skills = rnd.sample(SKILLS, rnd.randint(0, 4))
+    primary = rnd.choice(demand_skills + SKILLS[:1])
+    low = rnd.randint(1, 5)
+    requirements = {"primarySkill": primary, "experienceRange": {"min": low, "max": low + rnd.randint(0, 4)}}
+    return employee_skills, experience, demand_skills, requirements, lambda a, b: table[a, b]
+
+
+def similarity_matrix(employee_skills, demand_skills, requirements, similarity):
+    columns = demand_skills + [requirements["primarySkill"]]
+    return np.array([[similarity(a, b) for b in columns] for a in employee_skills], dtype=np.float64).reshape(
+        len(employee_skills), len(columns)
+    )
+
+
+@pytest.mark.parametrize("rules", ["simple", "weighted"])
+@pytest.mark.parametrize("seed", range(200))
+def test_matrix_scoring_matches_per_pair_scoring(rules, seed):
+    employee_skills, experience, demand_skills, requirements, similarity = random_case(random.Random(seed))
+    matrix = similarity_matrix(employee_skills, demand_skills, requirements, similarity)
+
+    result = analyze_match(employee_skills, experience, demand_skills, requirements, matrix, rules=rules)
+    expected = REFERENCES[rules](employee_skills, experience, demand_skills, requirements, similarity)
+    assert result == expected
+
+
+@pytest.mark.parametrize("rules", ["simple", "weighted"])
+def test_no_employee_skills(rules):
+    requirements = {"primarySkill": "Python", "experienceRange": {"min": 2, "max": 5}}
+    result = analyze_match([], {}, ["Python", "SQL"], requirements, np.zeros((0, 3)), rules=rules)
+    assert result["missingSkills"] == ["Python", "SQL"]
+    assert result["skillsMatched"] == []
+    assert result["matchType"] == "Not Eligible"
+
+
+@pytest.mark.parametrize("experience_range, experience, expected", [
+    # Over-qualified for an empty range: the full 0.1 penalty instead of x / 0
+    ({"min": 0, "max": 0}, 3, 84),
+    ({"min": 0, "max": 0}, 0, 93),
+    ({"min": 3, "max": 0}, 2, 84),
+    # Under-qualified against a zero minimum
+    ({"min": 0, "max": 4}, -1, 46),
+])
+def test_weighted_scoring_with_zero_experience_bounds(experience_range, experience, expected):
+    requirements = {"primarySkill": "Python", "experienceRange": experience_range}
+    profile = (["Python"], {"Python": experience})
+    matrix = np.ones((1, 2))
+
+    single = analyze_match(*profile, ["Python"], requirements, matrix, rules="weighted")
+    bulk = score_candidates(["Python"], requirements, ProfileBatch([profile]), matrix, rules="weighted")
+
+    assert single["matchScore"] == expected
+    assert bulk["matchScores"][0] == expected
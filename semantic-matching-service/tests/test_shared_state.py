@@ -0,0 +1,128 @@
+"""Snapshots shared between worker processes through SHARED_STATE_DIR"""
+import fcntl
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import tfidf_engine
+from shared_state import SharedStateDirectory, state_key
+
+
+def test_published_snapshot_is_mapped_read_only_by_other_workers(tmp_path):
+    writer = SharedStateDirectory(str(tmp_path), "key")
+    reader = SharedStateDirectory(str(tmp_path), "key")
+    assert reader.current() is None
+    assert reader.load() == (None, None)
+
+    with writer.lock():
+        name = writer.publish({"idf": np.arange(4, dtype=np.float32)}, {"revision": 1})
+
+    assert reader.changed()
+    arrays, meta = reader.load()
+    assert not reader.changed()
+    assert meta == {"revision": 1, "arrays": ["idf"]}
+    assert isinstance(arrays["idf"], np.memmap)
+    assert not arrays["idf"].flags.writeable
+    np.testing.assert_array_equal(arrays["idf"], np.arange(4))
+    assert reader.stats()["snapshot"] == name
+
+    with writer.lock():
+        newer = writer.publish({"idf": np.ones(2)}, {"revision": 2})
+    assert newer != name
+    assert not os.path.exists(os.path.join(writer.directory, name))
+    assert reader.changed()
+    # The replaced snapshot stays readable through existing mappings
+    np.testing.assert_array_equal(arrays["idf"], np.arange(4))
+    assert reader.load()[1]["revision"] == 2
+
+
+def test_snapshots_are_kept_per_key(tmp_path):
+    first = SharedStateDirectory(str(tmp_path), "tfidf-a")
+    with first.lock():
+        first.publish({"idf": np.zeros(1)}, {})
+
+    assert SharedStateDirectory(str(tmp_path), "tfidf-b").current() is None
+    assert SharedStateDirectory(str(tmp_path), "tfidf-a").current() is not None
+
+
+def test_state_key_follows_catalog_and_code():
+    key = state_key("tfidf", ["python", "java"], (tfidf_engine,))
+    assert key == state_key("tfidf", ["python", "java"], (tfidf_engine,))
+    assert key.startswith("tfidf-")
+    assert key != state_key("tfidf", ["python", "go"], (tfidf_engine,))
+    assert key != state_key("tfidf", ["python", "java"], (tfidf_engine, np))
+
+
+def test_lock_is_reentrant_and_excludes_other_threads(tmp_path):
+    shared = SharedStateDirectory(str(tmp_path))
+    events = []
+
+    def contend():
+        with shared.lock():
+            events.append("other")
+
+    with shared.lock():
+        with shared.lock():
+            thread = threading.Thread(target=contend)
+            thread.start()
+            time.sleep(0.05)
+            events.append("owner")
+    thread.join()
+
+    assert events == ["owner", "other"]
+
+
+def try_lock(lock_path, result):
+    with open(lock_path, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            result.value = 1
+        except BlockingIOError:
+            result.value = 0
+
+
+@pytest.mark.parametrize("held", [True, False])
+def test_lock_excludes_other_processes(tmp_path, held):
+    shared = SharedStateDirectory(str(tmp_path))
+    result = multiprocessing.Value("i", -1)
+    process = multiprocessing.get_context("fork").Process(target=try_lock, args=(shared.lock_path, result))
+
+    if held:
+        with shared.lock():
+            process.start()
+            process.join()
+    else:
+        open(shared.lock_path, "a").close()
+        process.start()
+        process.join()
+
+    assert result.value == (0 if held else 1)
+
+
+def test_second_engine_maps_the_state_the_first_published(tmp_path, monkeypatch):
+    monkeypatch.setattr(tfidf_engine, "SHARED_STATE_DIR", str(tmp_path))
+    first = tfidf_engine.TfidfEngine()
+    second = tfidf_engine.TfidfEngine()
+    assert first.shared_state.directory == os.path.join(str(tmp_path), tfidf_engine.shared_state_key())
+
+    published = first.snapshot()
+    fitted = []
+    monkeypatch.setattr(tfidf_engine, "create_tfidf_state", lambda catalog: fitted.append(catalog))
+    mapped = second.snapshot()
+
+    assert fitted == []
+    assert mapped.version == published.version
+    assert mapped.index.skills == published.index.skills
+    np.testing.assert_allclose(
+        mapped.similarity_matrix(["Python", "React"], ["python", "JavaScript"]),
+        published.similarity_matrix(["Python", "React"], ["python", "JavaScript"])
+    )
+
+    # A worker running other code gets a key of its own and fits its own state
+    monkeypatch.setattr(tfidf_engine, "shared_state_key", lambda: "tfidf-other")
+    other = tfidf_engine.TfidfEngine()
+    assert other.shared_state.current() is None
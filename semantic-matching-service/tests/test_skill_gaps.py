@@ -0,0 +1,162 @@
+"""Skill gap analysis: demand blocking, gap bookkeeping and the NDJSON stream"""
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+from profiles import ProfileBatch
+from scoring import score_candidates
+from skill_gaps import iter_demand_blocks, iter_skill_gaps
+
+
+def demand(demand_id, skills, primary, priority=None):
+    return SimpleNamespace(
+        demandId=demand_id,
+        demandSkills=skills,
+        demandRequirements={"primarySkill": primary, "experienceRange": {"min": 1, "max": 5}},
+        priority=priority
+    )
+
+
+class ExactSimilarity:
+    """Skills are similar only to themselves; every matrix request is recorded"""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, skills_a, skills_b):
+        self.requests.append((list(skills_a), list(skills_b)))
+        return np.array(
+            [[1.0 if a.lower() == b.lower() else 0.0 for b in skills_b] for a in skills_a], dtype=np.float64
+        ).reshape(len(skills_a), len(skills_b))
+
+
+def run(demands, profiles, block_elements=1000):
+    similarity = ExactSimilarity()
+    batch = ProfileBatch(profiles)
+    employee_ids = [f"e{i}" for i in range(len(profiles))]
+    lines = [json.loads(line) for line in iter_skill_gaps(
+        demands, batch, employee_ids, similarity, score_candidates, block_elements=block_elements
+    )]
+    return lines, similarity.requests
+
+
+def test_blocks_hold_at_most_max_columns_distinct_skills():
+    demands = [
+        demand("d1", ["Python", "SQL"], "Python"),
+        demand("d2", ["SQL", "AWS"], "AWS"),
+        demand("d3", ["Go", "Rust"], "Go"),
+        demand("d4", ["Java", "Spring", "Kafka", "Docker"], "Java"),
+    ]
+    blocks = list(iter_demand_blocks(demands, max_columns=3))
+
+    assert [[d.demandId for d in block] for block, _ in blocks] == [["d1", "d2"], ["d3"], ["d4"]]
+    assert [list(skills) for _, skills in blocks] == [
+        ["Python", "SQL", "AWS"],
+        ["Go", "Rust"],
+        # A demand wider than a block still gets a block of its own
+        ["Java", "Spring", "Kafka", "Docker"],
+    ]
+    for _, skills in blocks:
+        assert list(skills.values()) == list(range(len(skills)))
+
+
+def test_each_block_is_one_matrix_request_over_its_distinct_skills():
+    demands = [demand("d1", ["Python", "SQL"], "Python"), demand("d2", ["SQL", "Go"], "Go")]
+    profiles = [(["Python", "SQL"], {"Python": 3}), (["Go"], {"Go": 2})]
+
+    _, requests = run(demands, profiles, block_elements=3 * 3)
+    assert requests == [(["Python", "SQL", "Go"], ["Python", "SQL", "Go"])]
+
+    _, requests = run(demands, profiles, block_elements=3 * 2)
+    assert [columns for _, columns in requests] == [["Python", "SQL"], ["SQL", "Go"]]
+
+
+def test_a_skill_listed_twice_is_one_gap_per_demand():
+    lines, _ = run([demand("d1", ["Kafka", "Kafka", "Python"], "Python")], [(["Python"], {"Python": 3})])
+
+    assert lines[0]["missingSkills"] == ["Kafka", "Kafka"]
+    assert lines[-1]["skillGaps"] == [
+        {"skill": "Kafka", "demandCount": 1, "urgency": "medium", "affectedDemands": ["d1"]}
+    ]
+
+
+def test_gaps_are_ordered_by_demand_count_and_urgent_if_any_demand_is():
+    demands = [
+        demand("d1", ["Python", "Kafka"], "Python", priority="Low"),
+        demand("d2", ["Python", "Kafka", "Rust"], "Python", priority="High"),
+        demand("d3", ["Python", "Kafka", "Go"], "Python"),
+    ]
+    lines, _ = run(demands, [(["Python"], {"Python": 3})])
+
+    assert lines[-1]["skillGaps"] == [
+        {"skill": "Kafka", "demandCount": 3, "urgency": "high", "affectedDemands": ["d1", "d2", "d3"]},
+        {"skill": "Rust", "demandCount": 1, "urgency": "high", "affectedDemands": ["d2"]},
+        {"skill": "Go", "demandCount": 1, "urgency": "medium", "affectedDemands": ["d3"]},
+    ]
+
+
+def test_the_best_candidate_decides_the_gaps():
+    profiles = [(["SQL"], {"SQL": 3}), (["Python", "SQL"], {"Python": 3, "SQL": 3}), ([], {})]
+    lines, _ = run([demand("d1", ["Python", "SQL", "AWS"], "Python")], profiles)
+
+    assert lines[0]["bestEmployeeId"] == "e1"
+    assert lines[0]["missingSkills"] == ["AWS"]
+    assert lines[0]["missingSkillFrequencies"] == {"Python": 2, "SQL": 1, "AWS": 3}
+
+
+def test_no_candidates_leave_every_demand_skill_missing():
+    lines, requests = run([demand("d1", ["Python", "SQL"], "Python", priority="Critical")], [])
+
+    assert lines[0] == {
+        "demandId": "d1",
+        "bestEmployeeId": None,
+        "bestMatchScore": 0.0,
+        "bestMatchType": "Not Eligible",
+        "missingSkills": ["Python", "SQL"],
+        "missingSkillFrequencies": {}
+    }
+    assert [gap["urgency"] for gap in lines[-1]["skillGaps"]] == ["high", "high"]
+    assert lines[-1]["candidatesAnalyzed"] == 0
+    assert requests == [([], ["Python", "SQL"])]
+
+
+def test_no_demands_stream_only_the_summary():
+    lines, requests = run([], [(["Python"], {})])
+
+    assert lines == [{"skillGaps": [], "demandsAnalyzed": 0, "candidatesAnalyzed": 1}]
+    assert requests == []
+
+
+def test_endpoint_streams_one_line_per_demand_then_the_summary(client):
+    demands = [
+        {"demandId": "d1", "demandSkills": ["Python", "Kubernetes"], "priority": "High",
+         "demandRequirements": {"primarySkill": "Python", "experienceRange": {"min": 2, "max": 5}}},
+        {"demandId": "d2", "demandSkills": ["React"],
+         "demandRequirements": {"primarySkill": "React", "experienceRange": {"min": 1, "max": 3}}},
+    ]
+    candidates = [
+        {"employeeId": "e1", "skills": ["Python", "Django"], "experience": {"Python": 4}},
+        {"employeeId": "e2", "skills": ["React"], "experience": {"React": 2}},
+    ]
+    response = client.post("/skill-gaps", json={"demands": demands, "candidates": candidates})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["demandId"] for line in lines[:-1]] == ["d1", "d2"]
+    assert lines[0]["bestEmployeeId"] == "e1"
+    assert lines[1]["bestEmployeeId"] == "e2"
+    assert lines[-1]["demandsAnalyzed"] == 2
+    assert lines[-1]["candidatesAnalyzed"] == 2
+    assert {"skill": "Kubernetes", "demandCount": 1, "urgency": "high", "affectedDemands": ["d1"]} in \
+        lines[-1]["skillGaps"]
+
+
+def test_endpoint_with_no_demands_or_candidates(client):
+    response = client.post("/skill-gaps", json={"demands": [], "candidates": []})
+
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"skillGaps": [], "demandsAnalyzed": 0, "candidatesAnalyzed": 0}
+    ]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from similar_skills import TopK, find_similar
+from skill_index import top_k_positions
+
+
+def test_top_k_positions_best_first_with_index_ties():
+    positions, scores = top_k_positions(np.array([0.2, 0.9, 0.5, 0.9]), k=3)
+    assert positions.tolist() == [1, 3, 2]
+    assert scores.tolist() == [0.9, 0.9, 0.5]
+
+
+def test_top_k_positions_zero_and_min_similarity():
+    scores = np.array([0.2, 0.9, 0.5])
+    assert top_k_positions(scores, k=0)[0].tolist() == []
+    assert top_k_positions(scores, min_similarity=0.5)[0].tolist() == [1, 2]
+
+
+def test_negative_k_is_rejected():
+    with pytest.raises(ValueError):
+        top_k_positions(np.array([0.2, 0.9]), k=-1)
+    with pytest.raises(ValueError):
+        TopK(-1)
+
+
+def test_chunked_search_matches_a_single_index(client):
+    import main
+
+    snapshot = main.engine.snapshot()
+    skills = [f"python {i}" for i in range(50)] + ["Python", "Java", "Django"]
+    single = snapshot.top_k("python", snapshot.build_index(skills), k=5)
+    assert find_similar(snapshot, "python", skills, k=5, chunk_size=7) == single
+
+
+def test_find_similar_skills_rejects_negative_k(client):
+    response = client.post("/find-similar-skills", json={"targetSkill": "Python", "skillList": ["Java"], "k": -1})
+    assert response.status_code == 422
+
+
+def test_ties_at_the_kth_score_keep_the_lowest_indices():
+    scores = np.array([1.0] + [0.5] * 50)
+    assert top_k_positions(scores, k=5)[0].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_long_lists_reuse_chunk_indexes_without_filling_the_vector_cache(client):
+    import main
+    from similar_skills import chunk_indexes
+
+    snapshot = main.engine.snapshot()
+    skills = [f"kotlin {i}" for i in range(40)]
+    cached_vectors = len(snapshot.model.cache)
+    first = find_similar(snapshot, "kotlin", skills, k=3, chunk_size=16)
+    hits = chunk_indexes.hits
+    assert find_similar(snapshot, "kotlin", skills, k=3, chunk_size=16) == first
+    assert chunk_indexes.hits == hits + 3
+    assert len(snapshot.model.cache) == cached_vectors
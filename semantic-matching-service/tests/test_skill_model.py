@@ -0,0 +1,64 @@
+import pytest
+
+from scoring import SIMILARITY_THRESHOLD
+from skill_model import DISTINCT_SKILL_MAX_SIMILARITY
+from tfidf_engine import create_tfidf_state, default_skill_catalog
+
+# Scores of the original per-pair TF-IDF fit (two-document corpus per pair)
+BASELINE_SCORES = [
+    ("Salesforce Apex", "Salesforce", 0.449),
+    ("Solidity", "Solidity smart contracts", 0.335),
+    ("Blender 3D", "Blender", 1.0),
+    ("SAP ABAP", "ABAP", 0.449),
+    ("React", "React Native", 0.791),
+    ("Machine Learning", "Deep Learning", 0.202),
+]
+
+
+@pytest.fixture(scope="module")
+def state():
+    return create_tfidf_state(default_skill_catalog())
+
+
+@pytest.mark.parametrize("skill1, skill2, baseline", BASELINE_SCORES)
+def test_partly_unknown_skills_keep_the_baseline_decision(state, skill1, skill2, baseline):
+    similarity = state.similarity(skill1, skill2)
+    assert 0 < similarity < 1.0
+    assert (similarity >= SIMILARITY_THRESHOLD) == (baseline >= SIMILARITY_THRESHOLD)
+
+
+@pytest.mark.parametrize("skill1, skill2", [
+    ("Java Developer", "java developers"),
+    ("Blender 3D", "Blender"),
+    ("HTML", "HTML5"),
+])
+def test_different_skills_never_score_exact(state, skill1, skill2):
+    assert state.similarity(skill1, skill2) <= DISTINCT_SKILL_MAX_SIMILARITY
+    assert state.similarity(skill2, skill1) <= DISTINCT_SKILL_MAX_SIMILARITY
+
+
+def test_same_skill_is_exact(state):
+    assert state.similarity("Salesforce Apex", " salesforce apex ") == 1.0
+
+
+def test_unknown_terms_only_match_themselves(state):
+    assert state.similarity("Kubeflow", "Kubeflow Pipelines") > 0
+    assert state.similarity("Kubeflow", "Airbyte") == 0
+
+
+def test_top_k_agrees_with_similarity(state):
+    skills = ["Blender", "Blender 3D", "Salesforce", "ABAP"]
+    index = state.build_index(skills)
+    for match in state.top_k("Salesforce Apex", index):
+        assert match["similarity"] == pytest.approx(state.similarity("Salesforce Apex", match["skill"]), abs=1e-6)
+
+
+def test_oov_columns_survive_a_shared_snapshot(state):
+    from skill_model import SkillVectorModel
+    from tfidf_engine import build_skill_text
+
+    vocabulary, idf = state.model.to_arrays()
+    model = SkillVectorModel.from_arrays(state.model.catalog, vocabulary, idf, build_skill_text)
+    assert model.version == state.version
+    assert model.similarity("SAP ABAP", "ABAP") == pytest.approx(state.model.similarity("SAP ABAP", "ABAP"))
+    assert len(state.vocabulary()) == state.dimensions
@@ -0,0 +1,84 @@
+"""The bundled tokenizer and stopwords vs nltk's word_tokenize and stopword corpus.
+
+``fixtures/nltk_english_stopwords.txt`` is nltk_data's
+``corpora/stopwords/english`` (179 words, as of NLTK 3.8), so the comparison
+runs without downloading corpora. Newer NLTK releases add contractions such
+as "he'd"; preprocessing strips apostrophes, so those never match a token.
+"""
+import os
+import re
+
+import pytest
+
+from tfidf_engine import default_skill_catalog, expand_skill_with_synonyms, preprocess_text
+from text_processing import STOP_WORDS, get_stemmer, tokenize
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Skills whose punctuation preprocessing strips, and words the Treebank rules split
+SPECIAL_SKILLS = [
+    "C++", "C#", "Node.js", "CI/CD", ".NET", "ASP.NET Core", "F#", "Objective-C", "3D Modeling",
+    "Vue.js 3", "TCP/IP", "R&D", "Cannot Fail Systems", "Gonna Wanna Gotta", "lemme gimme", "Don't Repeat Yourself"
+]
+
+
+def nltk_stopwords():
+    with open(os.path.join(FIXTURES, "nltk_english_stopwords.txt")) as stopwords_file:
+        return set(stopwords_file.read().split())
+
+
+def reference_preprocess(text, stop_words):
+    """The original preprocess_text: nltk's word_tokenize and stopword corpus"""
+    from nltk.tokenize import word_tokenize
+
+    text = re.sub(r'[^a-zA-Z\s]', '', text.lower().strip())
+    # punkt only splits sentences, and letters-and-whitespace text has no
+    # sentence punctuation, so skipping it leaves the tokens unchanged
+    tokens = word_tokenize(text, preserve_line=True)
+    stemmer = get_stemmer()
+    return ' '.join(stemmer.stem(token) for token in tokens if token not in stop_words)
+
+
+def catalog_texts():
+    skills = list(dict.fromkeys(default_skill_catalog() + SPECIAL_SKILLS))
+    return skills + [expand_skill_with_synonyms(skill) for skill in skills]
+
+
+def test_bundled_stopwords_match_nltk():
+    assert STOP_WORDS == nltk_stopwords()
+
+
+def test_bundled_stopwords_match_the_installed_corpus():
+    nltk = pytest.importorskip("nltk")
+    try:
+        corpus = set(nltk.corpus.stopwords.words("english"))
+    except LookupError:
+        pytest.skip("nltk stopwords corpus is not downloaded")
+    # Words with apostrophes never survive preprocessing
+    assert {word for word in corpus if "'" not in word} == {word for word in STOP_WORDS if "'" not in word}
+
+
+@pytest.mark.parametrize("skill, tokens", [
+    ("C++", ["c"]),
+    ("C#", ["c"]),
+    ("Node.js", ["nodejs"]),
+    ("CI/CD", ["cicd"]),
+    ("cannot", ["can", "not"]),
+    ("wanna code", ["wan", "na", "code"]),
+])
+def test_punctuation_and_contractions(skill, tokens):
+    assert tokenize(re.sub(r'[^a-zA-Z\s]', '', skill.lower())) == tokens
+
+
+def test_tokenize_matches_word_tokenize_over_the_catalog():
+    word_tokenize = pytest.importorskip("nltk.tokenize").word_tokenize
+    for text in catalog_texts():
+        text = re.sub(r'[^a-zA-Z\s]', '', text.lower().strip())
+        assert tokenize(text) == word_tokenize(text, preserve_line=True), text
+
+
+def test_preprocessing_matches_the_nltk_pipeline_over_the_catalog():
+    pytest.importorskip("nltk")
+    stop_words = nltk_stopwords()
+    for text in catalog_texts():
+        assert preprocess_text(text) == reference_preprocess(text, stop_words), text
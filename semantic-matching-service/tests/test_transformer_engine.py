@@ -0,0 +1,52 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from transformer_engine import TransformerEngine
+
+
+class FakeEncoder:
+    """Deterministic stand-in for the sentence-transformer model"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+    def encode(self, texts, batch_size=None):
+        self.encoded.extend(texts)
+        return np.array([np.random.default_rng(len(text)).random(8) for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def engine():
+    engine = TransformerEngine()
+    engine.model = FakeEncoder()
+    engine.embedding_store_failed = True
+    return engine
+
+
+def test_prepared_misses_are_counted_once(engine):
+    asyncio.run(engine.prepare(["Python", "Java"]))
+    engine.similarity("Python", "Java")
+    assert engine.model.encoded == ["java", "python"]
+    assert (engine.embedding_cache.hits, engine.embedding_cache.misses) == (0, 2)
+
+    asyncio.run(engine.prepare(["Python", "Java"]))
+    engine.similarity("Python", "Java")
+    assert (engine.embedding_cache.hits, engine.embedding_cache.misses) == (2, 2)
+    assert not engine.prepared_keys
+
+
+def test_similarity_matrix_looks_each_skill_up_once(engine):
+    engine.similarity_matrix(["Python"], ["Java", "Go"])
+    engine.similarity_matrix(["Python"], ["Java", "Go"])
+    assert (engine.embedding_cache.hits, engine.embedding_cache.misses) == (3, 3)
+
+
+def test_matrix_matches_pairwise_similarity(engine):
+    matrix = engine.similarity_matrix(["Python", "Java"], ["Go", "Rust", "Python"])
+    assert matrix[0, 1] == pytest.approx(engine.similarity("Python", "Rust"), abs=1e-6)
+    assert matrix[0, 2] == pytest.approx(1.0, abs=1e-6)
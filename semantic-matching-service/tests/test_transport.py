@@ -0,0 +1,30 @@
+import io
+
+import numpy as np
+import pytest
+
+from transport import MEDIA_ARROW, MEDIA_NPY, MEDIA_RAW, encode_matrix, negotiate
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("*/*", None),
+    ("application/json", None),
+    ("application/x-npy", MEDIA_NPY),
+    ("application/json, application/x-npy", None),
+    ("application/x-npy, application/json", MEDIA_NPY),
+    ("application/json;q=0.1, application/x-npy", MEDIA_NPY),
+    ("application/x-npy;q=0.5, application/json;q=0.9", None),
+    ("application/octet-stream;q=0.8, application/vnd.apache.arrow.stream;q=0.9", MEDIA_ARROW),
+    ("application/x-npy;q=0, application/octet-stream", MEDIA_RAW),
+    ("application/x-npy;q=oops, application/json", None),
+    ("Application/X-NPY; charset=binary", MEDIA_NPY),
+])
+def test_negotiate_follows_q_values(accept, expected):
+    assert negotiate(accept) == expected
+
+
+def test_npy_round_trip():
+    matrix = np.arange(6, dtype=np.float32).reshape(2, 3)
+    result = encode_matrix(matrix, MEDIA_NPY, ["a", "b"])
+    assert np.array_equal(np.load(io.BytesIO(result.body)), matrix)
@@ -0,0 +1,70 @@
+import logging
+import re
+import threading
+
+logger = logging.getLogger("semantic-matching-service")
+
+# NLTK's English stopword list, bundled so startup never needs nltk.download
+STOP_WORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours
+yourself yourselves he him his himself she she's her hers herself it it's its
+itself they them their theirs themselves what which who whom this that that'll
+these those am is are was were be been being have has had having do does did
+doing a an the and but if or because as until while of at by for with about
+against between into through during before after above below to from up down in
+out on off over under again further then once here there when where why how all
+any both each few more most other some such no nor not only own same so than too
+very s t can will just don don't should should've now d ll m o re ve y ain aren
+aren't couldn couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven
+haven't isn isn't ma mightn mightn't mustn mustn't needn needn't shan shan't
+shouldn shouldn't wasn wasn't weren weren't won won't wouldn wouldn't
+""".split())
+
+# Contractions nltk's word_tokenize splits even in text without punctuation
+CONTRACTIONS = [
+    re.compile(pattern) for pattern in (
+        r"(?i)\b(can)(not)\b",
+        r"(?i)\b(d)('ye)\b",
+        r"(?i)\b(gim)(me)\b",
+        r"(?i)\b(gon)(na)\b",
+        r"(?i)\b(got)(ta)\b",
+        r"(?i)\b(lem)(me)\b",
+        r"(?i)\b(more)('n)\b",
+        r"(?i)\b(wan)(na)(?=\s)",
+        r"(?i) ('t)(is)\b",
+        r"(?i) ('t)(was)\b"
+    )
+]
+
+
+def tokenize(text):
+    """Split letters-and-whitespace text the way nltk's word_tokenize does.
+
+    Skill text is reduced to letters and whitespace before tokenizing, which
+    leaves nothing for punkt or the Treebank punctuation rules to act on, so
+    whitespace splitting plus the Treebank contraction rules gives the same
+    tokens without loading any tokenizer data.
+    """
+    text = f" {text} "
+    for pattern in CONTRACTIONS:
+        text = pattern.sub(r" \1 \2 ", text)
+    return text.split()
+
+
+_stemmer = None
+_stemmer_lock = threading.Lock()
+
+
+def get_stemmer():
+    """Porter stemmer, importing nltk on first use (it takes about a second)"""
+    global _stemmer
+    if _stemmer is None:
+        with _stemmer_lock:
+            if _stemmer is None:
+                try:
+                    from nltk.stem.porter import PorterStemmer
+                    _stemmer = PorterStemmer()
+                except ImportError:
+                    logger.warning("nltk is not installed, skill text will not be stemmed")
+                    _stemmer = False
+    return _stemmer or None
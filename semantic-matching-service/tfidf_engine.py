@@ -0,0 +1,325 @@
+import logging
+import re
+import sys
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+
+from matching_engine import MatchingEngine, load_catalog_skills, timed
+import skill_index
+import skill_model
+import text_processing
+from metrics import stage, trace_count
+from shared_state import SHARED_STATE_DIR, SharedStateDirectory, state_key
+from skill_index import SkillIndex
+from skill_model import DISTINCT_SKILL_MAX_SIMILARITY, SkillVectorModel
+from text_processing import STOP_WORDS, get_stemmer, tokenize
+
+logger = logging.getLogger("semantic-matching-service")
+
+# Skill synonyms for better matching
+SKILL_SYNONYMS = {
+    'javascript': ['js', 'node', 'nodejs', 'react', 'angular', 'vue'],
+    'python': ['django', 'flask', 'fastapi', 'pandas', 'numpy'],
+    'java': ['spring', 'springboot', 'maven', 'gradle'],
+    'react': ['reactjs', 'jsx', 'redux', 'javascript'],
+    'angular': ['angularjs', 'typescript', 'javascript'],
+    'vue': ['vuejs', 'nuxt', 'javascript'],
+    'html': ['html5', 'css', 'css3', 'bootstrap'],
+    'css': ['css3', 'sass', 'scss', 'bootstrap', 'tailwind'],
+    'sql': ['mysql', 'postgresql', 'database', 'db'],
+    'nosql': ['mongodb', 'redis', 'elasticsearch'],
+    'aws': ['amazon', 'ec2', 's3', 'lambda', 'cloud'],
+    'docker': ['container', 'kubernetes', 'k8s', 'devops'],
+    'git': ['github', 'gitlab', 'version control', 'vcs']
+}
+
+@stage("preprocessing")
+def preprocess_text(text):
+    """Preprocess text for better matching"""
+    # Convert to lowercase
+    text = text.lower().strip()
+
+    # Remove special characters and numbers
+    text = re.sub(r'[^a-zA-Z\s]', '', text)
+
+    # Tokenize
+    tokens = tokenize(text)
+
+    # Remove stopwords and stem
+    stemmer = get_stemmer()
+    tokens = [token for token in tokens if token not in STOP_WORDS]
+    if stemmer is not None:
+        tokens = [stemmer.stem(token) for token in tokens]
+
+    return ' '.join(tokens)
+
+@stage("synonym_expansion")
+def expand_skill_with_synonyms(skill):
+    """Expand skill with synonyms for better matching"""
+    skill_lower = skill.lower().strip()
+    expanded = [skill_lower]
+
+    for key, synonyms in SKILL_SYNONYMS.items():
+        if key in skill_lower or any(syn in skill_lower for syn in synonyms):
+            expanded.extend([key] + synonyms)
+
+    # dict.fromkeys keeps the order stable so the fitted vocabulary is reproducible
+    return ' '.join(dict.fromkeys(expanded))
+
+def build_skill_text(skill):
+    """Synonym-expanded, preprocessed text that the skill model vectorizes"""
+    return preprocess_text(expand_skill_with_synonyms(skill))
+
+def default_skill_catalog():
+    """Synonym table terms plus the skills listed in SKILL_CATALOG_PATH"""
+    catalog = []
+    for key, synonyms in SKILL_SYNONYMS.items():
+        catalog.append(key)
+        catalog.extend(synonyms)
+
+    skills = load_catalog_skills()
+    if not skills:
+        logger.warning("Skill catalog is empty or missing, using synonym table only")
+    catalog.extend(skills)
+
+    return catalog
+
+def apply_similarity_boosts(skills_a, skills_b, matrix):
+    """Boost exact matches to 1.0 and synonym matches to at least 0.8 in place"""
+    lowered_b = [skill.lower() for skill in skills_b]
+    columns_by_skill = {}
+    for j, skill in enumerate(lowered_b):
+        columns_by_skill.setdefault(skill.strip(), []).append(j)
+
+    for i, skill in enumerate(skills_a):
+        synonyms = SKILL_SYNONYMS.get(skill.lower(), [])
+        if synonyms:
+            columns = [j for j, other in enumerate(lowered_b) if any(syn in other for syn in synonyms)]
+            if columns:
+                matrix[i, columns] = np.maximum(matrix[i, columns], 0.8)
+
+        exact_columns = columns_by_skill.get(skill.lower().strip())
+        if exact_columns:
+            matrix[i, exact_columns] = 1.0
+
+    return matrix
+
+class TfidfState:
+    """A fitted skill model together with the catalog index built from its vectors.
+
+    States are never mutated: refits and index registrations build a new one
+    and swap it into the engine, so work that captures the state once sees a
+    consistent model and index for its whole run.
+    """
+
+    # The synonym boost is directional: css is a synonym of html but not the reverse
+    symmetric_similarity = False
+
+    def __init__(self, model, index):
+        self.model = model
+        self.index = index
+
+    @staticmethod
+    def canonical_skill(skill):
+        """Vectors and boosts depend only on the lower-cased skill"""
+        return skill.lower()
+
+    @property
+    def version(self):
+        return self.model.version
+
+    @property
+    def dimensions(self):
+        return self.model.dimensions
+
+    def encode(self, skills):
+        return self.model.vectorize(skills)
+
+    @stage("similarity")
+    def similarity_matrix(self, skills_a, skills_b):
+        """Similarity between every pair of skills_a x skills_b as one sparse product"""
+        # Cosine similarity of the cached, L2-normalized TF-IDF vectors
+        trace_count("pairsEvaluated", len(skills_a) * len(skills_b))
+        matrix = self.model.similarity_matrix(skills_a, skills_b)
+        # Different skills can share every feature ("Java Developer" and "java
+        # developers" stem alike); only the exact-match boost reaches 1.0
+        np.minimum(matrix, DISTINCT_SKILL_MAX_SIMILARITY, out=matrix)
+        return apply_similarity_boosts(skills_a, skills_b, matrix)
+
+    def similarity(self, skill1, skill2):
+        """Calculate similarity using TF-IDF and cosine similarity"""
+        # Errors propagate so callers (and the pair cache) never take them for a score
+        return float(self.similarity_matrix([skill1], [skill2])[0, 0])
+
+    def build_index(self, skills, cache_vectors=True):
+        """Index skills by their L2-normalized TF-IDF vectors"""
+        return SkillIndex(skills, self.model.vectorize(skills, cache=cache_vectors), version=self.model.version)
+
+    @stage("similarity")
+    def top_k(self, target_skill, index, k=None, min_similarity=None):
+        """Top-k catalog skills for a target skill, with the same boosts as similarity"""
+        trace_count("pairsEvaluated", len(index))
+        scores = index.scores(self.model.vectorize([target_skill]))
+        np.minimum(scores, DISTINCT_SKILL_MAX_SIMILARITY, out=scores)
+
+        synonyms = SKILL_SYNONYMS.get(target_skill.lower(), [])
+        if synonyms:
+            columns = index.columns_containing(synonyms)
+            scores[columns] = np.maximum(scores[columns], 0.8)
+        exact_columns = index.positions.get(target_skill.lower().strip())
+        if exact_columns:
+            scores[exact_columns] = 1.0
+
+        positions, similarities = index.top_k(scores, k=k, min_similarity=min_similarity)
+        return [
+            {"skill": index.skills[i], "similarity": float(similarity)}
+            for i, similarity in zip(positions, similarities)
+        ]
+
+    def vocabulary(self):
+        """Feature names in column order"""
+        return self.model.feature_names()
+
+    def info(self):
+        return self.model.info()
+
+def create_tfidf_state(catalog):
+    model = SkillVectorModel(catalog, build_skill_text)
+    state = TfidfState(model, None)
+    state.index = state.build_index(list(dict.fromkeys(catalog)))
+    return state
+
+def shared_state_key():
+    """SHARED_STATE_DIR key of the startup catalog and the code that fits it"""
+    return state_key("tfidf", default_skill_catalog(), (
+        sys.modules[__name__], skill_model, skill_index, text_processing
+    ))
+
+class TfidfEngine(MatchingEngine):
+    """TF-IDF vectors fitted once on the skill catalog, with synonym boosts.
+
+    The state is loaded in a background thread at startup (or by the first
+    request that needs it). With SHARED_STATE_DIR set it lives once in that
+    directory and every worker process memory-maps it instead of fitting its
+    own copy.
+    """
+
+    name = "tfidf"
+    label = "TF-IDF + Cosine Similarity"
+    embedding_model = "TF-IDF"
+    supports_refit = True
+
+    def __init__(self):
+        super().__init__()
+        self.state = None
+        self.lock = threading.RLock()
+        self.shared_state = None
+        if SHARED_STATE_DIR:
+            self.shared_state = SharedStateDirectory(SHARED_STATE_DIR, shared_state_key())
+
+    def start(self):
+        """Load the model in the background so the server accepts requests right away"""
+        threading.Thread(target=self.snapshot, name="matching-state-loader", daemon=True).start()
+
+    def _shared_lock(self):
+        return self.shared_state.lock() if self.shared_state is not None else nullcontext()
+
+    def _publish(self, state):
+        """Publish state to the shared directory and return the memory-mapped copy"""
+        if self.shared_state is None:
+            return state
+        vocabulary, idf = state.model.to_arrays()
+        arrays = {"idf": idf}
+        arrays.update({f"index_{key}": array for key, array in state.index.to_arrays().items()})
+        self.shared_state.publish(arrays, {
+            "catalog": state.model.catalog,
+            "vocabulary": vocabulary,
+            "revision": state.model.revision,
+            "modelVersion": state.model.version,
+            "indexSkills": state.index.skills
+        })
+        return self._read_shared()
+
+    def _read_shared(self):
+        arrays, meta = self.shared_state.load()
+        model = SkillVectorModel.from_arrays(
+            meta["catalog"], meta["vocabulary"], arrays["idf"], build_skill_text, revision=meta["revision"]
+        )
+        index_arrays = {key[len("index_"):]: array for key, array in arrays.items() if key.startswith("index_")}
+        index = SkillIndex.from_arrays(meta["indexSkills"], index_arrays, version=model.version)
+        return TfidfState(model, index)
+
+    def _load(self):
+        """Fit the startup state, or map the one another worker already published"""
+        with timed(self.timings, "stemmer"):
+            get_stemmer()
+        with timed(self.timings, "matchingState"):
+            if self.shared_state is None:
+                return create_tfidf_state(default_skill_catalog())
+            with self.shared_state.lock():
+                if self.shared_state.current() is None:
+                    return self._publish(create_tfidf_state(default_skill_catalog()))
+                return self._read_shared()
+
+    def snapshot(self):
+        """The latest state, picking up snapshots other workers published"""
+        if self.state is None:
+            with self.lock:
+                if self.state is None:
+                    self.state = self._load()
+                    logger.info(f"Matching state ready, load timings: {self.timings}")
+        elif self.shared_state is not None and self.shared_state.changed():
+            with self.shared_state.lock():
+                self.state = self._read_shared()
+        return self.state
+
+    @property
+    def version(self):
+        state = self.state
+        return state.version if state is not None else None
+
+    def refit(self, skills, replace=False):
+        """Fit a new skill model version and swap it in for subsequent requests"""
+        with self.lock, self._shared_lock():
+            current = self.snapshot()
+            if replace:
+                catalog = default_skill_catalog() if not skills else list(skills)
+            else:
+                catalog = current.model.catalog + list(skills)
+            model = SkillVectorModel(catalog, build_skill_text, revision=current.model.revision + 1)
+
+            # Catalog index vectors belong to the previous model version
+            state = TfidfState(model, None)
+            state.index = state.build_index(current.index.skills)
+            self.state = self._publish(state)
+            return self.state
+
+    def register_index(self, skills):
+        with self.lock, self._shared_lock():
+            current = self.snapshot()
+            index = current.build_index(list(dict.fromkeys(skills)))
+            self.state = self._publish(TfidfState(current.model, index))
+        logger.info(f"Registered skill index: {len(index)} skills")
+        return self.state.index
+
+    def readiness(self):
+        state = self.state
+        return {
+            "ready": state is not None,
+            "status": "ready" if state is not None else "loading",
+            "modelVersion": state.version if state is not None else None,
+            "timings": self.timings
+        }
+
+    def stats(self):
+        state = self.state
+        return {
+            "vector_cache": state.model.cache.stats() if state is not None else None,
+            "shared_state": self.shared_state.stats() if self.shared_state is not None else None
+        }
+
+    def caches(self):
+        state = self.state
+        return {"vector": state.model.cache} if state is not None else {}
@@ -0,0 +1,368 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache, normalize_key
+from embedding_store import open_embedding_store
+from encode_batcher import EncodeBatcher
+from matching_engine import MatchingEngine, load_catalog_skills
+from metrics import stage, trace_count
+from quantization import EMBEDDING_PRECISION, cosine_codes, dequantize, quantize
+from skill_index import SkillIndex
+
+logger = logging.getLogger("semantic-matching-service")
+
+# Load the sentence transformer model
+# Using a smaller model for efficiency, can be replaced with more powerful models
+MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# "eager" loads and warms the model in the background at startup; "lazy" waits
+# for the first request (less memory while idle, but that request stalls)
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "eager")
+
+# Number of catalog skills encoded during warmup
+MODEL_WARMUP_SKILLS = int(os.getenv("MODEL_WARMUP_SKILLS", "256"))
+
+# Maximum texts per model.encode batch for cache misses
+ENCODE_BATCH_SIZE = int(os.getenv("ENCODE_BATCH_SIZE", "64"))
+
+# Keys prepare remembers for their request's lookup before it starts forgetting
+MAX_PREPARED_KEYS = 10000
+
+# "torch" runs the model through sentence-transformers; "onnx" runs an exported
+# copy from ONNX_MODEL_DIR with ONNX Runtime (see onnx_encoder.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+if EMBEDDING_BACKEND not in ("torch", "onnx"):
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {EMBEDDING_BACKEND}")
+
+
+def load_encoder():
+    """The model for EMBEDDING_BACKEND; only that backend's libraries are imported"""
+    if EMBEDDING_BACKEND == "onnx":
+        from onnx_encoder import OnnxEncoder
+        return OnnxEncoder()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+
+def encoder_name():
+    """Identifies whose embeddings are stored, so backends never share store files"""
+    if EMBEDDING_BACKEND == "onnx":
+        from onnx_encoder import ONNX_MODEL_FILE
+        return f"{MODEL_NAME}.onnx.{os.path.splitext(ONNX_MODEL_FILE)[0]}"
+    return MODEL_NAME
+
+
+class TransformerEngine(MatchingEngine):
+    """Sentence-transformer embeddings compared by cosine similarity.
+
+    Embeddings are cached in memory (see EMBEDDING_CACHE_* env vars) and in a
+    persistent memory-mapped store (see EMBEDDING_STORE_DIR), both in the
+    EMBEDDING_PRECISION form; similarities are computed on those stored values. Handlers call
+    ``prepare`` first so cache misses are encoded through the cross-request
+    batcher; the synchronous work that follows then only hits the cache.
+    """
+
+    name = "transformer"
+    label = MODEL_NAME
+    embedding_model = MODEL_NAME
+    symmetric_similarity = True
+
+    def __init__(self):
+        super().__init__()
+        self.model = None
+        self.model_lock = threading.Lock()
+        # not_loaded -> loading -> warming -> ready, or failed; reported by /readyz
+        self.status = "not_loaded"
+        self.error = None
+
+        self.embedding_cache = EmbeddingCache()
+        self.embedding_store = None
+        self.embedding_store_failed = False
+        # Concurrent handlers share model.encode calls through this batcher
+        self.encode_batcher = EncodeBatcher(self.encode_texts, max_batch_size=ENCODE_BATCH_SIZE)
+        # Keys prepare encoded that no synchronous lookup has seen yet; that
+        # lookup counts them as the misses they were
+        self.prepared_keys = Counter()
+        self.prepared_lock = threading.Lock()
+
+        # Catalog index, built on first use or registered via /skill-index
+        self.index_lock = threading.Lock()
+        self._index = None
+
+    def get_model(self):
+        if self.model is None:
+            with self.model_lock:
+                if self.model is None:
+                    logger.info(f"Loading model: {MODEL_NAME} ({EMBEDDING_BACKEND} backend)")
+                    if self.status == "not_loaded":
+                        self.status = "loading"
+                    started = time.perf_counter()
+                    self.model = load_encoder()
+                    self.timings["loadSeconds"] = round(time.perf_counter() - started, 3)
+                    # In eager mode warm_up reports ready once warmup is done
+                    if MODEL_LOAD_MODE == "lazy":
+                        self.status = "ready"
+        return self.model
+
+    def get_embedding_store(self):
+        """Open the embedding store from its metadata, or once the model's dimensions are known"""
+        if self.embedding_store is None and not self.embedding_store_failed:
+            dimensions = self.model.get_sentence_embedding_dimension() if self.model is not None else None
+            try:
+                self.embedding_store = open_embedding_store(encoder_name(), dimensions)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Embedding store disabled: {e}")
+                self.embedding_store_failed = True
+        return self.embedding_store
+
+    def lookup_embeddings(self, keys, count=True, cache=True):
+        """Split normalized keys into cached embeddings and misses that need encoding.
+
+        Only lookups with ``count`` update the cache statistics and the request
+        trace, so each request counts every skill once.
+        """
+        embeddings = {}
+        misses = []
+        memory_hits = 0
+
+        store = self.get_embedding_store()
+        for key in dict.fromkeys(keys):
+            embedding = self.embedding_cache.get(key, count=False)
+            if embedding is not None:
+                memory_hits += 1
+
+            # Warm path: embeddings persisted by this or a previous instance
+            if embedding is None and store is not None:
+                embedding = store.get(key)
+                if embedding is not None and cache:
+                    self.embedding_cache.put(key, embedding)
+
+            if embedding is None:
+                misses.append(key)
+            else:
+                embeddings[key] = embedding
+
+        if count:
+            # Encoded by this request's prepare, so a miss although the cache has it now
+            prepared = self.take_prepared(embeddings)
+            cache_hits = max(memory_hits - prepared, 0)
+            self.embedding_cache.record_lookups(cache_hits, len(embeddings) + len(misses) - cache_hits)
+            trace_count("cacheHits", len(embeddings) - prepared)
+            trace_count("cacheMisses", len(misses) + prepared)
+        return embeddings, misses
+
+    def take_prepared(self, keys):
+        """Forget which of keys prepare encoded, returning how many it did"""
+        with self.prepared_lock:
+            if not self.prepared_keys:
+                return 0
+            taken = 0
+            for key in keys:
+                if key in self.prepared_keys:
+                    taken += 1
+                    self.prepared_keys[key] -= 1
+                    if not self.prepared_keys[key]:
+                        del self.prepared_keys[key]
+            return taken
+
+    @stage("vectorization")
+    def encode_texts(self, texts):
+        """Encode texts in one batched model call, returning rows in input order"""
+        # Length-sorted so each batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        encoded = self.get_model().encode([texts[i] for i in order], batch_size=ENCODE_BATCH_SIZE)
+
+        embeddings = [None] * len(texts)
+        for position, i in enumerate(order):
+            embeddings[i] = encoded[position]
+        return embeddings
+
+    def save_embeddings(self, keys, encoded, cache=True):
+        """Quantize freshly encoded embeddings and write them to the cache (unless not ``cache``) and the store"""
+        store = self.get_embedding_store()
+        # Returned in stored form too, so results never depend on whether a skill was cached
+        stored = [quantize(embedding) for embedding in encoded]
+        for key, embedding in zip(keys, stored):
+            if cache:
+                self.embedding_cache.put(key, embedding)
+            if store is not None:
+                store.append(key, embedding)
+        return dict(zip(keys, stored))
+
+    def compute_embeddings(self, texts, cache=True):
+        """Stored-form embeddings for many texts, encoding all cache misses in one batched call"""
+        # Normalized keys are encoded so every variant sharing a cache entry gets the same vector
+        keys = [normalize_key(text) for text in texts]
+        embeddings, misses = self.lookup_embeddings(keys, cache=cache)
+        if misses:
+            embeddings.update(self.save_embeddings(misses, self.encode_texts(misses), cache))
+        return [embeddings[key] for key in keys]
+
+    async def prepare(self, skills):
+        """Encode cache misses through the cross-request encode batcher"""
+        keys = [normalize_key(text) for text in skills]
+        loop = asyncio.get_running_loop()
+        # Store reads and appends touch the memory map, so keep them off the event loop
+        _, misses = await loop.run_in_executor(None, self.lookup_embeddings, keys, False)
+        if misses:
+            encoded = await self.encode_batcher.encode(misses)
+            await loop.run_in_executor(None, self.save_embeddings, misses, encoded)
+            with self.prepared_lock:
+                # Nothing consumes them when a process pool runs the lookups
+                if len(self.prepared_keys) > MAX_PREPARED_KEYS:
+                    self.prepared_keys.clear()
+                self.prepared_keys.update(misses)
+
+    def compute_embedding_matrix(self, texts):
+        """Stack the L2-normalized embeddings of texts into one (n, dim) matrix"""
+        return self.normalized_matrix(self.compute_embeddings(texts))
+
+    def normalized_matrix(self, embeddings):
+        """Stack stored-form embeddings into L2-normalized rows"""
+        if not embeddings:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+
+        matrix = np.vstack([cosine_codes(embedding) for embedding in embeddings])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def load(self):
+        self.get_model()
+
+    def snapshot(self):
+        # The model never changes, so the engine is its own snapshot
+        self.get_model()
+        return self
+
+    @property
+    def version(self):
+        return MODEL_NAME
+
+    @staticmethod
+    def canonical_skill(skill):
+        # Embeddings are looked up by normalized key
+        return normalize_key(skill)
+
+    @property
+    def dimensions(self):
+        return self.get_model().get_sentence_embedding_dimension()
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self.index_lock:
+                if self._index is None:
+                    self._index = self.build_index(list(dict.fromkeys(load_catalog_skills())))
+        return self._index
+
+    def encode(self, skills):
+        """Raw (unnormalized) embeddings, one row per skill"""
+        if not skills:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.vstack([dequantize(embedding) for embedding in self.compute_embeddings(skills)])
+
+    @stage("similarity")
+    def similarity_matrix(self, skills_a, skills_b):
+        """Cosine similarity between every pair of skills_a x skills_b as one matrix product"""
+        # Encode the misses of both sides in one batch
+        trace_count("pairsEvaluated", len(skills_a) * len(skills_b))
+        matrix = self.normalized_matrix(self.compute_embeddings(skills_a + skills_b))
+        return matrix[:len(skills_a)] @ matrix[len(skills_a):].T
+
+    @stage("similarity")
+    def similarity(self, skill1, skill2):
+        """Compute cosine similarity between the embeddings of two skills"""
+        trace_count("pairsEvaluated")
+        vec1, vec2 = (cosine_codes(embedding) for embedding in self.compute_embeddings([skill1, skill2]))
+        return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
+
+    def build_index(self, skills, cache_vectors=True):
+        """Index skills by their L2-normalized embeddings"""
+        return SkillIndex(skills, self.normalized_matrix(self.compute_embeddings(skills, cache_vectors)),
+                          version=MODEL_NAME)
+
+    @stage("similarity")
+    def top_k(self, target_skill, index, k=None, min_similarity=None):
+        # One matrix-vector product, then top-k selection
+        trace_count("pairsEvaluated", len(index))
+        target_embedding, = self.compute_embeddings([target_skill])
+        scores = index.scores(cosine_codes(target_embedding))
+        positions, similarities = index.top_k(scores, k=k, min_similarity=min_similarity)
+        return [
+            {"skill": index.skills[i], "similarity": float(similarity)}
+            for i, similarity in zip(positions, similarities)
+        ]
+
+    def register_index(self, skills):
+        index = self.build_index(list(dict.fromkeys(skills)))
+        self._index = index
+        logger.info(f"Registered skill index: {len(index)} skills")
+        return index
+
+    def vocabulary(self):
+        # Embedding dimensions have no feature names
+        return None
+
+    def info(self):
+        return {
+            "version": MODEL_NAME,
+            "dimensions": self.dimensions,
+            "cachedVectors": len(self.embedding_cache)
+        }
+
+    def warm_up(self):
+        """Load the model, encode representative skills and build the catalog index"""
+        try:
+            self.get_model()
+
+            self.status = "warming"
+            started = time.perf_counter()
+            # Straight to the model (not the cache) so both single and full-batch
+            # encode paths run once even when every skill is already stored
+            skills = load_catalog_skills()[:MODEL_WARMUP_SKILLS] or ["python", "project management"]
+            self.encode_texts(skills[:1])
+            self.encode_texts(skills)
+            self.index  # builds the catalog index
+            self.timings["warmupSeconds"] = round(time.perf_counter() - started, 3)
+
+            self.status = "ready"
+            logger.info(f"Model ready: {self.timings}")
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            logger.error(f"Error warming up model: {str(e)}")
+
+    def start(self):
+        if MODEL_LOAD_MODE == "eager":
+            threading.Thread(target=self.warm_up, name="model-warmup", daemon=True).start()
+
+    def readiness(self):
+        ready = self.status == "ready" or (MODEL_LOAD_MODE == "lazy" and self.status != "failed")
+        return {
+            "ready": ready,
+            "status": "ready" if ready else self.status,
+            "model": MODEL_NAME,
+            "loadMode": MODEL_LOAD_MODE,
+            "timings": self.timings,
+            "error": self.error
+        }
+
+    def stats(self):
+        return {
+            "model_status": self.status,
+            "embedding_backend": EMBEDDING_BACKEND,
+            "embedding_precision": EMBEDDING_PRECISION,
+            "embedding_cache_size": len(self.embedding_cache),
+            "embedding_cache": self.embedding_cache.stats(),
+            "embedding_store": self.embedding_store.stats() if self.embedding_store is not None else None,
+            "encode_batcher": self.encode_batcher.stats()
+        }
+
+    def caches(self):
+        return {"embedding": self.embedding_cache}
@@ -0,0 +1,118 @@
+import io
+import json
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+# Binary alternatives to JSON for matrix responses, chosen by the Accept header
+MEDIA_NPY = "application/x-npy"
+MEDIA_RAW = "application/octet-stream"
+MEDIA_ARROW = "application/vnd.apache.arrow.stream"
+BINARY_MEDIA_TYPES = (MEDIA_NPY, MEDIA_RAW, MEDIA_ARROW)
+
+# Raw format: magic, dtype code, rows, cols (little-endian), then the row-major matrix
+RAW_MAGIC = b"SKMX"
+RAW_HEADER = struct.Struct("<4sBII")
+RAW_DTYPES = {np.dtype("<f4"): 1, np.dtype("<f2"): 2}
+
+# Largest dense embedding response (skills x dimensions values), JSON or binary
+EMBED_MAX_DENSE_VALUES = int(os.getenv("EMBED_MAX_DENSE_VALUES", str(2 ** 23)))
+
+
+# A serialized matrix returned from the matching executor instead of a JSON dict
+BinaryMatrix = namedtuple("BinaryMatrix", ["body", "media_type", "shape", "dtype", "model_version"])
+
+
+class NotAcceptable(Exception):
+    """The requested binary format cannot be produced"""
+
+
+class DenseTooLarge(Exception):
+    """A dense response would exceed EMBED_MAX_DENSE_VALUES"""
+
+
+def check_dense_size(rows, columns):
+    if rows * columns > EMBED_MAX_DENSE_VALUES:
+        raise DenseTooLarge(
+            f"{rows} x {columns} dense values exceed EMBED_MAX_DENSE_VALUES ({EMBED_MAX_DENSE_VALUES}); "
+            f"request \"sparse\": true or fewer skills"
+        )
+
+
+def negotiate(accept):
+    """The binary media type an Accept header asks for, or None for JSON.
+
+    Only an explicit binary media type switches away from JSON, so clients
+    sending ``*/*`` or nothing keep getting JSON. Types are tried by
+    descending ``q`` (header order among equal ones); ``q=0`` excludes a type.
+    """
+    if not accept:
+        return None
+    offered = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            offered.append((-quality, position, media_type.lower()))
+    for _, _, media_type in sorted(offered):
+        if media_type in BINARY_MEDIA_TYPES:
+            return media_type
+        if media_type == "application/json":
+            return None
+    return None
+
+
+def encode_matrix(matrix, media_type, row_labels, column_labels=None, model_version=None):
+    """Serialize a dense matrix; rows (and columns) follow the request's skill order.
+
+    npy and raw carry only the matrix, since the client already knows the
+    skill order it sent; Arrow adds the row labels as a ``skill`` column and
+    the model version (plus the column labels) as schema metadata.
+    """
+    matrix = np.ascontiguousarray(matrix)
+    if media_type == MEDIA_NPY:
+        buffer = io.BytesIO()
+        np.save(buffer, matrix, allow_pickle=False)
+        return BinaryMatrix(buffer.getvalue(), media_type, matrix.shape, matrix.dtype.name, model_version)
+
+    if media_type == MEDIA_RAW:
+        matrix = matrix.astype(matrix.dtype.newbyteorder("<"), copy=False)
+        header = RAW_HEADER.pack(RAW_MAGIC, RAW_DTYPES[matrix.dtype], matrix.shape[0], matrix.shape[1])
+        return BinaryMatrix(header + matrix.tobytes(), media_type, matrix.shape, matrix.dtype.name, model_version)
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise NotAcceptable("Arrow responses need pyarrow installed")
+    values = pa.array(matrix.ravel())
+    schema_metadata = {"modelVersion": str(model_version)}
+    if column_labels is not None:
+        schema_metadata["columns"] = json.dumps(column_labels)
+    table = pa.table(
+        {
+            "skill": pa.array(row_labels, type=pa.string()),
+            "values": pa.FixedSizeListArray.from_arrays(values, matrix.shape[1])
+        },
+        metadata=schema_metadata
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return BinaryMatrix(sink.getvalue().to_pybytes(), media_type, matrix.shape, matrix.dtype.name, model_version)
+
+
+def binary_headers(result):
+    return {
+        "X-Shape": f"{result.shape[0]},{result.shape[1]}",
+        "X-Dtype": result.dtype,
+        "X-Model-Version": str(result.model_version)
+    }
@@ -2,8 +2,11 @@ const {
   calculateMatchScore, 
   areSkillsSimilar, 
   generateMatches,
+  rankCandidates,
   calculateSkillSimilarity,
-  analyzeSkillGaps
+  analyzeSkillGaps,
+  getEmployeeRecommendations,
+  semanticMatchingService
 } = require('../../services/matchingService');
 const { SKILL_SYNONYMS } = require('../../services/skillData');
 const EmployeeProfile = require('../../models/EmployeeProfile');
@@ -260,4 +263,183 @@ describe('Matching Service', () => {
       expect(['Exact', 'Near', 'Not Eligible']).toContain(matches[0].matchType);
     });
   });
-});
\ No newline at end of file
+
+  describe('batched semantic requests', () => {
+    let employees;
+    let demand;
+
+    // Stand-in similarity: exact skills match, everything else is unrelated
+    const similarityOf = (skill1, skill2) =>
+      skill1.toLowerCase().trim() === skill2.toLowerCase().trim() ? 1 : 0.1;
+
+    beforeEach(async () => {
+      employees = [
+        new EmployeeProfile({
+          employeeId: 'EMP001',
+          name: 'John Doe',
+          email: 'john@example.com',
+          primarySkill: 'JavaScript',
+          primarySkillExperience: 5,
+          secondarySkills: [{ skill: 'React', experience: 3 }],
+          BU: 'Technology',
+          status: 'Available',
+          createdBy: testUser._id
+        }),
+        new EmployeeProfile({
+          employeeId: 'EMP002',
+          name: 'Jane Roe',
+          email: 'jane@example.com',
+          primarySkill: 'Python',
+          primarySkillExperience: 2,
+          secondarySkills: [{ skill: 'Node.js', experience: 1 }],
+          BU: 'Technology',
+          status: 'Training',
+          createdBy: testUser._id
+        })
+      ];
+      for (const employee of employees) {
+        await employee.save();
+      }
+
+      demand = new Demand({
+        demandId: 'DEM001',
+        accountName: 'Test Account',
+        projectName: 'Test Project',
+        positionTitle: 'Developer',
+        primarySkill: 'JavaScript',
+        secondarySkills: ['React', 'Node.js'],
+        experienceRange: { min: 3, max: 7 },
+        startDate: new Date(),
+        priority: 'High',
+        createdBy: testUser._id
+      });
+      await demand.save();
+
+      jest.spyOn(console, 'log').mockImplementation(() => {});
+    });
+
+    afterEach(() => {
+      jest.restoreAllMocks();
+    });
+
+    function mockPairRequests() {
+      return [
+        jest.spyOn(semanticMatchingService, 'calculateSemanticSimilarity')
+          .mockImplementation(async (skill1, skill2) => similarityOf(skill1, skill2)),
+        jest.spyOn(semanticMatchingService, 'areSkillsSemanticallyRelated')
+          .mockImplementation(async (skill1, skill2) => similarityOf(skill1, skill2) >= 0.65)
+      ];
+    }
+
+    function mockMatrixRequest() {
+      return jest.spyOn(semanticMatchingService, 'calculateSemanticSimilarityMatrix')
+        .mockImplementation(async (skillsA, skillsB) => skillsA.map(a => skillsB.map(b => similarityOf(a, b))));
+    }
+
+    it('should score all employees for a demand from one matrix request', async () => {
+      const pairSpies = mockPairRequests();
+      const expectedScores = {};
+      for (const employee of employees) {
+        expectedScores[employee.employeeId] = await calculateMatchScore(employee, demand);
+      }
+      pairSpies.forEach(spy => spy.mockClear());
+
+      const matrixSpy = mockMatrixRequest();
+      const matches = await generateMatches(demand._id);
+
+      expect(matrixSpy).toHaveBeenCalledTimes(1);
+      expect(matrixSpy.mock.calls[0][0]).toEqual(['javascript', 'react', 'python', 'node.js']);
+      expect(matrixSpy.mock.calls[0][1]).toEqual(['javascript', 'react', 'node.js']);
+      pairSpies.forEach(spy => expect(spy).not.toHaveBeenCalled());
+
+      expect(matches.length).toBeGreaterThan(0);
+      for (const match of matches) {
+        expect(match.matchScore).toBe(expectedScores[match.employeeId.employeeId]);
+      }
+    });
+
+    it('should score all demands for an employee from one matrix request', async () => {
+      const pairSpies = mockPairRequests();
+      const matrixSpy = mockMatrixRequest();
+
+      const recommendations = await getEmployeeRecommendations(employees[0]._id);
+
+      expect(matrixSpy).toHaveBeenCalledTimes(1);
+      pairSpies.forEach(spy => expect(spy).not.toHaveBeenCalled());
+      expect(recommendations).toHaveLength(1);
+      expect(recommendations[0].missingSkills).toEqual(['Node.js']);
+    });
+
+    it('should analyze skill gaps with the local rules from one matrix request by default', async () => {
+      const bulkSpy = jest.spyOn(semanticMatchingService, 'analyzeSkillGapsBulk');
+      const pairSpies = mockPairRequests();
+      const matrixSpy = mockMatrixRequest();
+
+      const skillGaps = await analyzeSkillGaps();
+
+      expect(bulkSpy).not.toHaveBeenCalled();
+      expect(matrixSpy).toHaveBeenCalledTimes(1);
+      pairSpies.forEach(spy => expect(spy).not.toHaveBeenCalled());
+      expect(skillGaps.map(gap => gap.skill)).toContain('Node.js');
+    });
+
+    it('should take skill gaps from the streamed bulk analysis when asked to', async () => {
+      const skillGaps = [{ skill: 'Node.js', demandCount: 1, urgency: 'high', affectedDemands: ['DEM001'] }];
+      const bulkSpy = jest.spyOn(semanticMatchingService, 'analyzeSkillGapsBulk')
+        .mockResolvedValue({ demands: [], skillGaps });
+      const matrixSpy = mockMatrixRequest();
+
+      await expect(analyzeSkillGaps({ useSemanticService: true })).resolves.toEqual(skillGaps);
+      expect(bulkSpy).toHaveBeenCalledTimes(1);
+      expect(bulkSpy.mock.calls[0][1]).toHaveLength(2);
+      expect(matrixSpy).not.toHaveBeenCalled();
+    });
+
+    it('should fall back to the local rules when the bulk analysis fails', async () => {
+      jest.spyOn(semanticMatchingService, 'analyzeSkillGapsBulk').mockRejectedValue(new Error('unavailable'));
+      const pairSpies = mockPairRequests();
+      const matrixSpy = mockMatrixRequest();
+
+      const skillGaps = await analyzeSkillGaps({ useSemanticService: true });
+
+      expect(matrixSpy).toHaveBeenCalledTimes(1);
+      pairSpies.forEach(spy => expect(spy).not.toHaveBeenCalled());
+      expect(skillGaps.map(gap => gap.skill)).toContain('Node.js');
+    });
+
+    it('should compare pairs one by one when the service is down', async () => {
+      const outage = new Error('connect ECONNREFUSED');
+      jest.spyOn(console, 'error').mockImplementation(() => {});
+      jest.spyOn(semanticMatchingService, 'calculateSemanticSimilarity').mockRejectedValue(outage);
+      jest.spyOn(semanticMatchingService, 'areSkillsSemanticallyRelated').mockRejectedValue(outage);
+      const expected = {};
+      for (const employee of employees) {
+        expected[employee.employeeId] = await calculateMatchScore(employee, demand);
+      }
+      const matrixSpy = jest.spyOn(semanticMatchingService, 'calculateSemanticSimilarityMatrix')
+        .mockRejectedValue(outage);
+
+      const matches = await generateMatches(demand._id);
+
+      expect(matrixSpy).toHaveBeenCalledTimes(1);
+      expect(matches.length).toBeGreaterThan(0);
+      for (const match of matches) {
+        expect(match.matchScore).toBe(expected[match.employeeId.employeeId]);
+      }
+    });
+
+    it('should rank candidates with one bulk request', async () => {
+      const rankSpy = jest.spyOn(semanticMatchingService, 'rankCandidatesForDemand')
+        .mockImplementation(async (rankedDemand, candidates) => candidates.map((employee, i) => ({
+          employeeId: employee._id.toString(),
+          matchScore: 90 - i * 10
+        })));
+
+      const ranking = await rankCandidates(demand._id, { limit: 10 });
+
+      expect(rankSpy).toHaveBeenCalledTimes(1);
+      expect(rankSpy.mock.calls[0][2]).toEqual({ limit: 10 });
+      expect(ranking.map(result => result.employee.employeeId)).toEqual(['EMP001', 'EMP002']);
+    });
+  });
+});
@@ -0,0 +1,146 @@
+const { Readable } = require('stream');
+const axios = require('axios');
+const {
+  calculateSemanticSimilarityMatrix,
+  rankCandidatesForDemand,
+  analyzeSkillGapsBulk
+} = require('../../services/semanticMatchingService');
+
+jest.mock('axios');
+
+describe('Semantic Matching Service', () => {
+  const employees = [
+    {
+      _id: 'e1',
+      primarySkill: 'Python',
+      primarySkillExperience: 4,
+      secondarySkills: [{ skill: 'Django', experience: 2 }]
+    },
+    {
+      _id: 'e2',
+      primarySkill: 'React',
+      primarySkillExperience: 3,
+      secondarySkills: []
+    }
+  ];
+
+  const demand = {
+    demandId: 'DEM001',
+    primarySkill: 'Python',
+    secondarySkills: ['AWS'],
+    experienceRange: { min: 2, max: 5 },
+    priority: 'High'
+  };
+
+  beforeEach(() => {
+    axios.post.mockReset();
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+    jest.spyOn(console, 'log').mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  describe('calculateSemanticSimilarityMatrix', () => {
+    it('should request the whole matrix in one call', async () => {
+      axios.post.mockResolvedValue({ data: { similarities: [[1, 0.2], [0.1, 0.9]] } });
+
+      const matrix = await calculateSemanticSimilarityMatrix(['Python ', 'React'], ['python', 'ReactJS']);
+
+      expect(matrix).toEqual([[1, 0.2], [0.1, 0.9]]);
+      expect(axios.post).toHaveBeenCalledTimes(1);
+      expect(axios.post.mock.calls[0][0]).toMatch(/\/match-skills\/batch$/);
+      expect(axios.post.mock.calls[0][1]).toMatchObject({
+        skillsA: ['python', 'react'],
+        skillsB: ['python', 'reactjs'],
+        sparse: false
+      });
+    });
+
+    it('should expand sparse pairs with zeros below the threshold', async () => {
+      axios.post.mockResolvedValue({
+        data: { pairs: { rows: [0, 1], cols: [0, 2], values: [1, 0.8] } }
+      });
+
+      const matrix = await calculateSemanticSimilarityMatrix(['a', 'b'], ['a', 'c', 'd'], { sparse: true });
+
+      expect(matrix).toEqual([[1, 0, 0], [0, 0, 0.8]]);
+      expect(axios.post.mock.calls[0][1]).toMatchObject({ sparse: true, threshold: 0.65 });
+    });
+
+    it('should reject when the service fails so callers can fall back per pair', async () => {
+      axios.post.mockRejectedValue(new Error('connect ECONNREFUSED'));
+
+      await expect(calculateSemanticSimilarityMatrix(['Python', 'Java'], ['python', 'Go']))
+        .rejects.toThrow('connect ECONNREFUSED');
+    });
+  });
+
+  describe('rankCandidatesForDemand', () => {
+    it('should send every candidate profile in one request', async () => {
+      const results = [{ employeeId: 'e1', matchScore: 90 }, { employeeId: 'e2', matchScore: 10 }];
+      axios.post.mockResolvedValue({ data: { candidatesScored: 2, results } });
+
+      const ranking = await rankCandidatesForDemand(demand, employees, { limit: 5 });
+
+      expect(ranking).toEqual(results);
+      expect(axios.post).toHaveBeenCalledTimes(1);
+      expect(axios.post.mock.calls[0][0]).toMatch(/\/analyze-match\/bulk$/);
+      expect(axios.post.mock.calls[0][1]).toEqual({
+        demandSkills: ['Python', 'AWS'],
+        demandRequirements: { primarySkill: 'Python', experienceRange: { min: 2, max: 5 } },
+        candidates: [
+          { employeeId: 'e1', skills: ['Python', 'Django'], experience: { Python: 4, Django: 2 } },
+          { employeeId: 'e2', skills: ['React'], experience: { React: 3 } }
+        ],
+        limit: 5
+      });
+    });
+  });
+
+  describe('analyzeSkillGapsBulk', () => {
+    const demandLines = [
+      { demandId: 'DEM001', bestEmployeeId: 'e1', missingSkills: ['AWS'] },
+      { demandId: 'DEM002', bestEmployeeId: null, missingSkills: ['Go'] }
+    ];
+    const summary = {
+      skillGaps: [{ skill: 'AWS', demandCount: 1, urgency: 'high', affectedDemands: ['DEM001'] }],
+      demandsAnalyzed: 2,
+      candidatesAnalyzed: 2
+    };
+
+    // NDJSON split at arbitrary points, as network chunks arrive
+    function ndjsonStream() {
+      const body = [...demandLines, summary].map(line => JSON.stringify(line) + '\n').join('');
+      return Readable.from([body.slice(0, 10), body.slice(10, 75), body.slice(75)]);
+    }
+
+    it('should parse the streamed lines into demands and the gap summary', async () => {
+      axios.post.mockResolvedValue({ data: ndjsonStream() });
+
+      const result = await analyzeSkillGapsBulk([demand], employees);
+
+      expect(result).toEqual({ demands: demandLines, skillGaps: summary.skillGaps });
+      expect(axios.post.mock.calls[0][0]).toMatch(/\/skill-gaps$/);
+      expect(axios.post.mock.calls[0][2]).toEqual({ responseType: 'stream' });
+    });
+
+    it('should hand demand results to onDemand as they arrive', async () => {
+      axios.post.mockResolvedValue({ data: ndjsonStream() });
+      const seen = [];
+
+      const result = await analyzeSkillGapsBulk([demand], employees, { onDemand: line => seen.push(line) });
+
+      expect(seen).toEqual(demandLines);
+      expect(result.demands).toEqual([]);
+      expect(result.skillGaps).toEqual(summary.skillGaps);
+    });
+
+    it('should reject a stream without a summary line', async () => {
+      axios.post.mockResolvedValue({ data: Readable.from([JSON.stringify(demandLines[0]) + '\n']) });
+
+      await expect(analyzeSkillGapsBulk([demand], employees)).rejects.toThrow('summary');
+    });
+  });
+});
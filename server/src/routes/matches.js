@@ -6,6 +6,7 @@ const User = require('../models/User');
 const { auth, authorize } = require('../middleware/auth');
 const { 
   generateMatches, 
+  rankCandidates,
   analyzeSkillGaps, 
   getEmployeeRecommendations,
   semanticMatchingService 
@@ -167,6 +168,45 @@ const { demandId } = req.params;
   }
 });
 
+// Rank employees for a demand without generating matches
+router.get('/demand/:demandId/ranking', auth, authorize('Admin', 'RM'), async (req, res) => {
+  try {
+    const { demandId } = req.params;
+    const limit = req.query.limit !== undefined ? parseInt(req.query.limit, 10) : undefined;
+
+    if (!isValidObjectId(demandId)) {
+      return res.status(400).json({ message: 'Invalid demand ID format' });
+    }
+
+    if (limit !== undefined && (isNaN(limit) || limit < 0)) {
+      return res.status(400).json({ message: 'Limit must be a non-negative integer' });
+    }
+
+    const demand = await Demand.findById(demandId);
+    if (!demand) {
+      return res.status(404).json({ message: 'Demand not found' });
+    }
+
+    if (req.user.role === 'RM' && demand.createdBy.toString() !== req.user._id.toString()) {
+      return res.status(403).json({ message: 'Access denied' });
+    }
+
+    const ranking = await rankCandidates(demandId, { limit });
+
+    res.json({
+      message: 'Candidate ranking retrieved successfully',
+      ranking,
+      count: ranking.length
+    });
+  } catch (error) {
+    console.error('Rank candidates error:', error);
+    res.status(500).json({ 
+      message: 'Failed to rank candidates', 
+      error: error.message 
+    });
+  }
+});
+
 // Get matches for a specific employee
 router.get('/employee/:employeeId', auth, async (req, res) => {
   try {
@@ -208,10 +248,10 @@ router.get('/employee/:employeeId', auth, async (req, res) => {
   }
 });
 
-// Get skill gap analysis
+// Get skill gap analysis (?scoring=semantic uses the semantic service's scoring rules)
 router.get('/skill-gaps', auth, authorize('Admin', 'RM'), async (req, res) => {
   try {
-    const skillGaps = await analyzeSkillGaps();
+    const skillGaps = await analyzeSkillGaps({ useSemanticService: req.query.scoring === 'semantic' });
 
     res.json({
       message: 'Skill gap analysis completed successfully',
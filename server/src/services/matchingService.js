@@ -11,10 +11,54 @@ const stemmer = natural.PorterStemmer;
 // Enhanced skill similarity threshold (lowered for better matching)
 const SIMILARITY_THRESHOLD = 0.65;
 
+/**
+ * Lookup key of an (employee skill, demand skill) pair
+ */
+function similarityKey(employeeSkill, demandSkill) {
+  return `${employeeSkill.toLowerCase().trim()}\u0000${demandSkill.toLowerCase().trim()}`;
+}
+
+/**
+ * Fetch the similarity of every employee skill to every demand skill in one batch request
+ * @param {Object[]} employees - Employee profiles with skills
+ * @param {Object[]} demands - Demands with required skills
+ * @returns {Promise<Map<string, number>>} - Similarities by similarityKey(employeeSkill, demandSkill)
+ */
+async function fetchSkillSimilarities(employees, demands) {
+  const unique = skills => [...new Set(skills.map(skill => skill.toLowerCase().trim()))];
+  const employeeSkills = unique(employees.flatMap(employee => [
+    employee.primarySkill,
+    ...employee.secondarySkills.map(s => s.skill)
+  ]));
+  const demandSkills = unique(demands.flatMap(demand => [
+    demand.primarySkill,
+    ...(demand.secondarySkills || [])
+  ]));
+
+  const similarities = new Map();
+  if (employeeSkills.length === 0 || demandSkills.length === 0) {
+    return similarities;
+  }
+
+  try {
+    const matrix = await semanticMatchingService.calculateSemanticSimilarityMatrix(employeeSkills, demandSkills);
+    employeeSkills.forEach((employeeSkill, i) => {
+      demandSkills.forEach((demandSkill, j) => {
+        similarities.set(similarityKey(employeeSkill, demandSkill), matrix[i][j]);
+      });
+    });
+  } catch (error) {
+    // Pairs missing from the lookup are compared one by one
+    console.log('Falling back to per-pair skill similarity:', error.message);
+  }
+  return similarities;
+}
+
 /**
  * Enhanced skill similarity calculation using multiple algorithms
+ * (pairs in the optional fetchSkillSimilarities lookup are not requested again)
  */
-async function calculateSkillSimilarity(skill1, skill2) {
+async function calculateSkillSimilarity(skill1, skill2, similarities) {
   const normalizedSkill1 = skill1.toLowerCase().trim();
   const normalizedSkill2 = skill2.toLowerCase().trim();
   
@@ -22,6 +66,10 @@ async function calculateSkillSimilarity(skill1, skill2) {
     return 1.0;
   }
   
+  if (similarities && similarities.has(similarityKey(skill1, skill2))) {
+    return similarities.get(similarityKey(skill1, skill2));
+  }
+  
   try {
     // Try semantic similarity first
     const semanticSimilarity = await semanticMatchingService.calculateSemanticSimilarity(normalizedSkill1, normalizedSkill2);
@@ -47,8 +95,13 @@ async function calculateSkillSimilarity(skill1, skill2) {
 
 /**
  * Enhanced skill similarity check with comprehensive synonym matching
+ * (pairs in the optional fetchSkillSimilarities lookup are not requested again)
  */
-async function areSkillsSimilar(skill1, skill2) {
+async function areSkillsSimilar(skill1, skill2, similarities) {
+  if (similarities && similarities.has(similarityKey(skill1, skill2))) {
+    return similarities.get(similarityKey(skill1, skill2)) >= SIMILARITY_THRESHOLD;
+  }
+  
   try {
     // Try semantic similarity first
     return await semanticMatchingService.areSkillsSemanticallyRelated(skill1, skill2);
@@ -108,7 +161,7 @@ function areSkillsDirectlyRelated(skill, categorySkill) {
 /**
  * Enhanced match score calculation with refined weights and logic
  */
-async function calculateMatchScore(employee, demand) {
+async function calculateMatchScore(employee, demand, similarities) {
   let score = 0;
   const weights = {
     primarySkill: 50,      // Reduced from 60 to allow other factors more influence
@@ -119,7 +172,7 @@ async function calculateMatchScore(employee, demand) {
   
   // Primary skill match with enhanced experience evaluation
   let primarySkillScore = 0;
-  const primarySkillMatch = await areSkillsSimilar(employee.primarySkill, demand.primarySkill);
+  const primarySkillMatch = await areSkillsSimilar(employee.primarySkill, demand.primarySkill, similarities);
   
   if (primarySkillMatch) {
     const minExp = demand.experienceRange.min;
@@ -144,7 +197,7 @@ async function calculateMatchScore(employee, demand) {
     }
   } else {
     // Check for related skills in same category
-    const skillSimilarity = await calculateSkillSimilarity(employee.primarySkill, demand.primarySkill);
+    const skillSimilarity = await calculateSkillSimilarity(employee.primarySkill, demand.primarySkill, similarities);
     if (skillSimilarity >= 0.4) {
       primarySkillScore = weights.primarySkill * skillSimilarity * 0.6;
     }
@@ -161,7 +214,7 @@ async function calculateMatchScore(employee, demand) {
     for (const demandSecSkill of demand.secondarySkills) {
       let bestMatch = 0;
       for (const empSecSkill of employee.secondarySkills) {
-        if (await areSkillsSimilar(empSecSkill.skill, demandSecSkill)) {
+        if (await areSkillsSimilar(empSecSkill.skill, demandSecSkill, similarities)) {
           // Consider experience level for secondary skills too
           const skillScore = Math.min(1, empSecSkill.experience / 2); // Normalize to max 1
           bestMatch = Math.max(bestMatch, skillScore);
@@ -224,8 +277,8 @@ async function calculateMatchScore(employee, demand) {
 /**
  * Enhanced match type determination with more nuanced categories
  */
-async function determineMatchType(score, missingSkills, employee, demand) {
-  const primarySkillMatch = await areSkillsSimilar(employee.primarySkill, demand.primarySkill);
+async function determineMatchType(score, missingSkills, employee, demand, similarities) {
+  const primarySkillMatch = await areSkillsSimilar(employee.primarySkill, demand.primarySkill, similarities);
   const experienceGap = demand.experienceRange.min - employee.primarySkillExperience;
   
   if (score >= 85 && missingSkills.length === 0 && primarySkillMatch) {
@@ -242,11 +295,11 @@ async function determineMatchType(score, missingSkills, employee, demand) {
 /**
  * Enhanced missing skills identification with prioritization
  */
-async function findMissingSkills(employee, demand) {
+async function findMissingSkills(employee, demand, similarities) {
   const missingSkills = [];
   
   // Check primary skill and experience gap
-  const primarySkillMatch = await areSkillsSimilar(employee.primarySkill, demand.primarySkill);
+  const primarySkillMatch = await areSkillsSimilar(employee.primarySkill, demand.primarySkill, similarities);
   
   if (!primarySkillMatch) {
     missingSkills.push({
@@ -270,7 +323,7 @@ async function findMissingSkills(employee, demand) {
     for (const demandSecSkill of demand.secondarySkills) {
       let hasSkill = false;
       for (const empSecSkill of employee.secondarySkills) {
-        if (await areSkillsSimilar(empSecSkill.skill, demandSecSkill)) {
+        if (await areSkillsSimilar(empSecSkill.skill, demandSecSkill, similarities)) {
           hasSkill = true;
           break;
         }
@@ -293,13 +346,13 @@ async function findMissingSkills(employee, demand) {
 /**
  * Enhanced skills matched details with better analysis
  */
-async function generateSkillsMatched(employee, demand) {
+async function generateSkillsMatched(employee, demand, similarities) {
   const skillsMatched = [];
   
   // Primary skill analysis
-  const primarySkillMatch = await areSkillsSimilar(employee.primarySkill, demand.primarySkill);
+  const primarySkillMatch = await areSkillsSimilar(employee.primarySkill, demand.primarySkill, similarities);
   if (primarySkillMatch) {
-    const similarity = await calculateSkillSimilarity(employee.primarySkill, demand.primarySkill);
+    const similarity = await calculateSkillSimilarity(employee.primarySkill, demand.primarySkill, similarities);
     skillsMatched.push({
       skill: employee.primarySkill,
       required: true,
@@ -315,13 +368,13 @@ async function generateSkillsMatched(employee, demand) {
     for (const demandSecSkill of demand.secondarySkills) {
       let matchedSecSkill = null;
       for (const empSecSkill of employee.secondarySkills) {
-        if (await areSkillsSimilar(empSecSkill.skill, demandSecSkill)) {
+        if (await areSkillsSimilar(empSecSkill.skill, demandSecSkill, similarities)) {
           matchedSecSkill = empSecSkill;
           break;
         }
       }
       if (matchedSecSkill) {
-        const similarity = await calculateSkillSimilarity(matchedSecSkill.skill, demandSecSkill);
+        const similarity = await calculateSkillSimilarity(matchedSecSkill.skill, demandSecSkill, similarities);
         skillsMatched.push({
           skill: matchedSecSkill.skill,
           required: false,
@@ -356,20 +409,23 @@ async function generateMatches(demandId) {
     // Clear existing matches for this demand
     await Match.deleteMany({ demandId });
     
+    // Every employee skill is compared with the demand skills in one request
+    const similarities = await fetchSkillSimilarities(employees, [demand]);
+    
     const matches = [];
     
     for (const employee of employees) {
       // Calculate enhanced match score
-      const matchScore = await calculateMatchScore(employee, demand);
+      const matchScore = await calculateMatchScore(employee, demand, similarities);
       
       // Find missing skills with enhanced analysis
-      const missingSkills = await findMissingSkills(employee, demand);
+      const missingSkills = await findMissingSkills(employee, demand, similarities);
       
       // Determine match type with refined logic
-      const matchType = await determineMatchType(matchScore, missingSkills, employee, demand);
+      const matchType = await determineMatchType(matchScore, missingSkills, employee, demand, similarities);
       
       // Generate enhanced skills matched analysis
-      const skillsMatched = await generateSkillsMatched(employee, demand);
+      const skillsMatched = await generateSkillsMatched(employee, demand, similarities);
       
       // Only create matches above a minimum threshold
       if (matchScore >= 30) {
@@ -407,6 +463,34 @@ async function generateMatches(demandId) {
   }
 }
 
+/**
+ * Rank employees for a demand with the semantic service's scoring, without saving matches
+ */
+async function rankCandidates(demandId, options = {}) {
+  try {
+    const demand = await Demand.findById(demandId);
+    if (!demand) {
+      throw new Error('Demand not found');
+    }
+    
+    const employees = await EmployeeProfile.find({
+      status: { $in: ['Available', 'Training', 'Allocated'] }
+    });
+    
+    // All candidates are scored and ranked in one request
+    const ranking = await semanticMatchingService.rankCandidatesForDemand(demand, employees, options);
+    const employeesById = new Map(employees.map(employee => [employee._id.toString(), employee]));
+    
+    return ranking.map(result => ({
+      ...result,
+      employee: employeesById.get(result.employeeId)
+    }));
+  } catch (error) {
+    console.error('Rank candidates error:', error);
+    throw error;
+  }
+}
+
 /**
  * Get match recommendations for an employee with enhanced scoring
  */
@@ -420,12 +504,15 @@ async function getEmployeeRecommendations(employeeId) {
     // Get open demands
     const demands = await Demand.find({ status: 'Open' });
     
+    // The employee's skills are compared with every demand's skills in one request
+    const similarities = await fetchSkillSimilarities([employee], demands);
+    
     const recommendations = [];
     
     for (const demand of demands) {
-      const matchScore = await calculateMatchScore(employee, demand);
-      const missingSkills = await findMissingSkills(employee, demand);
-      const matchType = await determineMatchType(matchScore, missingSkills, employee, demand);
+      const matchScore = await calculateMatchScore(employee, demand, similarities);
+      const missingSkills = await findMissingSkills(employee, demand, similarities);
+      const matchType = await determineMatchType(matchScore, missingSkills, employee, demand, similarities);
       
       if (matchScore >= 40) { // Slightly higher threshold for recommendations
         recommendations.push({
@@ -433,7 +520,7 @@ async function getEmployeeRecommendations(employeeId) {
           matchScore,
           matchType,
           missingSkills,
-          skillsMatched: await generateSkillsMatched(employee, demand)
+          skillsMatched: await generateSkillsMatched(employee, demand, similarities)
         });
       }
     }
@@ -450,20 +537,36 @@ async function getEmployeeRecommendations(employeeId) {
 
 /**
  * Analyze skill gaps across the organization
+ * @param {Object} [options] - { useSemanticService: boolean } takes the gaps from the
+ *   semantic service's /skill-gaps stream, which applies its own scoring rules and
+ *   counts every demand skill the best candidate lacks
  */
-async function analyzeSkillGaps() {
+async function analyzeSkillGaps(options = {}) {
   try {
     const demands = await Demand.find({ status: { $in: ['Open', 'In Progress'] } });
     const employees = await EmployeeProfile.find({ status: { $in: ['Available', 'Training'] } });
     
+    if (options.useSemanticService) {
+      try {
+        // One streamed request scores every employee against every demand; only the summary is kept
+        const { skillGaps } = await semanticMatchingService.analyzeSkillGapsBulk(demands, employees, {
+          onDemand: () => {}
+        });
+        return skillGaps;
+      } catch (error) {
+        console.log('Falling back to per-demand skill gap analysis:', error.message);
+      }
+    }
+    
+    const similarities = await fetchSkillSimilarities(employees, demands);
     const skillGaps = {};
     
     for (const demand of demands) {
       const matches = [];
       
       for (const employee of employees) {
-        const matchScore = await calculateMatchScore(employee, demand);
-        const missingSkills = await findMissingSkills(employee, demand);
+        const matchScore = await calculateMatchScore(employee, demand, similarities);
+        const missingSkills = await findMissingSkills(employee, demand, similarities);
         
         matches.push({
           employee,
@@ -508,6 +611,7 @@ async function analyzeSkillGaps() {
 
 module.exports = {
   generateMatches,
+  rankCandidates,
   getEmployeeRecommendations,
   calculateMatchScore,
   areSkillsSimilar,
@@ -1,3 +1,4 @@
+const readline = require('readline');
 const axios = require('axios');
 const natural = require('natural');
 const { SKILL_SYNONYMS, SKILL_CATEGORIES } = require('./skillData');
@@ -34,6 +35,44 @@ async function calculateSemanticSimilarity(skill1, skill2) {
   }
 }
 
+/**
+ * Calculate similarities between every pair of two skill lists in one request
+ * @param {string[]} skillsA - Row skills
+ * @param {string[]} skillsB - Column skills
+ * @param {Object} [options] - { sparse: boolean, threshold: number }
+ * @returns {Promise<number[][]>} - |skillsA| x |skillsB| similarity matrix
+ * @throws when the service is unavailable; callers fall back pair by pair
+ */
+async function calculateSemanticSimilarityMatrix(skillsA, skillsB, options = {}) {
+  const normalizedA = skillsA.map(s => s.toLowerCase().trim());
+  const normalizedB = skillsB.map(s => s.toLowerCase().trim());
+  const sparse = options.sparse === true;
+
+  try {
+    const response = await axios.post(`${SEMANTIC_MATCHING_API_URL}/match-skills/batch`, {
+      skillsA: normalizedA,
+      skillsB: normalizedB,
+      sparse,
+      threshold: options.threshold ?? SIMILARITY_THRESHOLD
+    });
+
+    if (!sparse) {
+      return response.data.similarities;
+    }
+
+    // Expand the coordinate form; pairs below the threshold become 0
+    const matrix = normalizedA.map(() => new Array(normalizedB.length).fill(0));
+    const { rows, cols, values } = response.data.pairs;
+    rows.forEach((row, i) => {
+      matrix[row][cols[i]] = values[i];
+    });
+    return matrix;
+  } catch (error) {
+    console.error('Semantic similarity matrix error:', error.message);
+    throw error;
+  }
+}
+
 /**
  * Legacy similarity calculation as fallback
  * @param {string} skill1 - First skill
@@ -117,13 +156,16 @@ async function getSkillEmbeddings(skills) {
  * Find semantically similar skills from a list
  * @param {string} targetSkill - Skill to find similar skills for
  * @param {string[]} skillList - List of skills to search in
+ * @param {Object} [options] - { k: number, minSimilarity: number }
  * @returns {Promise<Array<{skill: string, similarity: number}>>} - Sorted list of similar skills with scores
  */
-async function findSimilarSkills(targetSkill, skillList) {
+async function findSimilarSkills(targetSkill, skillList, options = {}) {
   try {
     const response = await axios.post(`${SEMANTIC_MATCHING_API_URL}/find-similar-skills`, {
       targetSkill: targetSkill.toLowerCase().trim(),
-      skillList: skillList.map(s => s.toLowerCase().trim())
+      skillList: skillList.map(s => s.toLowerCase().trim()),
+      k: options.k,
+      minSimilarity: options.minSimilarity
     });
     
     return response.data.similarSkills;
@@ -190,10 +232,111 @@ async function generateSemanticMatchAnalysis(employee, demand) {
   }
 }
 
+/**
+ * Build the candidate profile payload the bulk endpoints expect
+ * @param {Object} employee - Employee profile with skills
+ * @returns {Object} - { employeeId, skills, experience }
+ */
+function toCandidateProfile(employee) {
+  return {
+    employeeId: employee._id.toString(),
+    skills: [
+      employee.primarySkill,
+      ...employee.secondarySkills.map(s => s.skill)
+    ],
+    experience: {
+      [employee.primarySkill]: employee.primarySkillExperience,
+      ...Object.fromEntries(employee.secondarySkills.map(s => [s.skill, s.experience]))
+    }
+  };
+}
+
+/**
+ * Score and rank many employees against one demand in a single request
+ * @param {Object} demand - Demand with required skills
+ * @param {Object[]} employees - Employee profiles with skills
+ * @param {Object} [options] - { limit: number }
+ * @returns {Promise<Array<Object>>} - Ranked { employeeId, matchScore, matchType, missingSkills, primarySkillSimilarity }
+ */
+async function rankCandidatesForDemand(demand, employees, options = {}) {
+  const candidates = employees.map(toCandidateProfile);
+
+  const response = await axios.post(`${SEMANTIC_MATCHING_API_URL}/analyze-match/bulk`, {
+    demandSkills: [
+      demand.primarySkill,
+      ...(demand.secondarySkills || [])
+    ],
+    demandRequirements: {
+      primarySkill: demand.primarySkill,
+      experienceRange: demand.experienceRange
+    },
+    candidates,
+    limit: options.limit
+  });
+
+  return response.data.results;
+}
+
+/**
+ * Analyze organization-wide skill gaps in the semantic matching service
+ * @param {Object[]} demands - Open demands
+ * @param {Object[]} employees - Employee profiles with skills
+ * @param {Object} [options] - { onDemand: called with each per-demand result as it arrives, instead of collecting them }
+ * @returns {Promise<Object>} - { demands: per-demand best matches, skillGaps: sorted gap list }
+ */
+async function analyzeSkillGapsBulk(demands, employees, options = {}) {
+  const response = await axios.post(`${SEMANTIC_MATCHING_API_URL}/skill-gaps`, {
+    demands: demands.map(demand => ({
+      demandId: demand.demandId,
+      demandSkills: [
+        demand.primarySkill,
+        ...(demand.secondarySkills || [])
+      ],
+      demandRequirements: {
+        primarySkill: demand.primarySkill,
+        experienceRange: demand.experienceRange
+      },
+      priority: demand.priority
+    })),
+    candidates: employees.map(toCandidateProfile)
+  }, { responseType: 'stream' });
+
+  // NDJSON: one line per demand as it is scored, the summary line last.
+  // Lines are parsed as they arrive, so the body is never held as one string
+  const lines = readline.createInterface({ input: response.data, crlfDelay: Infinity });
+  const results = [];
+  let summary = null;
+  for await (const line of lines) {
+    if (!line.trim()) {
+      continue;
+    }
+    const result = JSON.parse(line);
+    if (result.skillGaps) {
+      summary = result;
+    } else if (options.onDemand) {
+      options.onDemand(result);
+    } else {
+      results.push(result);
+    }
+  }
+
+  if (!summary) {
+    throw new Error('Skill gap stream ended without a summary');
+  }
+
+  return {
+    demands: results,
+    skillGaps: summary.skillGaps
+  };
+}
+
 module.exports = {
   calculateSemanticSimilarity,
+  calculateSemanticSimilarityMatrix,
   areSkillsSemanticallyRelated,
   getSkillEmbeddings,
   findSimilarSkills,
-  generateSemanticMatchAnalysis
+  generateSemanticMatchAnalysis,
+  rankCandidatesForDemand,
+  analyzeSkillGapsBulk
 };
\ No newline at end of file